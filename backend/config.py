@@ -35,6 +35,69 @@ class Settings(BaseSettings):
     SQLITE_DB_DIR: str = "x_db"
     SQLITE_DB_NAME: str = "xFinanceDB.db"
     
+    # Banco de auditoria (arquivo separado, mesmo diretório do principal)
+    # Prioridade: XFINANCE_AUDIT_DB_PATH > <dir do banco principal>/AUDIT_DB_NAME
+    AUDIT_DB_NAME: str = "xFinanceAudit.db"
+    
+    # Cache de queries (performance/investimentos)
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_TTL_SECONDS: int = 300  # Limita defasagem p/ escritas externas
+    QUERY_CACHE_MAX_ENTRIES: int = 128  # Por função
+    
+    # Auditoria (gravação em lote)
+    AUDIT_QUEUE_MAX_EVENTS: int = 10000  # Limite de memória da fila
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.2  # Espera com fila cheia antes do fallback síncrono
+    AUDIT_WRITE_RETRIES: int = 3  # Novas tentativas de um lote antes de gravar evento a evento
+    AUDIT_WRITE_RETRY_SECONDS: float = 0.5  # Espera entre tentativas (multiplicada pela tentativa)
+    
+    # Auditoria (limpeza de retenção em lotes)
+    AUDIT_CLEANUP_BATCH_SIZE: int = 2000
+    AUDIT_CLEANUP_PAUSE_SECONDS: float = 0.05  # Libera o lock entre lotes
+    AUDIT_CLEANUP_INCREMENTAL_VACUUM: bool = True  # Só com auto_vacuum INCREMENTAL (banco novo ou após VACUUM)
+    
+    # Auditoria (arquivo frio no mount de backup)
+    AUDIT_ARCHIVE_AFTER_MONTHS: int = 3  # Meses mantidos no banco
+    AUDIT_ARCHIVE_MANIFEST_TTL_SECONDS: float = 300.0  # Intervalo entre stat do manifest.json
+    AUDIT_ARCHIVE_READ_TIMEOUT_SECONDS: float = 10.0  # Leitura do histórico arquivado
+    
+    # Login (pool dedicado de bcrypt + limite de tentativas)
+    AUTH_BCRYPT_WORKERS: int = 2
+    AUTH_BCRYPT_QUEUE_MAX: int = 8  # Acima de workers + fila → HTTP 429
+    AUTH_THROTTLE_WINDOW_SECONDS: int = 60
+    AUTH_THROTTLE_MAX_PER_IP: int = 30
+    AUTH_THROTTLE_MAX_PER_EMAIL: int = 10
+    # Proxies confiáveis (nginx): só deles X-Real-IP/X-Forwarded-For define o IP do cliente
+    AUTH_TRUSTED_PROXIES: list[str] = ["127.0.0.1/32", "::1/128", "172.16.0.0/12"]
+    
+    AUTH_ATTEMPTS_FLUSH_SECONDS: float = 30.0  # Gravação em lote de failed_attempts
+    
+    # Lookups (dados de referência dos dropdowns)
+    LOOKUP_CACHE_TTL_SECONDS: int = 3600  # Limita defasagem p/ escritas externas
+    LOOKUP_CLIENT_MAX_AGE_SECONDS: int = 600  # Cache-Control no navegador
+    
+    # Permissões (permi): intervalo entre verificações de alteração no banco
+    PERMISSIONS_CHECK_SECONDS: float = 5.0
+    
+    # Cache de tokens JWT já validados (por sessão)
+    AUTH_TOKEN_CACHE_SIZE: int = 1024
+    
+    # Fila de jobs em segundo plano (criação de diretórios)
+    JOBS_WORKERS: int = 2
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_SECONDS: float = 30.0  # Backoff: 30s, 60s, 120s...
+    JOBS_RETRY_MAX_SECONDS: float = 900.0
+    JOBS_POLL_SECONDS: float = 5.0  # Verifica novas tentativas agendadas
+    JOBS_RETENTION_DAYS: int = 30  # Jobs finalizados removidos após
+    
+    # Saúde dos destinos de rede (NAS, Fotos, backup)
+    STORAGE_HEALTH_INTERVAL_SECONDS: float = 30.0  # Verificação em segundo plano
+    STORAGE_HEALTH_TTL_SECONDS: float = 90.0  # Status vencido → verifica na hora
+    STORAGE_PROBE_TIMEOUT_SECONDS: float = 10.0
+    STORAGE_IO_WORKERS: int = 4  # Pool compartilhado (verificações + cópias/mkdir)
+    DIRECTORY_INDEX_TTL_SECONDS: float = 3600.0  # Relistagem das pastas de job no NAS
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -88,3 +151,20 @@ def resolve_sqlite_path() -> str:
         f"  - {legacy_path}"
     )
 
+
+def resolve_audit_db_path() -> str:
+    """
+    Resolve o caminho do banco de auditoria (audit_log).
+    
+    Prioridade:
+    1. Variável de ambiente XFINANCE_AUDIT_DB_PATH
+    2. Mesmo diretório do banco principal + AUDIT_DB_NAME
+    
+    O arquivo é criado automaticamente na primeira conexão.
+    """
+    env_path = os.environ.get("XFINANCE_AUDIT_DB_PATH")
+    if env_path:
+        return str(Path(env_path).resolve())
+    
+    main_db = Path(resolve_sqlite_path())
+    return str(main_db.parent / get_settings().AUDIT_DB_NAME)
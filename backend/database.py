@@ -9,7 +9,7 @@ import unicodedata
 from contextlib import contextmanager
 from typing import Generator, Optional
 
-from config import resolve_sqlite_path
+from config import resolve_audit_db_path, resolve_sqlite_path
 
 
 # =============================================================================
@@ -106,3 +106,41 @@ def get_db_dependency() -> Generator[sqlite3.Connection, None, None]:
     finally:
         conn.close()
 
+
+# =============================================================================
+# BANCO DE AUDITORIA (arquivo separado)
+# =============================================================================
+
+def get_audit_connection() -> sqlite3.Connection:
+    """
+    Retorna conexão com o banco de auditoria (audit_log).
+    
+    Arquivo próprio: não disputa o lock de escrita do banco principal
+    e não infla os backups do xFinanceDB.db.
+    """
+    conn = sqlite3.connect(resolve_audit_db_path(), timeout=5.0)
+    conn.row_factory = sqlite3.Row
+    
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    
+    return conn
+
+
+@contextmanager
+def get_audit_db() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Context manager para conexão com o banco de auditoria.
+    
+    Uso:
+        with get_audit_db() as conn:
+            conn.execute("SELECT * FROM audit_log")
+    """
+    conn = None
+    try:
+        conn = get_audit_connection()
+        yield conn
+    finally:
+        if conn:
+            conn.close()
@@ -15,7 +15,8 @@ from services.permissions import (
     is_admin,
     is_backoffice_or_admin,
     can_perform_action,
-    get_permitted_columns,
+    get_permission_projection,
+    PermissionProjection,
 )
 
 
@@ -43,7 +44,7 @@ class CurrentUser:
         self.short_nome = short_nome
         
         # Permissões derivadas
-        self._permitted_columns: Optional[set[str]] = None
+        self._projection: Optional[PermissionProjection] = None
     
     @property
     def is_admin(self) -> bool:
@@ -54,11 +55,16 @@ class CurrentUser:
         return is_backoffice_or_admin(self.papel)
     
     @property
-    def permitted_columns(self) -> set[str]:
-        """Colunas que o usuário pode ver (lazy loading)."""
-        if self._permitted_columns is None:
-            self._permitted_columns = get_permitted_columns(self.papel)
-        return self._permitted_columns
+    def projection(self) -> PermissionProjection:
+        """Projeção compilada do papel (lazy loading, compartilhada)."""
+        if self._projection is None:
+            self._projection = get_permission_projection(self.papel)
+        return self._projection
+    
+    @property
+    def permitted_columns(self) -> frozenset[str]:
+        """Colunas que o usuário pode ver (da projeção do papel)."""
+        return self.projection.columns
     
     def can_perform(self, action: str) -> bool:
         """Verifica se pode executar uma ação."""
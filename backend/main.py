@@ -7,12 +7,23 @@ Entry point do backend.
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import get_settings, resolve_sqlite_path
-from routers import auth, inspections, acoes, lookups, performance, investments, new_record, kpis, backup, audit, public
+from dependencies import require_admin
+from routers import auth, inspections, acoes, lookups, performance, investments, new_record, kpis, backup, audit, public, jobs
 from scheduler import start_scheduler, stop_scheduler
+from services.audit import start_audit_writer, stop_audit_writer
+from services.auth import get_token_cache_stats
+from services.cache import get_cache_stats
+from services.directories import get_directory_index_stats
+from services.jobs import get_job_stats, start_job_workers, stop_job_workers
+from services.login_attempts import get_attempt_stats, start_attempt_flusher, stop_attempt_flusher
+from services.login_guard import get_login_guard_stats
+from services.schema_check import SchemaMigrationError, check_schema
+from services.singleflight import get_singleflight_stats
+from services.storage_health import get_storage_stats, start_storage_monitor, stop_storage_monitor
 
 # Configurar logging
 logging.basicConfig(
@@ -42,6 +53,25 @@ async def lifespan(app: FastAPI):
         logger.error("❌ Banco de dados não encontrado: %s", e)
         raise
     
+    # Colunas/triggers de scripts de migração usados pelas queries
+    try:
+        check_schema()
+    except SchemaMigrationError as e:
+        logger.error("❌ %s", e)
+        raise
+    
+    # Iniciar gravação assíncrona da auditoria
+    start_audit_writer()
+    
+    # Iniciar gravação em lote das tentativas de login
+    start_attempt_flusher()
+    
+    # Iniciar verificação periódica do NAS / Fotos / backup
+    start_storage_monitor()
+    
+    # Iniciar workers da fila de jobs (diretórios)
+    start_job_workers()
+    
     # Iniciar agendador de backups
     start_scheduler()
     
@@ -53,6 +83,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Encerrando xFinance API")
     stop_scheduler()
+    stop_job_workers()  # Pendentes ficam no banco para o próximo start
+    stop_storage_monitor()
+    stop_attempt_flusher()  # Grava tentativas pendentes
+    stop_audit_writer()  # Grava eventos pendentes
 
 
 # =============================================================================
@@ -95,6 +129,7 @@ app.include_router(investments.router)
 app.include_router(new_record.router, prefix="/api/new-record", tags=["New Record"])
 app.include_router(backup.router)
 app.include_router(audit.router)
+app.include_router(jobs.router)
 
 
 # =============================================================================
@@ -111,6 +146,21 @@ def health_check():
     }
 
 
+@app.get("/api/health/cache")
+def cache_health(_=Depends(require_admin)):
+    """Métricas dos caches de queries, do single-flight e do login (admin only)."""
+    return {
+        "caches": get_cache_stats(),
+        "singleflight": get_singleflight_stats(),
+        "login": get_login_guard_stats(),
+        "login_attempts": get_attempt_stats(),
+        "tokens": get_token_cache_stats(),
+        "jobs": get_job_stats(),
+        "storage": get_storage_stats(),
+        "directories": get_directory_index_stats(),
+    }
+
+
 @app.get("/")
 def root():
     """Rota raiz - redireciona para docs."""
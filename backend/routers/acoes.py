@@ -22,6 +22,8 @@ from dependencies import (
     require_admin,
 )
 from services.audit import log_operation
+from services.cache import bump_table_version
+from services.queries.markers import MARKER_TYPES, MARKER_VALUES, set_markers
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +112,7 @@ async def encaminhar_inspecoes(
             
             updated = cursor.rowcount
             conn.commit()
+            bump_table_version("princ")
             
             # Registrar auditoria para cada registro encaminhado
             for id_princ in request.ids_princ:
@@ -142,7 +145,7 @@ async def encaminhar_inspecoes(
 # POST /api/acoes/marcar
 # =============================================================================
 
-VALID_MARKER_TYPES = {"state_loc", "state_dt_envio", "state_dt_denvio", "state_dt_pago"}
+VALID_MARKER_TYPES = set(MARKER_TYPES)
 
 @router.post("/marcar", response_model=AcaoResponse)
 async def marcar_inspecoes(
@@ -172,7 +175,7 @@ async def marcar_inspecoes(
             detail=f"Tipo de marcador inválido. Válidos: {', '.join(VALID_MARKER_TYPES)}"
         )
     
-    if request.value not in (0, 1, 2, 3):
+    if request.value not in MARKER_VALUES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Valor do marcador deve ser 0, 1, 2 ou 3"
@@ -187,47 +190,17 @@ async def marcar_inspecoes(
     )
     
     try:
-        with get_db() as conn:
-            updated = 0
-            
-            for id_princ in request.ids_princ:
-                # Inserir ou atualizar na tabela tempstate
-                conn.execute(
-                    "INSERT OR IGNORE INTO tempstate (state_id_princ) VALUES (?)",
-                    (id_princ,)
-                )
-                
-                cursor = conn.execute(
-                    f"UPDATE tempstate SET {request.marker_type} = ? WHERE state_id_princ = ?",
-                    (request.value, id_princ)
-                )
-                
-                if cursor.rowcount > 0:
-                    updated += 1
-                
-                # Se valor = 0 e todos os marcadores são 0, excluir linha
-                if request.value == 0:
-                    conn.execute(
-                        """
-                        DELETE FROM tempstate
-                        WHERE state_id_princ = ?
-                          AND COALESCE(state_loc, 0) = 0
-                          AND COALESCE(state_dt_envio, 0) = 0
-                          AND COALESCE(state_dt_denvio, 0) = 0
-                          AND COALESCE(state_dt_pago, 0) = 0
-                        """,
-                        (id_princ,)
-                    )
-            
-            conn.commit()
-            
-            action = "aplicado" if request.value > 0 else "removido"
-            return AcaoResponse(
-                success=True,
-                message=f"Marcador {action} em {updated} inspeção(ões)",
-                updated=updated
-            )
-            
+        # Operação em conjunto: 1 UPDATE bit a bit em princ.marcadores para todos os ids
+        # (trigger da migração espelha em tempstate para o sistema legado)
+        updated = set_markers(request.ids_princ, request.marker_type, request.value)
+        
+        action = "aplicado" if request.value > 0 else "removido"
+        return AcaoResponse(
+            success=True,
+            message=f"Marcador {action} em {updated} inspeção(ões)",
+            updated=updated
+        )
+        
     except Exception as e:
         logger.error("Erro ao marcar: %s", e)
         raise HTTPException(
@@ -266,7 +239,7 @@ async def excluir_inspecoes(
         with get_db() as conn:
             placeholders = ",".join(["?"] * len(request.ids_princ))
             
-            # Excluir marcadores primeiro (integridade referencial)
+            # Excluir marcadores legados (tempstate; atuais ficam em princ.marcadores)
             conn.execute(
                 f"DELETE FROM tempstate WHERE state_id_princ IN ({placeholders})",
                 request.ids_princ
@@ -286,6 +259,7 @@ async def excluir_inspecoes(
             
             deleted = cursor.rowcount
             conn.commit()
+            bump_table_version("princ", "demais_locais")
             
             # Registrar auditoria para cada registro excluído
             for id_princ in request.ids_princ:
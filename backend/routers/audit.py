@@ -4,6 +4,7 @@ Router de Auditoria - xFinance
 🔒 ADMIN ONLY: Todas as rotas requerem papel de administrador.
 
 Endpoints:
+- GET  /api/audit/search      - Busca com filtros (keyset)
 - GET  /api/audit/{id_princ}  - Histórico de um registro
 - GET  /api/audit/stats       - Estatísticas do log
 - POST /api/audit/cleanup     - Limpar registros expirados
@@ -16,7 +17,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
 from dependencies import CurrentUser, require_admin
-from services.audit import get_history, cleanup_expired, get_stats
+from services.audit import get_history, cleanup_expired, get_stats, search_history
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,7 @@ class AuditEntry(BaseModel):
     id_log: int
     id_user: int
     user_email: str
+    id_princ: Optional[int] = None
     operacao: str
     campo: Optional[str] = None
     valor_anterior: Optional[str] = None
@@ -46,11 +48,21 @@ class AuditHistoryResponse(BaseModel):
     entries: List[AuditEntry]
 
 
+class AuditSearchResponse(BaseModel):
+    """Response da busca de auditoria (paginação por keyset)."""
+    total: int
+    entries: List[AuditEntry]
+    next_cursor: Optional[str] = None
+
+
 class AuditStatsResponse(BaseModel):
     """Response das estatísticas de auditoria."""
     total_registros: int
     registro_mais_antigo: Optional[str] = None
     registros_expirados: int
+    writer: Optional[dict] = None  # Métricas da fila de gravação
+    cleanup: Optional[dict] = None  # Progresso da limpeza de retenção
+    arquivo: Optional[dict] = None  # Resumo do arquivo frio
 
 
 class CleanupResponse(BaseModel):
@@ -65,7 +77,7 @@ class CleanupResponse(BaseModel):
 # =============================================================================
 
 @router.get("/stats", response_model=AuditStatsResponse)
-async def audit_stats(
+def audit_stats(
     current_user: CurrentUser = Depends(require_admin),
 ):
     """
@@ -79,12 +91,65 @@ async def audit_stats(
     return AuditStatsResponse(**stats)
 
 
+# =============================================================================
+# GET /api/audit/search - Busca com filtros (deve vir antes de /{id_princ})
+# =============================================================================
+
+@router.get("/search", response_model=AuditSearchResponse)
+def audit_search(
+    id_user: Optional[int] = Query(None, description="Usuário que realizou a operação"),
+    operacao: Optional[str] = Query(None, description="CREATE, UPDATE, DELETE, ENCAMINHAR"),
+    campo: Optional[str] = Query(None, description="Campo alterado"),
+    id_princ: Optional[int] = Query(None, description="Registro afetado"),
+    dt_ini: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    dt_fim: Optional[str] = Query(None, description="Data final (YYYY-MM-DD, inclusive)"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: CurrentUser = Depends(require_admin),
+):
+    """
+    Busca operações de auditoria (ex: "o que o usuário X alterou na semana").
+    
+    🔒 ADMIN ONLY
+    """
+    logger.info(
+        "GET /audit/search | user=%s | id_user=%s | op=%s | campo=%s | princ=%s",
+        current_user.email, id_user, operacao, campo, id_princ
+    )
+    
+    try:
+        result = search_history(
+            id_user=id_user,
+            operacao=operacao,
+            campo=campo,
+            id_princ=id_princ,
+            dt_ini=dt_ini,
+            dt_fim=dt_fim,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Erro na busca de auditoria: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao buscar auditoria"
+        )
+    
+    return AuditSearchResponse(
+        total=len(result["entries"]),
+        entries=[AuditEntry(**entry) for entry in result["entries"]],
+        next_cursor=result["next_cursor"],
+    )
+
+
 # =============================================================================
 # POST /api/audit/cleanup - Limpar expirados
 # =============================================================================
 
 @router.post("/cleanup", response_model=CleanupResponse)
-async def audit_cleanup(
+def audit_cleanup(
     current_user: CurrentUser = Depends(require_admin),
 ):
     """
@@ -123,9 +188,10 @@ async def audit_cleanup(
 # =============================================================================
 
 @router.get("/{id_princ}", response_model=AuditHistoryResponse)
-async def audit_history(
+def audit_history(
     id_princ: int,
     limit: int = Query(100, ge=1, le=500),
+    include_archived: bool = Query(False),
     current_user: CurrentUser = Depends(require_admin),
 ):
     """
@@ -136,14 +202,15 @@ async def audit_history(
     Args:
         id_princ: ID do registro (tabela princ)
         limit: Limite de registros (padrão 100, máx 500)
+        include_archived: Incluir meses arquivados no mount de backup
     """
     logger.info(
-        "GET /audit/%d | user=%s | limit=%d",
-        id_princ, current_user.email, limit
+        "GET /audit/%d | user=%s | limit=%d | archived=%s",
+        id_princ, current_user.email, limit, include_archived
     )
     
     try:
-        entries = get_history(id_princ, limit)
+        entries = get_history(id_princ, limit, include_archived)
         
         return AuditHistoryResponse(
             id_princ=id_princ,
@@ -11,7 +11,7 @@ Endpoints:
 
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Response, Cookie, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, Cookie, Depends
 from pydantic import BaseModel, EmailStr
 
 from services.auth import (
@@ -20,8 +20,10 @@ from services.auth import (
     set_missing_password,
     create_access_token,
     get_current_user_from_token,
+    revoke_token,
     LoginStatus,
 )
+from services.login_guard import TooManyAttemptsError, client_ip, login_throttle, run_auth_task
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -76,6 +78,15 @@ class UserResponse(BaseModel):
 # DEPENDENCIES
 # =============================================================================
 
+def _too_many_attempts(e: TooManyAttemptsError) -> HTTPException:
+    """Converte rejeição do limitador em HTTP 429 com Retry-After."""
+    return HTTPException(
+        status_code=429,
+        detail=e.message,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 def get_current_user(access_token: Optional[str] = Cookie(default=None)) -> dict:
     """
     Dependency que extrai usuário do cookie.
@@ -140,7 +151,7 @@ def check_email(request: CheckEmailRequest):
 
 
 @router.post("/set-password", response_model=LoginResponse)
-def set_password(request: SetPasswordRequest, response: Response):
+async def set_password(request: SetPasswordRequest, response: Response, http_request: Request):
     """
     Define senha no primeiro acesso.
     
@@ -157,7 +168,15 @@ def set_password(request: SetPasswordRequest, response: Response):
             detail="As senhas não coincidem"
         )
     
-    result = set_missing_password(request.email, request.password)
+    # bcrypt roda no pool dedicado (limitado); 429 se saturado
+    try:
+        login_throttle.check(
+            client_ip(http_request.client.host if http_request.client else None, http_request.headers),
+            request.email,
+        )
+        result = await run_auth_task(set_missing_password, request.email, request.password)
+    except TooManyAttemptsError as e:
+        raise _too_many_attempts(e)
     
     if result.status != LoginStatus.SUCCESS:
         # Mapear status para código HTTP apropriado
@@ -202,18 +221,26 @@ def set_password(request: SetPasswordRequest, response: Response):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(request: LoginRequest, response: Response):
+async def login(request: LoginRequest, response: Response, http_request: Request):
     """
     Realiza login com email e senha.
     
-    - Verifica credenciais no banco SQLite
+    - Limita tentativas por IP e por email (429)
+    - Verifica credenciais no banco SQLite (pool dedicado de bcrypt)
     - Cria token JWT
     - Define cookie httponly com o token
     
     Returns:
         LoginResponse com dados do usuário e status específico
     """
-    result = verify_login(request.email, request.password)
+    try:
+        login_throttle.check(
+            client_ip(http_request.client.host if http_request.client else None, http_request.headers),
+            request.email,
+        )
+        result = await run_auth_task(verify_login, request.email, request.password)
+    except TooManyAttemptsError as e:
+        raise _too_many_attempts(e)
     
     # Se não foi sucesso, retornar erro com status específico
     if result.status != LoginStatus.SUCCESS:
@@ -232,6 +259,7 @@ def login(request: LoginRequest, response: Response):
             detail=result.message or "Email ou senha incorretos"
         )
     
+    login_throttle.success(request.email)
     user = result.user
     
     # Criar token JWT com dados do usuário
@@ -264,12 +292,15 @@ def login(request: LoginRequest, response: Response):
 
 
 @router.post("/logout")
-def logout(response: Response):
+def logout(response: Response, access_token: Optional[str] = Cookie(default=None)):
     """
     Realiza logout.
     
+    - Revoga o token no servidor (até expirar)
     - Remove cookie de autenticação
     """
+    if access_token:
+        revoke_token(access_token)
     response.delete_cookie(key="access_token")
     
     return {"success": True, "message": "Logout realizado"}
@@ -7,6 +7,7 @@ Endpoints:
 - GET  /api/inspections     - Lista inspeções (filtrado por papel)
 - GET  /api/inspections/{id} - Detalhe de inspeção
 - POST /api/inspections     - Criar inspeção (admin only)
+- PATCH /api/inspections/batch - Atualizar vários campos/registros (1 transação)
 - PATCH /api/inspections/{id} - Atualizar inspeção
 - DELETE /api/inspections/{id} - Excluir inspeção (admin only)
 """
@@ -36,8 +37,9 @@ from services.queries.new_inspection import (
     increment_princ_loc,
     get_atividade_texto,
 )
-from services.directories import create_directories
-from services.audit import log_operation
+from services.directories import enqueue_create_directories
+from services.audit import log_operation, log_operations
+from services.cache import bump_table_version
 
 logger = logging.getLogger(__name__)
 
@@ -189,6 +191,7 @@ class CreateInspectionResponse(BaseModel):
     message: str
     dirs_created: List[str] = []
     loc: int = 1
+    job_id: Optional[int] = None  # Criação de diretórios (GET /api/jobs/{id})
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=CreateInspectionResponse)
@@ -265,20 +268,22 @@ async def create_inspection(
             atividade_texto=atividade_texto,
         )
         
-        # Criar diretórios
+        # Criar diretórios (job em segundo plano)
         dt_acerto = date.today().replace(day=1).strftime("%Y-%m-%d")
-        dir_msg, dirs_created = create_directories(
+        job_id = enqueue_create_directories(
             id_contr=request.id_contr,
             id_segur=id_segur,
             dt_acerto=dt_acerto,
             id_uf=request.id_uf,
             id_cidade=request.id_cidade,
+            id_princ=id_princ,
+            id_user=current_user.id_user,
         )
         
         logger.info(
-            "Inspeção criada: id_princ=%d | dirs=%s",
+            "Inspeção criada: id_princ=%d | job_dirs=%d",
             id_princ,
-            dirs_created
+            job_id
         )
         
         # Registrar auditoria
@@ -293,9 +298,9 @@ async def create_inspection(
         return CreateInspectionResponse(
             success=True,
             id_princ=id_princ,
-            message=f"Registro criado com sucesso! {dir_msg}",
-            dirs_created=dirs_created,
+            message="Registro criado com sucesso! 📁 Diretórios em criação.",
             loc=1,
+            job_id=job_id,
         )
         
     except HTTPException:
@@ -362,29 +367,31 @@ async def create_local_adicional(
         # Incrementar loc
         new_loc = increment_princ_loc(request.id_princ)
         
-        # Criar diretórios para o novo local
+        # Criar diretórios para o novo local (job em segundo plano)
         dt_acerto = date.today().replace(day=1).strftime("%Y-%m-%d")
-        dir_msg, dirs_created = create_directories(
+        job_id = enqueue_create_directories(
             id_contr=id_contr,
             id_segur=id_segur,
             dt_acerto=dt_acerto,
             id_uf=request.id_uf,
             id_cidade=request.id_cidade,
+            id_princ=request.id_princ,
+            id_user=current_user.id_user,
         )
         
         logger.info(
-            "Local adicional criado: princ=%d | loc=%d | dirs=%s",
+            "Local adicional criado: princ=%d | loc=%d | job_dirs=%d",
             request.id_princ,
             new_loc,
-            dirs_created
+            job_id
         )
         
         return CreateInspectionResponse(
             success=True,
             id_princ=request.id_princ,
-            message=f"Local adicional cadastrado! (Total: {new_loc} locais) {dir_msg}",
-            dirs_created=dirs_created,
+            message=f"Local adicional cadastrado! (Total: {new_loc} locais) 📁 Diretórios em criação.",
             loc=new_loc,
+            job_id=job_id,
         )
         
     except HTTPException:
@@ -516,6 +523,174 @@ def _convert_value(value: Any, field_type: str) -> Any:
     return str(value)
 
 
+# =============================================================================
+# PATCH /api/inspections/batch - Atualizar vários campos/registros
+# =============================================================================
+# ⚠️ Declarado antes de PATCH /{id_princ} ("batch" não é um id_princ)
+
+# Limite de edições por requisição
+MAX_BATCH_EDITS = 500
+
+
+class BatchEdit(BaseModel):
+    id_princ: int
+    field: str
+    value: Any
+
+
+class BatchUpdateRequest(BaseModel):
+    edits: List[BatchEdit]
+
+
+class BatchEditResult(BaseModel):
+    id_princ: int
+    field: str
+    new_value: Any = None
+
+
+class BatchUpdateResponse(BaseModel):
+    success: bool
+    message: str
+    updated: int
+    results: List[BatchEditResult]
+
+
+@router.patch("/batch", response_model=BatchUpdateResponse)
+async def update_inspections_batch(
+    request: BatchUpdateRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Atualiza vários campos de uma ou mais inspeções numa única transação.
+    
+    Mesmas regras do PATCH /{id_princ} (campos editáveis, campos de admin,
+    conversão de valores); se qualquer edição for inválida, nada é gravado.
+    Edições repetidas do mesmo campo/registro: vale a última.
+    
+    🔒 SIGILO: 
+    - Apenas campos editáveis pelo papel podem ser alterados
+    - Campos de sigilo alto só podem ser alterados por admin
+    """
+    if not request.edits:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhuma edição informada"
+        )
+    
+    if len(request.edits) > MAX_BATCH_EDITS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {MAX_BATCH_EDITS} edições por requisição"
+        )
+    
+    # Validar e converter tudo antes de abrir a transação
+    # (id_princ, field) -> valor convertido (última edição prevalece)
+    changes: dict[tuple[int, str], Any] = {}
+    for edit in request.edits:
+        if edit.field not in EDITABLE_FIELDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campo '{edit.field}' não é editável"
+            )
+        if edit.field in ADMIN_ONLY_FIELDS and current_user.papel != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Campo '{edit.field}' requer permissão de administrador"
+            )
+        changes[(edit.id_princ, edit.field)] = _convert_value(edit.value, EDITABLE_FIELDS[edit.field])
+    
+    # Agrupar por registro: id_princ -> {field: valor}
+    by_princ: dict[int, dict[str, Any]] = {}
+    for (id_princ, field), value in changes.items():
+        by_princ.setdefault(id_princ, {})[field] = value
+    
+    fields = sorted({field for _, field in changes})
+    ids = sorted(by_princ)
+    
+    logger.info(
+        "PATCH /inspections/batch | user=%s | edits=%d | registros=%d | campos=%s",
+        current_user.email,
+        len(request.edits),
+        len(ids),
+        fields,
+    )
+    
+    try:
+        with get_db() as conn:
+            # Transação única: leitura dos valores atuais + todas as escritas
+            conn.execute("BEGIN IMMEDIATE")
+            
+            placeholders = ",".join(["?"] * len(ids))
+            rows = conn.execute(
+                f"SELECT id_princ, {', '.join(fields)} FROM princ WHERE id_princ IN ({placeholders})",
+                ids
+            ).fetchall()
+            current = {row["id_princ"]: row for row in rows}
+            
+            missing = [i for i in ids if i not in current]
+            if missing:
+                conn.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Inspeção(ões) não encontrada(s): {missing}"
+                )
+            
+            # Um UPDATE por conjunto de campos (executemany), já limpando o
+            # prazo quando algum campo crítico muda
+            statements: dict[tuple[str, ...], list[list[Any]]] = {}
+            for id_princ, values in by_princ.items():
+                row_fields = tuple(sorted(values))
+                statements.setdefault(row_fields, []).append(
+                    [values[f] for f in row_fields] + [id_princ]
+                )
+            
+            for row_fields, params in statements.items():
+                assignments = [f"{f} = ?" for f in row_fields]
+                if PRAZO_CRITICAL_FIELDS.intersection(row_fields):
+                    assignments.append("prazo = NULL")
+                conn.executemany(
+                    f"UPDATE princ SET {', '.join(assignments)} WHERE id_princ = ?",
+                    params
+                )
+            
+            conn.commit()
+        
+        bump_table_version("princ")
+        
+        prazo_cleared = sum(1 for values in by_princ.values() if PRAZO_CRITICAL_FIELDS.intersection(values))
+        if prazo_cleared:
+            logger.info("Prazo limpo para %d registro(s) (campos críticos editados)", prazo_cleared)
+        
+        # Auditoria: todos os eventos no mesmo lote
+        log_operations(
+            id_user=current_user.id_user,
+            user_nome=current_user.short_nome or current_user.nick or current_user.email,
+            events=[
+                (id_princ, "UPDATE", field, current[id_princ][field], value)
+                for (id_princ, field), value in changes.items()
+            ],
+        )
+        
+        return BatchUpdateResponse(
+            success=True,
+            message=f"{len(changes)} campo(s) atualizado(s) em {len(ids)} registro(s)",
+            updated=len(ids),
+            results=[
+                BatchEditResult(id_princ=id_princ, field=field, new_value=value)
+                for (id_princ, field), value in changes.items()
+            ],
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro ao atualizar inspeções em lote: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao atualizar inspeções"
+        )
+
+
 @router.patch("/{id_princ}")
 async def update_inspection(
     id_princ: int,
@@ -596,6 +771,7 @@ async def update_inspection(
                 logger.info("Prazo limpo para id_princ=%s (campo crítico %s editado)", id_princ, field)
             
             conn.commit()
+            bump_table_version("princ")
             
             # Registrar auditoria
             log_operation(
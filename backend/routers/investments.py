@@ -7,6 +7,7 @@ Endpoints REST para gestão de investimentos.
 """
 
 import logging
+from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -20,6 +21,10 @@ from services.queries.investments import (
     fetch_highlights,
     fetch_kpis,
 )
+from services.queries.investments_timeseries import (
+    fetch_timeseries,
+    is_timeseries_available,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +36,7 @@ router = APIRouter(prefix="/api/investments", tags=["investments"])
 # =============================================================================
 
 @router.get("/filters")
-async def get_filters(_=Depends(require_admin)):
+def get_filters(_=Depends(require_admin)):
     """
     Retorna opções disponíveis para filtros.
     
@@ -46,7 +51,7 @@ async def get_filters(_=Depends(require_admin)):
 
 
 @router.get("/kpis")
-async def get_kpis(
+def get_kpis(
     investidor: Optional[str] = Query(None),
     instituicao: Optional[str] = Query(None),
     tipo: Optional[str] = Query(None),
@@ -68,7 +73,7 @@ async def get_kpis(
 
 
 @router.get("/highlights")
-async def get_highlights(
+def get_highlights(
     investidor: Optional[str] = Query(None),
     instituicao: Optional[str] = Query(None),
     tipo: Optional[str] = Query(None),
@@ -90,7 +95,7 @@ async def get_highlights(
 
 
 @router.get("/allocation")
-async def get_allocation(
+def get_allocation(
     group_by: str = Query("tipo", description="Campo para agrupar: tipo, investidor, instituicao"),
     investidor: Optional[str] = Query(None),
     instituicao: Optional[str] = Query(None),
@@ -112,8 +117,38 @@ async def get_allocation(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/timeseries")
+def get_timeseries(
+    group_by: str = Query("tipo", description="Campo para agrupar: tipo, investidor, instituicao"),
+    freq: str = Query("M", description="Frequência: D (diária) ou M (mensal)"),
+    investidor: Optional[str] = Query(None),
+    instituicao: Optional[str] = Query(None),
+    tipo: Optional[str] = Query(None),
+    dt_ini: Optional[str] = Query(None),
+    dt_fim: Optional[str] = Query(None),
+    _=Depends(require_admin),
+):
+    """
+    Retorna a evolução do valor da carteira (curvas por grupo).
+    
+    Returns:
+        Dict com dates, total {aplicado, valor} e series
+    """
+    if not is_timeseries_available():
+        raise HTTPException(status_code=503, detail="Séries temporais indisponíveis (NumPy não instalado)")
+    
+    try:
+        return fetch_timeseries(
+            group_by, freq, investidor, instituicao, tipo, dt_ini, dt_fim,
+            hoje=date.today().isoformat(),
+        )
+    except Exception as e:
+        logger.error("Erro ao buscar séries temporais de investimentos: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("")
-async def get_all(
+def get_all(
     investidor: Optional[str] = Query(None),
     instituicao: Optional[str] = Query(None),
     tipo: Optional[str] = Query(None),
@@ -136,7 +171,7 @@ async def get_all(
 
 
 @router.delete("/{id_finan}")
-async def remove_investment(
+def remove_investment(
     id_finan: int,
     _=Depends(require_admin),
 ):
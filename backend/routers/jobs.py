@@ -0,0 +1,66 @@
+"""
+Router de Jobs - xFinance API
+
+Status dos jobs em segundo plano (ex: criação de diretórios após
+um novo registro).
+
+Endpoints:
+- GET /api/jobs/{id_job} - Status de um job (criador do job ou admin)
+"""
+
+import logging
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from dependencies import CurrentUser, get_current_user
+from services.jobs import get_job
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+# =============================================================================
+# SCHEMAS
+# =============================================================================
+
+class JobStatusResponse(BaseModel):
+    """Status de um job."""
+    id_job: int
+    tipo: str
+    id_princ: Optional[int] = None
+    id_user: Optional[int] = None
+    status: str  # pending | running | done | failed
+    tentativas: int
+    max_tentativas: int
+    proximo_em: Optional[str] = None
+    resultado: Optional[dict[str, Any]] = None
+    erro: Optional[str] = None
+    dt_criacao: str
+    dt_atualizacao: str
+
+
+# =============================================================================
+# GET /api/jobs/{id_job}
+# =============================================================================
+
+@router.get("/{id_job}", response_model=JobStatusResponse)
+def get_job_status(
+    id_job: int,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Retorna o status de um job em segundo plano.
+    
+    Visível apenas para o usuário que criou o job ou para admin; para os
+    demais responde 404 (não revela se o job existe).
+    """
+    job = get_job(id_job)
+    if job is None or not (current_user.is_admin or job["id_user"] == current_user.id_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job #{id_job} não encontrado"
+        )
+    return job
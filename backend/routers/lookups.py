@@ -2,18 +2,34 @@
 Router de Lookups - xFinance
 
 Endpoints para buscar opções de dropdowns.
+
+Os dados vêm do registro em memória (services.queries.lookups) e são
+servidos com ETag + Cache-Control: o navegador reutiliza a resposta e
+revalida com If-None-Match (304 sem corpo).
 """
 
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from pydantic import BaseModel
 
-from database import get_db
+from config import get_settings
 from dependencies import get_current_user, CurrentUser
+from services.queries.lookups import (
+    LookupData,
+    fetch_atividades,
+    fetch_lookup_bundle,
+    fetch_cidades,
+    fetch_contratantes,
+    fetch_inspetores,
+    fetch_segurados,
+    fetch_ufs,
+    fetch_users,
+)
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter()
 
@@ -34,43 +50,73 @@ class LookupOption(BaseModel):
     label: str
 
 
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _serve(data: LookupData, request: Request, response: Response):
+    """
+    Retorna os itens com cabeçalhos de cache, ou 304 se o cliente já
+    tem a versão atual (If-None-Match).
+    """
+    cache_control = f"private, max-age={settings.LOOKUP_CLIENT_MAX_AGE_SECONDS}"
+    
+    if request.headers.get("if-none-match") == data.etag:
+        return Response(
+            status_code=304,
+            headers={"ETag": data.etag, "Cache-Control": cache_control},
+        )
+    
+    response.headers["ETag"] = data.etag
+    response.headers["Cache-Control"] = cache_control
+    return list(data.items)
+
+
+# =============================================================================
+# GET /api/lookups/bundle - Todos os lookups numa resposta
+# =============================================================================
+
+@router.get("/bundle")
+def get_lookup_bundle(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Retorna todos os dados de referência do formulário de novo registro
+    (contratantes, segurados, atividades, UFs, usuários, inspetores e o
+    mapa UF → cidades) num único payload versionado.
+    
+    O cliente guarda o bundle pela versão e a envia em If-None-Match;
+    se não mudou, a resposta é 304 sem corpo.
+    """
+    bundle = fetch_lookup_bundle()
+    etag = f'"{bundle.version}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.LOOKUP_CLIENT_MAX_AGE_SECONDS}",
+    }
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=bundle.body, media_type="application/json", headers=headers)
+
+
 # =============================================================================
 # GET /api/lookups/users
 # =============================================================================
 
 @router.get("/users", response_model=List[UserOption])
-async def get_users(
+def get_users(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de usuários para dropdowns de encaminhamento.
     """
     logger.info("GET /lookups/users | user=%s", current_user.email)
-    
-    with get_db() as conn:
-        conn.row_factory = lambda cursor, row: dict(
-            zip([column[0] for column in cursor.description], row)
-        )
-        cursor = conn.execute(
-            """
-            SELECT id_user, short_nome, papel, ativo
-            FROM user
-            WHERE (ativo = 1 OR ativo IS NULL)
-              AND (LOWER(papel) = 'admin' OR LOWER(papel) = 'backoffice')
-            ORDER BY short_nome
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        UserOption(
-            value=row["id_user"],
-            label=row["short_nome"] or f"User {row['id_user']}",
-            papel=row["papel"] or "user",
-            ativo=bool(row["ativo"]) if row["ativo"] is not None else True
-        )
-        for row in rows
-    ]
+    return _serve(fetch_users(), request, response)
 
 
 # =============================================================================
@@ -78,7 +124,9 @@ async def get_users(
 # =============================================================================
 
 @router.get("/inspetores", response_model=List[UserOption])
-async def get_inspetores(
+def get_inspetores(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
@@ -87,31 +135,7 @@ async def get_inspetores(
     Exibe short_nome para identificação rápida.
     """
     logger.info("GET /lookups/inspetores | user=%s", current_user.email)
-    
-    with get_db() as conn:
-        conn.row_factory = lambda cursor, row: dict(
-            zip([column[0] for column in cursor.description], row)
-        )
-        cursor = conn.execute(
-            """
-            SELECT id_user, short_nome, papel, ativo
-            FROM user
-            WHERE (ativo = 1 OR ativo IS NULL)
-              AND (LOWER(papel) = 'inspetor' OR LOWER(papel) = 'admin')
-            ORDER BY short_nome
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        UserOption(
-            value=row["id_user"],
-            label=row["short_nome"] or f"User {row['id_user']}",
-            papel=row["papel"] or "Inspetor",
-            ativo=True
-        )
-        for row in rows
-    ]
+    return _serve(fetch_inspetores(), request, response)
 
 
 # =============================================================================
@@ -119,27 +143,15 @@ async def get_inspetores(
 # =============================================================================
 
 @router.get("/contratantes", response_model=List[LookupOption])
-async def get_contratantes(
+def get_contratantes(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de contratantes (players) ATIVOS.
     """
-    with get_db() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id_contr, player
-            FROM contr
-            WHERE ativo = 1 OR ativo IS NULL
-            ORDER BY player
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        LookupOption(value=row[0], label=row[1] or f"#{row[0]}")
-        for row in rows
-    ]
+    return _serve(fetch_contratantes(), request, response)
 
 
 # =============================================================================
@@ -147,26 +159,15 @@ async def get_contratantes(
 # =============================================================================
 
 @router.get("/segurados", response_model=List[LookupOption])
-async def get_segurados(
+def get_segurados(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de segurados.
     """
-    with get_db() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id_segur, segur_nome
-            FROM segur
-            ORDER BY segur_nome
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        LookupOption(value=row[0], label=row[1] or f"#{row[0]}")
-        for row in rows
-    ]
+    return _serve(fetch_segurados(), request, response)
 
 
 # =============================================================================
@@ -174,26 +175,15 @@ async def get_segurados(
 # =============================================================================
 
 @router.get("/atividades", response_model=List[LookupOption])
-async def get_atividades(
+def get_atividades(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de atividades.
     """
-    with get_db() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id_ativi, atividade
-            FROM ativi
-            ORDER BY atividade
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        LookupOption(value=row[0], label=row[1] or f"#{row[0]}")
-        for row in rows
-    ]
+    return _serve(fetch_atividades(), request, response)
 
 
 # =============================================================================
@@ -201,26 +191,15 @@ async def get_atividades(
 # =============================================================================
 
 @router.get("/ufs", response_model=List[LookupOption])
-async def get_ufs(
+def get_ufs(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de UFs.
     """
-    with get_db() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id_uf, uf_sigla
-            FROM uf
-            ORDER BY uf_sigla
-            """
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        LookupOption(value=row[0], label=row[1] or f"#{row[0]}")
-        for row in rows
-    ]
+    return _serve(fetch_ufs(), request, response)
 
 
 # =============================================================================
@@ -228,27 +207,13 @@ async def get_ufs(
 # =============================================================================
 
 @router.get("/cidades", response_model=List[LookupOption])
-async def get_cidades(
+def get_cidades(
+    request: Request,
+    response: Response,
     id_uf: int = Query(..., description="ID da UF para filtrar cidades"),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retorna lista de cidades filtradas por UF.
     """
-    with get_db() as conn:
-        cursor = conn.execute(
-            """
-            SELECT id_cidade, cidade_nome
-            FROM cidade
-            WHERE id_uf = ?
-            ORDER BY cidade_nome
-            """,
-            (id_uf,)
-        )
-        rows = cursor.fetchall()
-    
-    return [
-        LookupOption(value=row[0], label=row[1] or f"#{row[0]}")
-        for row in rows
-    ]
-
+    return _serve(fetch_cidades(id_uf), request, response)
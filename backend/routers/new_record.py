@@ -32,7 +32,8 @@ from services.queries.new_inspection import (
     get_atividade_texto,
     create_inspection_atomic,
 )
-from services.directories import create_directories
+from services.directories import enqueue_create_directories
+from services.queries.lookups import get_atividades_index, get_segurados_index
 
 logger = logging.getLogger(__name__)
 
@@ -134,6 +135,7 @@ class NewRecordResponse(BaseModel):
     message: str
     dirs_created: List[str] = []
     loc: int = 1
+    job_id: Optional[int] = None  # Criação de diretórios (GET /api/jobs/{id})
 
 
 # =============================================================================
@@ -192,25 +194,25 @@ async def create_new_record(
         )
         
         # ═══════════════════════════════════════════════════════════════════
-        # 4. CRIAR DIRETÓRIOS (usando data da inspeção)
+        # 4. CRIAR DIRETÓRIOS (job em segundo plano, data da inspeção)
         # ═══════════════════════════════════════════════════════════════════
-        dir_msg, dirs_created = create_directories(
+        job_id = enqueue_create_directories(
             id_contr=request.id_contr,
             id_segur=id_segur,
             dt_acerto=request.dt_inspecao,  # Usar data do formulário
             id_uf=request.id_uf,
             id_cidade=request.id_cidade,
             unidade=request.unidade,
+            id_princ=id_princ,
+            id_user=current_user.id_user,
         )
         
-        logger.info("Diretórios: %s | created=%s", dir_msg, dirs_created)
-        
         return NewRecordResponse(
             success=True,
             id_princ=id_princ,
-            message=f"Registro #{id_princ} criado! {dir_msg}",
-            dirs_created=dirs_created,
+            message=f"Registro #{id_princ} criado! 📁 Diretórios em criação.",
             loc=1,
+            job_id=job_id,
         )
         
     except HTTPException:
@@ -317,23 +319,25 @@ async def add_local_adicional(
                     request.id_princ, new_loc, request.unidade or "(vazio)", final_atividade or "(padrão)")
         
         # ═══════════════════════════════════════════════════════════════════
-        # 4. CRIAR DIRETÓRIOS (usando data da inspeção)
+        # 4. CRIAR DIRETÓRIOS (job em segundo plano, data da inspeção)
         # ═══════════════════════════════════════════════════════════════════
-        dir_msg, dirs_created = create_directories(
+        job_id = enqueue_create_directories(
             id_contr=id_contr,
             id_segur=id_segur,
             dt_acerto=request.dt_inspecao,  # Usar data do formulário
             id_uf=request.id_uf,
             id_cidade=request.id_cidade,
             unidade=request.unidade,
+            id_princ=request.id_princ,
+            id_user=current_user.id_user,
         )
         
         return NewRecordResponse(
             success=True,
             id_princ=request.id_princ,
-            message=f"Local #{new_loc} adicionado! {dir_msg}",
-            dirs_created=dirs_created,
+            message=f"Local #{new_loc} adicionado! 📁 Diretórios em criação.",
             loc=new_loc,
+            job_id=job_id,
         )
         
     except HTTPException:
@@ -351,7 +355,7 @@ async def add_local_adicional(
 # =============================================================================
 
 @router.get("/segurados", response_model=List[LookupOption])
-async def search_segurados(
+def search_segurados(
     q: str = Query("", description="Texto para buscar"),
     limit: int = Query(50, ge=1, le=200, description="Limite de resultados"),
     current_user: CurrentUser = Depends(require_admin),
@@ -359,39 +363,26 @@ async def search_segurados(
     """
     Busca segurados com filtro de texto (server-side).
     
+    Com filtro: índice em memória (ignora acentos e caixa), ranqueado por
+    prefixo → prefixo de palavra → substring.
     Se q vazio, retorna os mais recentemente usados.
     """
+    if q.strip():
+        return get_segurados_index().search(q, limit)
+    
     with get_db() as conn:
-        if q.strip():
-            # Com filtro: busca por LIKE (normalizado para ignorar acentos e case)
-            cursor = conn.execute(
-                """
-                SELECT id_segur, segur_nome
-                FROM segur
-                WHERE normalize(segur_nome) LIKE normalize(?)
-                ORDER BY segur_nome
-                LIMIT ?
-                """,
-                (f"%{q}%", limit)
-            )
-        else:
-            # Sem filtro: retorna mais recentemente usados
-            # COALESCE para compatibilidade com SQLite (NULLS LAST não suportado)
-            cursor = conn.execute(
-                """
-                SELECT s.id_segur, s.segur_nome
-                FROM segur s
-                LEFT JOIN (
-                    SELECT id_segur, MAX(id_princ) as ultimo
-                    FROM princ
-                    GROUP BY id_segur
-                ) p ON s.id_segur = p.id_segur
-                ORDER BY COALESCE(p.ultimo, 0) DESC, s.segur_nome
-                LIMIT ?
-                """,
-                (limit,)
-            )
-        
+        # Sem filtro: retorna mais recentemente usados
+        # ultimo_princ mantido por trigger (scripts/add_lookup_usage_stats.py);
+        # NULL (nunca usado) fica por último no DESC → leitura top-N pelo índice
+        cursor = conn.execute(
+            """
+            SELECT id_segur, segur_nome
+            FROM segur
+            ORDER BY ultimo_princ DESC, segur_nome
+            LIMIT ?
+            """,
+            (limit,)
+        )
         rows = cursor.fetchall()
     
     return [
@@ -405,7 +396,7 @@ async def search_segurados(
 # =============================================================================
 
 @router.get("/atividades", response_model=List[LookupOption])
-async def search_atividades(
+def search_atividades(
     q: str = Query("", description="Texto para buscar"),
     limit: int = Query(50, ge=1, le=200, description="Limite de resultados"),
     current_user: CurrentUser = Depends(require_admin),
@@ -413,39 +404,25 @@ async def search_atividades(
     """
     Busca atividades com filtro de texto (server-side).
     
+    Com filtro: índice em memória (ignora acentos e caixa), ranqueado por
+    prefixo → prefixo de palavra → substring.
     Se q vazio, retorna as mais usadas.
     """
+    if q.strip():
+        return get_atividades_index().search(q, limit)
+    
     with get_db() as conn:
-        if q.strip():
-            # Com filtro: busca por LIKE (normalizado para ignorar acentos e case)
-            cursor = conn.execute(
-                """
-                SELECT id_ativi, atividade
-                FROM ativi
-                WHERE normalize(atividade) LIKE normalize(?)
-                ORDER BY atividade
-                LIMIT ?
-                """,
-                (f"%{q}%", limit)
-            )
-        else:
-            # Sem filtro: retorna mais usadas
-            # COALESCE para compatibilidade com SQLite (NULLS LAST não suportado)
-            cursor = conn.execute(
-                """
-                SELECT a.id_ativi, a.atividade
-                FROM ativi a
-                LEFT JOIN (
-                    SELECT id_ativi, COUNT(*) as uso
-                    FROM princ
-                    GROUP BY id_ativi
-                ) p ON a.id_ativi = p.id_ativi
-                ORDER BY COALESCE(p.uso, 0) DESC, a.atividade
-                LIMIT ?
-                """,
-                (limit,)
-            )
-        
+        # Sem filtro: retorna mais usadas
+        # uso_count mantido por trigger (scripts/add_lookup_usage_stats.py)
+        cursor = conn.execute(
+            """
+            SELECT id_ativi, atividade
+            FROM ativi
+            ORDER BY uso_count DESC, atividade
+            LIMIT ?
+            """,
+            (limit,)
+        )
         rows = cursor.fetchall()
     
     return [
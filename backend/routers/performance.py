@@ -71,7 +71,7 @@ def require_financial_access(current_user: CurrentUser = Depends(get_current_use
 # =============================================================================
 
 @router.get("/filters")
-async def get_filters(
+def get_filters(
     current_user: CurrentUser = Depends(require_financial_access),
 ):
     """
@@ -100,7 +100,7 @@ async def get_filters(
 # =============================================================================
 
 @router.get("/kpis")
-async def get_kpis(
+def get_kpis(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
@@ -146,7 +146,7 @@ async def get_kpis(
 # =============================================================================
 
 @router.get("/kpis-extended")
-async def get_kpis_extended(
+def get_kpis_extended(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
@@ -200,7 +200,7 @@ async def get_kpis_extended(
 # =============================================================================
 
 @router.get("/market")
-async def get_market_share(
+def get_market_share(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
@@ -243,7 +243,7 @@ async def get_market_share(
 # =============================================================================
 
 @router.get("/business")
-async def get_business(
+def get_business(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
@@ -289,7 +289,7 @@ async def get_business(
 # =============================================================================
 
 @router.get("/operational")
-async def get_operational(
+def get_operational(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
@@ -332,7 +332,7 @@ async def get_operational(
 # =============================================================================
 
 @router.get("/details")
-async def get_details(
+def get_details(
     current_user: CurrentUser = Depends(require_financial_access),
     base_date: Literal["dt_envio", "dt_pago", "dt_acerto"] = Query("dt_envio"),
     ano_ini: Optional[int] = Query(None, ge=2000, le=2100),
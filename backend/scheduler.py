@@ -3,6 +3,10 @@ Agendador de Tarefas - xFinance
 
 Usa APScheduler para executar backups automáticos do banco de dados.
 Backups a cada 2 horas, entre 07:00 e 19:00, de segunda a sexta.
+Banco de auditoria (xFinanceAudit.db): backup diário às 20:00, segunda a sexta.
+Retenção da auditoria: limpeza em lotes diária às 02:30.
+Arquivo frio da auditoria: dia 1 de cada mês às 03:00.
+Fila de jobs: remoção diária dos jobs finalizados antigos às 02:45.
 
 NOTA: O scheduler pode ser desabilitado via variável de ambiente
 XF_ENABLE_SCHEDULER=false (útil em ambiente de desenvolvimento).
@@ -13,7 +17,10 @@ import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from services.backup import create_backup
+from services.audit import cleanup_expired
+from services.audit_archive import archive_closed_months
+from services.backup import create_audit_backup, create_backup
+from services.jobs import purge_old_jobs
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +50,65 @@ def _run_scheduled_backup():
         logger.error("SCHEDULER: Erro no backup automático - %s", e)
 
 
+def _run_scheduled_audit_backup():
+    """
+    Executa backup agendado do banco de auditoria.
+    """
+    logger.info("SCHEDULER: Iniciando backup da auditoria...")
+    
+    try:
+        success, message = create_audit_backup()
+        
+        if success:
+            logger.info("SCHEDULER: Backup da auditoria concluído - %s", message)
+        else:
+            logger.warning("SCHEDULER: Backup da auditoria falhou - %s", message)
+            
+    except Exception as e:
+        logger.error("SCHEDULER: Erro no backup da auditoria - %s", e)
+
+
+def _run_scheduled_audit_cleanup():
+    """
+    Executa limpeza de retenção da auditoria (em lotes).
+    Progresso disponível em GET /api/audit/stats.
+    """
+    logger.info("SCHEDULER: Iniciando limpeza de retenção da auditoria...")
+    
+    try:
+        deleted = cleanup_expired()
+        logger.info("SCHEDULER: Limpeza da auditoria concluída - %d registro(s)", deleted)
+    except Exception as e:
+        logger.error("SCHEDULER: Erro na limpeza da auditoria - %s", e)
+
+
+def _run_scheduled_audit_archive():
+    """
+    Move meses fechados da auditoria para o arquivo frio.
+    """
+    logger.info("SCHEDULER: Iniciando arquivamento da auditoria...")
+    
+    try:
+        result = archive_closed_months()
+        logger.info(
+            "SCHEDULER: Arquivamento concluído - %d mês(es), %d registro(s)",
+            len(result["months"]), result["rows"]
+        )
+    except Exception as e:
+        logger.error("SCHEDULER: Erro no arquivamento da auditoria - %s", e)
+
+
+def _run_scheduled_jobs_purge():
+    """
+    Remove jobs finalizados além de JOBS_RETENTION_DAYS.
+    """
+    try:
+        deleted = purge_old_jobs()
+        logger.info("SCHEDULER: Limpeza da fila de jobs concluída - %d job(s)", deleted)
+    except Exception as e:
+        logger.error("SCHEDULER: Erro na limpeza da fila de jobs - %s", e)
+
+
 def start_scheduler():
     """
     Inicia o agendador de backups.
@@ -88,12 +154,50 @@ def start_scheduler():
             replace_existing=True,
         )
         
+        # Backup do banco de auditoria: 1x ao dia, após o expediente
+        scheduler.add_job(
+            _run_scheduled_audit_backup,
+            trigger=CronTrigger(hour=20, minute=0, day_of_week="mon-fri"),
+            id="audit_backup_job",
+            name="Backup automático do banco de auditoria",
+            replace_existing=True,
+        )
+        
+        # Retenção da auditoria: fora do horário de uso
+        scheduler.add_job(
+            _run_scheduled_audit_cleanup,
+            trigger=CronTrigger(hour=2, minute=30),
+            id="audit_cleanup_job",
+            name="Limpeza de retenção da auditoria",
+            replace_existing=True,
+        )
+        
+        # Arquivo frio da auditoria: meses fechados, 1x por mês
+        scheduler.add_job(
+            _run_scheduled_audit_archive,
+            trigger=CronTrigger(day=1, hour=3, minute=0),
+            id="audit_archive_job",
+            name="Arquivamento da auditoria",
+            replace_existing=True,
+        )
+        
+        # Fila de jobs: remove jobs finalizados antigos (além do start da API)
+        scheduler.add_job(
+            _run_scheduled_jobs_purge,
+            trigger=CronTrigger(hour=2, minute=45),
+            id="jobs_purge_job",
+            name="Limpeza da fila de jobs",
+            replace_existing=True,
+        )
+        
         scheduler.start()
         
         logger.info("=" * 50)
         logger.info("SCHEDULER: Agendador de backup iniciado")
         logger.info("SCHEDULER: Horários: 07, 09, 11, 13, 15, 17, 19h")
         logger.info("SCHEDULER: Dias: Segunda a Sexta")
+        logger.info("SCHEDULER: Auditoria: backup 20h (Seg-Sex), limpeza 02:30, arquivo dia 1")
+        logger.info("SCHEDULER: Fila de jobs: limpeza 02:45")
         logger.info("=" * 50)
         
     except Exception as e:
@@ -0,0 +1,216 @@
+"""
+Script de Migracao: Estatisticas de uso em segur e ativi
+
+As sugestoes padrao (busca vazia) de segurados e atividades agregavam
+toda a tabela princ a cada abertura do campo. Esta migracao:
+1. Adiciona as colunas 'uso_count' e 'ultimo_princ' em segur e ativi
+2. Preenche (backfill) a partir de princ
+3. Cria triggers em princ (INSERT/UPDATE/DELETE) que mantem as colunas
+   (inclusive create_inspection_atomic e escritas do sistema legado)
+4. Cria indices para leitura top-N (recentes / mais usados)
+
+Execucao:
+    python backend/scripts/add_lookup_usage_stats.py
+
+IMPORTANTE: Faca backup do banco antes de executar!
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+# Adicionar path do backend para imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Determinar caminho do banco
+DB_PATH = os.getenv(
+    "XF_DB_PATH",
+    r"E:\MVRX\Financeiro\xFinance_3.0\x_db\xFinanceDB.db"
+)
+
+# (tabela, chave, coluna em princ)
+TARGETS = [
+    ("segur", "id_segur", "id_segur"),
+    ("ativi", "id_ativi", "id_ativi"),
+]
+
+COLUMNS = [
+    ("uso_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("ultimo_princ", "INTEGER DEFAULT NULL"),
+]
+
+INDEXES = [
+    ("idx_segur_ultimo_princ", "segur", "ultimo_princ DESC, segur_nome"),
+    ("idx_ativi_uso_count", "ativi", "uso_count DESC, atividade"),
+]
+
+
+def _recalc_expr(col: str, ref: str) -> str:
+    """Expressao que recalcula ultimo_princ a partir de princ (usa idx_princ_<col>)."""
+    return f"(SELECT MAX(id_princ) FROM princ WHERE {col} = {ref})"
+
+
+def build_triggers(table: str, key: str, col: str) -> list[tuple[str, str]]:
+    """Triggers de manutencao das estatisticas de uma tabela."""
+    return [
+        (
+            f"trg_princ_{table}_uso_ins",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_princ_{table}_uso_ins
+            AFTER INSERT ON princ
+            WHEN NEW.{col} IS NOT NULL
+            BEGIN
+                UPDATE {table}
+                SET uso_count = uso_count + 1,
+                    ultimo_princ = MAX(COALESCE(ultimo_princ, 0), NEW.id_princ)
+                WHERE {key} = NEW.{col};
+            END
+            """,
+        ),
+        (
+            f"trg_princ_{table}_uso_upd",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_princ_{table}_uso_upd
+            AFTER UPDATE OF {col} ON princ
+            WHEN OLD.{col} IS NOT NEW.{col}
+            BEGIN
+                UPDATE {table}
+                SET uso_count = MAX(uso_count - 1, 0),
+                    ultimo_princ = {_recalc_expr(col, f"OLD.{col}")}
+                WHERE {key} = OLD.{col};
+                UPDATE {table}
+                SET uso_count = uso_count + 1,
+                    ultimo_princ = MAX(COALESCE(ultimo_princ, 0), NEW.id_princ)
+                WHERE {key} = NEW.{col};
+            END
+            """,
+        ),
+        (
+            f"trg_princ_{table}_uso_del",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_princ_{table}_uso_del
+            AFTER DELETE ON princ
+            WHEN OLD.{col} IS NOT NULL
+            BEGIN
+                UPDATE {table}
+                SET uso_count = MAX(uso_count - 1, 0),
+                    ultimo_princ = {_recalc_expr(col, f"OLD.{col}")}
+                WHERE {key} = OLD.{col};
+            END
+            """,
+        ),
+    ]
+
+
+def check_column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Verifica se uma coluna ja existe na tabela."""
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column in columns
+
+
+def run_migration():
+    """Executa a migracao das estatisticas de uso."""
+    
+    print("=" * 60)
+    print("MIGRACAO: Estatisticas de uso (segur / ativi)")
+    print("=" * 60)
+    print(f"Banco: {DB_PATH}")
+    print(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    
+    if not os.path.exists(DB_PATH):
+        print(f"[ERRO] Banco de dados nao encontrado: {DB_PATH}")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(DB_PATH)
+    
+    try:
+        # =====================================================================
+        # 1. Colunas
+        # =====================================================================
+        print("[1/4] Verificando colunas...")
+        
+        for table, _key, _col in TARGETS:
+            for column, ddl in COLUMNS:
+                if check_column_exists(conn, table, column):
+                    print(f"      [AVISO] {table}.{column} ja existe. Pulando.")
+                else:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+                    print(f"      [OK] {table}.{column} adicionada!")
+        
+        # =====================================================================
+        # 2. Backfill
+        # =====================================================================
+        print("[2/4] Preenchendo estatisticas a partir de princ...")
+        
+        for table, key, col in TARGETS:
+            cursor = conn.execute(
+                f"""
+                UPDATE {table}
+                SET uso_count = COALESCE(
+                        (SELECT COUNT(*) FROM princ p WHERE p.{col} = {table}.{key}), 0
+                    ),
+                    ultimo_princ = (SELECT MAX(id_princ) FROM princ p WHERE p.{col} = {table}.{key})
+                """
+            )
+            print(f"      [OK] {table}: {cursor.rowcount} registro(s) atualizado(s)")
+        
+        # =====================================================================
+        # 3. Triggers de manutencao
+        # =====================================================================
+        print("[3/4] Criando triggers em princ...")
+        
+        for table, key, col in TARGETS:
+            for name, ddl in build_triggers(table, key, col):
+                conn.execute(ddl)
+                print(f"      [OK] {name}")
+        
+        # =====================================================================
+        # 4. Indices top-N
+        # =====================================================================
+        print("[4/4] Criando indices...")
+        
+        for name, table, columns in INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            print(f"      [OK] {name}")
+        
+        conn.commit()
+        
+        # =====================================================================
+        # Verificacao final
+        # =====================================================================
+        print()
+        print("=" * 60)
+        print("VERIFICACAO FINAL")
+        print("=" * 60)
+        
+        for table, key, col in TARGETS:
+            divergentes = conn.execute(
+                f"""
+                SELECT COUNT(*) FROM {table} t
+                LEFT JOIN (
+                    SELECT {col} AS ref, COUNT(*) AS uso, MAX(id_princ) AS ultimo
+                    FROM princ GROUP BY {col}
+                ) p ON p.ref = t.{key}
+                WHERE t.uso_count != COALESCE(p.uso, 0)
+                   OR t.ultimo_princ IS NOT p.ultimo
+                """
+            ).fetchone()[0]
+            status = "[OK]" if divergentes == 0 else "[ERRO]"
+            print(f"  {table}: {divergentes} registro(s) divergente(s) {status}")
+        
+        print()
+        print("Migracao concluida com sucesso!")
+    
+    except Exception as e:
+        print(f"[ERRO] durante migracao: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
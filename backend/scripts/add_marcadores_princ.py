@@ -0,0 +1,256 @@
+"""
+Script de Migracao: Marcadores empacotados em princ.marcadores
+
+Toda query do grid fazia LEFT JOIN em tempstate apenas para ler 4
+marcadores (0-3). Esta migracao:
+1. Adiciona a coluna 'marcadores' em princ (2 bits por marcador)
+2. Preenche (backfill) a partir de tempstate
+3. Cria triggers em tempstate (INSERT e UPDATE OF <coluna>, um por
+   marcador) que repassam escritas do sistema legado para
+   princ.marcadores, trocando apenas os bits da coluna escrita
+4. Cria o trigger inverso em princ (UPDATE OF marcadores) que espelha
+   as escritas da API em tempstate, lida pelo sistema legado
+
+Layout (mesmo de services/queries/markers.py):
+    bits 0-1: state_loc
+    bits 2-3: state_dt_envio
+    bits 4-5: state_dt_denvio
+    bits 6-7: state_dt_pago
+
+A tabela tempstate e mantida (legado); a API passa a ler e gravar
+somente princ.marcadores e o trigger inverso mantem tempstate em dia.
+
+Os dois sentidos nao entram em laco: com recursive_triggers desligado
+(padrao do SQLite) um trigger nao dispara de novo enquanto esta na pilha,
+e o trigger de princ so age quando marcadores realmente muda.
+
+Execucao:
+    python backend/scripts/add_marcadores_princ.py
+
+IMPORTANTE: Faca backup do banco antes de executar!
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+# Adicionar path do backend para imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Determinar caminho do banco
+DB_PATH = os.getenv(
+    "XF_DB_PATH",
+    r"E:\MVRX\Financeiro\xFinance_3.0\x_db\xFinanceDB.db"
+)
+
+# (coluna em tempstate, deslocamento em princ.marcadores)
+MARKERS = [
+    ("state_loc", 0),
+    ("state_dt_envio", 2),
+    ("state_dt_denvio", 4),
+    ("state_dt_pago", 6),
+]
+
+
+def pack_expr(ref: str) -> str:
+    """Expressao SQL que empacota os marcadores de uma linha de tempstate."""
+    return " | ".join(
+        f"((COALESCE({ref}.{col}, 0) & 3) << {shift})" for col, shift in MARKERS
+    )
+
+
+def column_expr(ref: str, col: str, shift: int) -> str:
+    """Expressao SQL que troca apenas os 2 bits de um marcador em princ.marcadores."""
+    return (
+        f"(COALESCE(marcadores, 0) & ~{3 << shift}) "
+        f"| ((COALESCE({ref}.{col}, 0) & 3) << {shift})"
+    )
+
+
+def build_triggers() -> list[tuple[str, str]]:
+    """
+    Triggers que repassam escritas legadas em tempstate para princ.marcadores.
+    
+    Um trigger por coluna (INSERT e UPDATE OF <coluna>), cada um trocando
+    apenas os bits daquele marcador: a linha de tempstate fica desatualizada
+    depois que a API passa a gravar so em princ, entao nunca e copiada
+    inteira. DELETE nao propaga (o legado so apaga linhas ja zeradas).
+    """
+    triggers = []
+    for col, shift in MARKERS:
+        ins = f"trg_tempstate_{col}_ins"
+        triggers.append((
+            ins,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {ins}
+            AFTER INSERT ON tempstate
+            WHEN COALESCE(NEW.{col}, 0) != 0
+            BEGIN
+                UPDATE princ SET marcadores = {column_expr("NEW", col, shift)}
+                WHERE id_princ = NEW.state_id_princ;
+            END
+            """,
+        ))
+        upd = f"trg_tempstate_{col}_upd"
+        triggers.append((
+            upd,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {upd}
+            AFTER UPDATE OF {col} ON tempstate
+            BEGIN
+                UPDATE princ SET marcadores = {column_expr("NEW", col, shift)}
+                WHERE id_princ = NEW.state_id_princ;
+            END
+            """,
+        ))
+    triggers.append((PRINC_SYNC_TRIGGER, build_princ_sync_trigger()))
+    return triggers
+
+
+PRINC_SYNC_TRIGGER = "trg_princ_marcadores_tempstate"
+
+
+def build_princ_sync_trigger() -> str:
+    """
+    Trigger que espelha princ.marcadores em tempstate (leitura do legado).
+    
+    Mesmo formato das escritas antigas da API: cria a linha quando algum
+    marcador e aplicado, atualiza as 4 colunas e remove a linha quando
+    todos voltam a 0.
+    """
+    assignments = ",\n                    ".join(
+        f"{col} = (NEW.marcadores >> {shift}) & 3" for col, shift in MARKERS
+    )
+    return f"""
+            CREATE TRIGGER IF NOT EXISTS {PRINC_SYNC_TRIGGER}
+            AFTER UPDATE OF marcadores ON princ
+            WHEN OLD.marcadores IS NOT NEW.marcadores
+            BEGIN
+                INSERT OR IGNORE INTO tempstate (state_id_princ)
+                SELECT NEW.id_princ WHERE NEW.marcadores != 0;
+                UPDATE tempstate SET
+                    {assignments}
+                WHERE state_id_princ = NEW.id_princ;
+                DELETE FROM tempstate
+                WHERE state_id_princ = NEW.id_princ AND NEW.marcadores = 0;
+            END
+            """
+
+
+# Triggers da primeira versao (regravavam os 4 marcadores a partir de tempstate)
+OBSOLETE_TRIGGERS = (
+    "trg_tempstate_marcadores_ins",
+    "trg_tempstate_marcadores_upd",
+    "trg_tempstate_marcadores_del",
+)
+
+
+def check_column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Verifica se uma coluna ja existe na tabela."""
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column in columns
+
+
+def run_migration():
+    """Executa a migracao dos marcadores."""
+    
+    print("=" * 60)
+    print("MIGRACAO: Marcadores em princ.marcadores")
+    print("=" * 60)
+    print(f"Banco: {DB_PATH}")
+    print(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    
+    if not os.path.exists(DB_PATH):
+        print(f"[ERRO] Banco de dados nao encontrado: {DB_PATH}")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(DB_PATH)
+    
+    try:
+        # =====================================================================
+        # 1. Coluna
+        # =====================================================================
+        print("[1/3] Verificando coluna...")
+        
+        added = not check_column_exists(conn, "princ", "marcadores")
+        if added:
+            conn.execute("ALTER TABLE princ ADD COLUMN marcadores INTEGER NOT NULL DEFAULT 0")
+            print("      [OK] princ.marcadores adicionada!")
+        else:
+            print("      [AVISO] princ.marcadores ja existe. Pulando.")
+        
+        # =====================================================================
+        # 2. Backfill
+        # =====================================================================
+        print("[2/3] Preenchendo marcadores a partir de tempstate...")
+        
+        # So na primeira execucao: depois disso a API grava apenas em princ
+        # e tempstate fica desatualizada
+        if added:
+            cursor = conn.execute(
+                f"""
+                UPDATE princ
+                SET marcadores = COALESCE(
+                    (SELECT {pack_expr("ts")} FROM tempstate ts WHERE ts.state_id_princ = princ.id_princ),
+                    0
+                )
+                """
+            )
+            print(f"      [OK] {cursor.rowcount} registro(s) processado(s)")
+        else:
+            print("      [AVISO] Coluna ja existia. Backfill nao executado.")
+        
+        # =====================================================================
+        # 3. Triggers de compatibilidade (escritas legadas em tempstate)
+        # =====================================================================
+        print("[3/3] Criando triggers (tempstate <-> princ)...")
+        
+        for name in OBSOLETE_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        
+        for name, ddl in build_triggers():
+            conn.execute(ddl)
+            print(f"      [OK] {name}")
+        
+        conn.commit()
+        
+        # =====================================================================
+        # Verificacao final
+        # =====================================================================
+        print()
+        print("=" * 60)
+        print("VERIFICACAO FINAL")
+        print("=" * 60)
+        
+        marcados = conn.execute("SELECT COUNT(*) FROM princ WHERE marcadores != 0").fetchone()[0]
+        print(f"  princ com marcador: {marcados}")
+        
+        # Comparacao com tempstate so vale logo apos o backfill
+        if added:
+            for col, shift in MARKERS:
+                divergentes = conn.execute(
+                    f"""
+                    SELECT COUNT(*) FROM princ p
+                    LEFT JOIN tempstate ts ON ts.state_id_princ = p.id_princ
+                    WHERE ((p.marcadores >> {shift}) & 3) != (COALESCE(ts.{col}, 0) & 3)
+                    """
+                ).fetchone()[0]
+                status = "[OK]" if divergentes == 0 else "[ERRO]"
+                print(f"  {col}: {divergentes} registro(s) divergente(s) {status}")
+        
+        print()
+        print("Migracao concluida com sucesso!")
+    
+    except Exception as e:
+        print(f"[ERRO] durante migracao: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,146 @@
+"""
+Script de Migracao: Coluna numerica 'rentabilidade_num' na tabela finan
+
+`finan.rentabilidade` e TEXT (ex: "12,5%"). Esta migracao:
+1. Adiciona a coluna REAL 'rentabilidade_num'
+2. Preenche (backfill) a partir do texto existente
+3. Cria triggers que mantem a coluna sincronizada em INSERT/UPDATE
+   (inclusive escritas feitas fora da API, ex: sistema legado)
+
+Execucao:
+    python backend/scripts/add_rentabilidade_num.py
+
+IMPORTANTE: Faca backup do banco antes de executar!
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+# Adicionar path do backend para imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Determinar caminho do banco
+DB_PATH = os.getenv(
+    "XF_DB_PATH",
+    r"E:\MVRX\Financeiro\xFinance_3.0\x_db\xFinanceDB.db"
+)
+
+# Conversao TEXT -> REAL (como o antigo _parse_rentabilidade: remove '%',
+# troca ',' por '.'). Diferenca: o CAST do SQLite usa o prefixo numerico
+# ("12.5abc" -> 12.5; antes 0.0); texto sem numero vira 0.0
+PARSE_EXPR = "CAST(REPLACE(REPLACE(TRIM({col}), '%', ''), ',', '.') AS REAL)"
+
+TRIGGERS = [
+    (
+        "trg_finan_rentab_ins",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_finan_rentab_ins
+        AFTER INSERT ON finan
+        BEGIN
+            UPDATE finan
+            SET rentabilidade_num = {PARSE_EXPR.format(col="NEW.rentabilidade")}
+            WHERE id_finan = NEW.id_finan;
+        END
+        """,
+    ),
+    (
+        "trg_finan_rentab_upd",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_finan_rentab_upd
+        AFTER UPDATE OF rentabilidade ON finan
+        BEGIN
+            UPDATE finan
+            SET rentabilidade_num = {PARSE_EXPR.format(col="NEW.rentabilidade")}
+            WHERE id_finan = NEW.id_finan;
+        END
+        """,
+    ),
+]
+
+
+def check_column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Verifica se uma coluna ja existe na tabela."""
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in cursor.fetchall()]
+    return column in columns
+
+
+def run_migration():
+    """Executa a migracao da coluna 'rentabilidade_num'."""
+    
+    print("=" * 60)
+    print("MIGRACAO: Coluna numerica 'rentabilidade_num' (finan)")
+    print("=" * 60)
+    print(f"Banco: {DB_PATH}")
+    print(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    
+    if not os.path.exists(DB_PATH):
+        print(f"[ERRO] Banco de dados nao encontrado: {DB_PATH}")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(DB_PATH)
+    
+    try:
+        # =====================================================================
+        # 1. Coluna
+        # =====================================================================
+        print("[1/3] Verificando coluna 'rentabilidade_num'...")
+        
+        if check_column_exists(conn, "finan", "rentabilidade_num"):
+            print("      [AVISO] Coluna ja existe em 'finan'. Pulando.")
+        else:
+            conn.execute("ALTER TABLE finan ADD COLUMN rentabilidade_num REAL DEFAULT NULL")
+            print("      [OK] Coluna 'rentabilidade_num' adicionada!")
+        
+        # =====================================================================
+        # 2. Backfill
+        # =====================================================================
+        print("[2/3] Preenchendo valores a partir de 'rentabilidade'...")
+        
+        cursor = conn.execute(
+            f"UPDATE finan SET rentabilidade_num = {PARSE_EXPR.format(col='rentabilidade')}"
+        )
+        print(f"      [OK] {cursor.rowcount} registro(s) atualizado(s)")
+        
+        # =====================================================================
+        # 3. Triggers de sincronizacao
+        # =====================================================================
+        print("[3/3] Criando triggers de sincronizacao...")
+        
+        for name, ddl in TRIGGERS:
+            conn.execute(ddl)
+            print(f"      [OK] {name}")
+        
+        conn.commit()
+        
+        # =====================================================================
+        # Verificacao final
+        # =====================================================================
+        print()
+        print("=" * 60)
+        print("VERIFICACAO FINAL")
+        print("=" * 60)
+        
+        pendentes = conn.execute(
+            "SELECT COUNT(*) FROM finan "
+            "WHERE rentabilidade IS NOT NULL AND rentabilidade_num IS NULL"
+        ).fetchone()[0]
+        status = "[OK]" if pendentes == 0 else "[ERRO]"
+        print(f"  finan.rentabilidade_num sem valor: {pendentes} {status}")
+        
+        print()
+        print("Migracao concluida com sucesso!")
+    
+    except Exception as e:
+        print(f"[ERRO] durante migracao: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,218 @@
+"""
+Benchmark: marcadores em /api/acoes/marcar
+
+Compara a implementação antiga (tempstate, 3 comandos por id:
+INSERT OR IGNORE, UPDATE e DELETE) com services/queries/markers.py
+(princ.marcadores, 1 UPDATE bit a bit para todos os ids).
+
+Roda num banco SQLite temporário (não toca no banco de produção), com
+as mesmas tabelas/índice único do tempstate.
+
+O banco de princ.marcadores recebe os triggers de compatibilidade de
+scripts/add_marcadores_princ.py (o custo do espelho em tempstate entra
+na medição), e o script verifica:
+- escrita da API aparece em tempstate (leitura do sistema legado)
+- escrita legada de uma coluna em tempstate não altera os outros marcadores
+
+Execução:
+    python backend/scripts/bench_marcar.py [linhas] [repeticoes]
+
+Padrão: 1000 linhas selecionadas, 20 repetições.
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Adicionar path do backend para imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.queries.markers import MARKER_TYPES, set_markers_with_conn, unpack_markers
+
+# Mesmo diretório (scripts/)
+from add_marcadores_princ import build_triggers
+
+MARKER = "state_dt_envio"
+
+
+def create_db(path: str, rows: int, triggers: bool = False) -> None:
+    """Banco de teste: princ mínimo + tempstate (1/3 das linhas já marcadas nos dois)."""
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE princ (id_princ INTEGER PRIMARY KEY, marcadores INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE tempstate (
+            id_state INTEGER PRIMARY KEY AUTOINCREMENT,
+            state_id_princ INTEGER NOT NULL,
+            state_dt_envio INTEGER DEFAULT 0,
+            state_dt_denvio INTEGER DEFAULT 0,
+            state_loc INTEGER,
+            state_dt_pago INTEGER DEFAULT 0,
+            UNIQUE (state_id_princ)
+        );
+        CREATE UNIQUE INDEX idx_tempstate_id_princ ON tempstate (state_id_princ);
+        """
+    )
+    conn.executemany("INSERT INTO princ (id_princ) VALUES (?)", [(i,) for i in range(1, rows * 5 + 1)])
+    conn.executemany(
+        "INSERT INTO tempstate (state_id_princ, state_loc) VALUES (?, 1)",
+        [(i,) for i in range(1, rows * 5 + 1, 3)]
+    )
+    conn.execute("UPDATE princ SET marcadores = 1 WHERE id_princ % 3 = 1")
+    if triggers:
+        for _name, ddl in build_triggers():
+            conn.execute(ddl)
+    conn.commit()
+    conn.close()
+
+
+def marcar_loop(conn: sqlite3.Connection, ids: list[int], marker_type: str, value: int) -> int:
+    """Implementação anterior do endpoint (3 comandos por id)."""
+    updated = 0
+    for id_princ in ids:
+        conn.execute("INSERT OR IGNORE INTO tempstate (state_id_princ) VALUES (?)", (id_princ,))
+        cursor = conn.execute(
+            f"UPDATE tempstate SET {marker_type} = ? WHERE state_id_princ = ?",
+            (value, id_princ)
+        )
+        if cursor.rowcount > 0:
+            updated += 1
+        if value == 0:
+            conn.execute(
+                """
+                DELETE FROM tempstate
+                WHERE state_id_princ = ?
+                  AND COALESCE(state_loc, 0) = 0
+                  AND COALESCE(state_dt_envio, 0) = 0
+                  AND COALESCE(state_dt_denvio, 0) = 0
+                  AND COALESCE(state_dt_pago, 0) = 0
+                """,
+                (id_princ,)
+            )
+    return updated
+
+
+def snapshot_tempstate(conn: sqlite3.Connection) -> dict[int, tuple]:
+    """Marcadores por id_princ (implementação antiga)."""
+    return {
+        row[0]: tuple(v or 0 for v in row[1:])
+        for row in conn.execute(
+            "SELECT state_id_princ, state_loc, state_dt_envio, state_dt_denvio, state_dt_pago FROM tempstate"
+        )
+    }
+
+
+def snapshot_princ(conn: sqlite3.Connection) -> dict[int, tuple]:
+    """Marcadores não zerados por id_princ (princ.marcadores)."""
+    state = {}
+    for id_princ, marcadores in conn.execute("SELECT id_princ, marcadores FROM princ WHERE marcadores != 0"):
+        markers = unpack_markers(marcadores)
+        state[id_princ] = tuple(markers[m] for m in MARKER_TYPES)
+    return state
+
+
+def bench(path: str, fn, snapshot, ids: list[int], repeat: int) -> tuple[float, float, dict[int, tuple]]:
+    """Mediana (ms) de marcar (valor 2) e desmarcar (valor 0) + estado final."""
+    conn = sqlite3.connect(path)
+    mark_ms, unmark_ms = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn, ids, MARKER, 2)
+        conn.commit()
+        mark_ms.append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        fn(conn, ids, MARKER, 0)
+        conn.commit()
+        unmark_ms.append((time.perf_counter() - start) * 1000)
+    
+    state = snapshot(conn)
+    conn.close()
+    return statistics.median(mark_ms), statistics.median(unmark_ms), state
+
+
+def check_legacy_write(path: str) -> bool:
+    """
+    Marca pela API (princ.marcadores), confere o espelho em tempstate e
+    depois grava uma coluna pelo legado (INSERT OR IGNORE + UPDATE em
+    tempstate): só o marcador escrito muda.
+    """
+    create_db(path, 10, triggers=True)
+    conn = sqlite3.connect(path)
+    
+    # id 1: linha já existente em tempstate (state_loc = 1); id 2: sem linha
+    ids = [1, 2]
+    set_markers_with_conn(conn, ids, "state_loc", 3)
+    set_markers_with_conn(conn, ids, "state_dt_envio", 2)
+    conn.commit()
+    
+    # Espelho em tempstate (mesma ordem de MARKER_TYPES)
+    mirrored = snapshot_tempstate(conn)
+    ok = all(mirrored.get(id_princ) == (3, 2, 0, 0) for id_princ in ids)
+    
+    for id_princ in ids:
+        conn.execute("INSERT OR IGNORE INTO tempstate (state_id_princ) VALUES (?)", (id_princ,))
+        conn.execute("UPDATE tempstate SET state_dt_pago = 1 WHERE state_id_princ = ?", (id_princ,))
+        conn.commit()
+        
+        marcadores = conn.execute(
+            "SELECT marcadores FROM princ WHERE id_princ = ?", (id_princ,)
+        ).fetchone()[0]
+        expected = {"state_loc": 3, "state_dt_envio": 2, "state_dt_denvio": 0, "state_dt_pago": 1}
+        ok = ok and unpack_markers(marcadores) == expected
+    
+    # Desmarcar tudo pela API remove a linha de tempstate
+    set_markers_with_conn(conn, [2], "state_loc", 0)
+    set_markers_with_conn(conn, [2], "state_dt_envio", 0)
+    set_markers_with_conn(conn, [2], "state_dt_pago", 0)
+    conn.commit()
+    ok = ok and 2 not in snapshot_tempstate(conn)
+    
+    conn.close()
+    return ok
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    
+    print("=" * 60)
+    print("BENCHMARK: /api/acoes/marcar")
+    print("=" * 60)
+    print(f"Linhas selecionadas: {rows} | Repeticoes: {repeat}")
+    print()
+    
+    # Seleção espalhada: parte com linha em tempstate, parte sem
+    ids = list(range(1, rows * 5 + 1, 5))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        approaches = (
+            ("tempstate (3 cmd/id)", marcar_loop, snapshot_tempstate),
+            ("princ.marcadores", set_markers_with_conn, snapshot_princ),
+        )
+        for name, fn, snapshot in approaches:
+            path = os.path.join(tmp, f"{len(results)}.db")
+            create_db(path, rows, triggers=fn is set_markers_with_conn)
+            results[name] = bench(path, fn, snapshot, ids, repeat)
+        
+        for name, (mark, unmark, _state) in results.items():
+            print(f"  {name:<22} marcar: {mark:8.2f} ms | desmarcar: {unmark:8.2f} ms")
+        
+        (old_mark, old_unmark, old_state), (new_mark, new_unmark, new_state) = results.values()
+        print()
+        print(f"  Ganho marcar: {old_mark / new_mark:.1f}x | desmarcar: {old_unmark / new_unmark:.1f}x")
+        
+        status = "[OK]" if old_state == new_state else "[ERRO]"
+        print(f"  Estado final identico: {status}")
+        
+        status = "[OK]" if check_legacy_write(os.path.join(tmp, "legacy.db")) else "[ERRO]"
+        print(f"  Espelho em tempstate e escrita legada: {status}")
+
+
+if __name__ == "__main__":
+    main()
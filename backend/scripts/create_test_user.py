@@ -65,6 +65,9 @@ def create_or_update_user(user: dict) -> None:
         hash_senha = hash_password(user["senha"])
         
         if exists:
+            # Tentativas/bloqueio zerados aqui também valem para a API em execução
+            # (trigger incrementa user.attempts_version; services/login_attempts.py
+            # descarta o estado em memória de versão anterior)
             cursor.execute(
                 """
                 UPDATE user 
@@ -0,0 +1,137 @@
+"""
+Script de Migracao: Mover audit_log para banco proprio
+
+Copia os registros de audit_log do banco principal (xFinanceDB.db) para o
+banco de auditoria (xFinanceAudit.db) e remove a tabela do banco principal.
+
+Execucao:
+    python backend/scripts/move_audit_log.py [--vacuum]
+
+    --vacuum  Executa VACUUM no banco principal ao final (recupera espaco)
+
+IMPORTANTE: Faca backup do banco antes de executar e pare a API
+(a gravacao da auditoria e feita em segundo plano).
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+# Adicionar path do backend para imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Determinar caminho do banco
+DB_PATH = os.getenv(
+    "XF_DB_PATH",
+    r"E:\MVRX\Financeiro\xFinance_3.0\x_db\xFinanceDB.db"
+)
+
+# Banco de auditoria: mesmo diretorio do principal (ver config.resolve_audit_db_path)
+AUDIT_DB_PATH = os.getenv(
+    "XFINANCE_AUDIT_DB_PATH",
+    os.path.join(os.path.dirname(DB_PATH), "xFinanceAudit.db")
+)
+
+COLUMNS = (
+    "id_log, id_user, user_email, id_princ, operacao, campo, "
+    "valor_anterior, valor_novo, dt_operacao, dt_expira"
+)
+
+
+def check_table_exists(conn: sqlite3.Connection, table: str, schema: str = "main") -> bool:
+    """Verifica se uma tabela existe."""
+    cursor = conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?",
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+
+def run_migration(vacuum: bool = False):
+    """Executa a migracao do audit_log."""
+    
+    print("=" * 60)
+    print("MIGRACAO: audit_log -> banco de auditoria")
+    print("=" * 60)
+    print(f"Banco principal: {DB_PATH}")
+    print(f"Banco auditoria: {AUDIT_DB_PATH}")
+    print(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+    
+    if not os.path.exists(DB_PATH):
+        print(f"[ERRO] Banco de dados nao encontrado: {DB_PATH}")
+        sys.exit(1)
+    
+    # A tabela/indices do banco de auditoria sao criados pelo proprio service
+    os.environ.setdefault("XFINANCE_DB_PATH", DB_PATH)
+    os.environ.setdefault("XFINANCE_AUDIT_DB_PATH", AUDIT_DB_PATH)
+    from services.audit import _create_table
+    
+    conn = sqlite3.connect(DB_PATH)
+    
+    try:
+        # =====================================================================
+        # 1. Origem
+        # =====================================================================
+        print("[1/3] Verificando audit_log no banco principal...")
+        
+        if not check_table_exists(conn, "audit_log"):
+            print("      [AVISO] Tabela 'audit_log' nao existe no banco principal. Nada a fazer.")
+            return
+        
+        total = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        print(f"      {total} registro(s) encontrado(s)")
+        
+        # =====================================================================
+        # 2. Copia
+        # =====================================================================
+        print("[2/3] Copiando registros para o banco de auditoria...")
+        
+        _create_table()
+        conn.execute("ATTACH DATABASE ? AS audit", (AUDIT_DB_PATH,))
+        
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO audit.audit_log ({COLUMNS}) "
+            f"SELECT {COLUMNS} FROM main.audit_log"
+        )
+        conn.commit()
+        print(f"      [OK] {cursor.rowcount} registro(s) copiado(s)")
+        
+        faltantes = conn.execute(
+            "SELECT COUNT(*) FROM main.audit_log "
+            "WHERE id_log NOT IN (SELECT id_log FROM audit.audit_log)"
+        ).fetchone()[0]
+        if faltantes:
+            print(f"[ERRO] {faltantes} registro(s) nao copiado(s). Tabela original mantida.")
+            sys.exit(1)
+        
+        conn.execute("DETACH DATABASE audit")
+        
+        # =====================================================================
+        # 3. Remocao da origem
+        # =====================================================================
+        print("[3/3] Removendo audit_log do banco principal...")
+        
+        conn.execute("DROP TABLE main.audit_log")
+        conn.commit()
+        print("      [OK] Tabela removida")
+        
+        if vacuum:
+            print("      Executando VACUUM...")
+            conn.execute("VACUUM")
+            print("      [OK] VACUUM concluido")
+        
+        print()
+        print("Migracao concluida com sucesso!")
+    
+    except Exception as e:
+        print(f"[ERRO] durante migracao: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration(vacuum="--vacuum" in sys.argv)
@@ -51,6 +51,9 @@ def reset_password(email: str, new_password: str) -> bool:
             (hash_senha, "bcrypt", email)
         )
         conn.commit()
+        # A API em execução percebe a alteração na próxima leitura do usuário
+        # (trigger incrementa user.attempts_version; services/login_attempts.py
+        # descarta o estado em memória de versão anterior)
         
         print(f"[OK] Senha resetada para: {email}")
         print(f"     Papel: {papel}")
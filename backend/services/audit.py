@@ -9,28 +9,76 @@ Operações registradas:
 - DELETE: Exclusão de inspeção
 - ENCAMINHAR: Mudança de responsável
 
-Retenção: 14 meses (limpeza manual via endpoint)
+Retenção: 14 meses (job diário no scheduler + endpoint manual, em lotes)
+Arquivo frio: meses fechados vão para CSV gzip no mount de backup
+(services/audit_archive.py); get_history consulta o arquivo quando preciso.
+
+Armazenamento: banco próprio (xFinanceAudit.db, ver database.get_audit_db),
+separado do banco principal. Migração dos dados antigos:
+scripts/move_audit_log.py
+
+Gravação assíncrona:
+- log_operation() apenas enfileira o evento (fila limitada em memória)
+- Uma thread de fundo grava em lote (executemany, 1 transação por lote)
+- start_audit_writer()/stop_audit_writer() no lifespan do main.py;
+  o stop grava tudo o que estiver pendente
+- Sem writer ativo (scripts, testes) a gravação é síncrona
 """
 
+import base64
 import logging
+import queue
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Any
 import json
 
-from database import get_db
+from config import get_settings
+from database import get_audit_db
 
 logger = logging.getLogger(__name__)
 
 # Meses de retenção do log
 RETENTION_MONTHS = 14
 
+_INSERT_SQL = """
+    INSERT INTO audit_log (
+        id_user, user_email, id_princ, operacao, campo,
+        valor_anterior, valor_novo, dt_operacao, dt_expira
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# DDL executado uma única vez por processo
+_table_ready = False
+_table_lock = threading.Lock()
+
 
 def _ensure_table_exists() -> None:
     """
     Cria a tabela audit_log se não existir.
-    Chamada automaticamente na primeira operação.
+    Executa o DDL apenas na primeira chamada do processo.
     """
-    with get_db() as conn:
+    global _table_ready
+    if _table_ready:
+        return
+    
+    with _table_lock:
+        if _table_ready:
+            return
+        _create_table()
+        _table_ready = True
+
+
+def _create_table() -> None:
+    """DDL da tabela audit_log e índices."""
+    with get_audit_db() as conn:
+        # Só tem efeito em banco novo (antes da 1ª tabela): permite
+        # PRAGMA incremental_vacuum após a limpeza de retenção. Bancos já
+        # existentes continuam sem auto_vacuum até um VACUUM completo
+        # (ver _incremental_vacuum)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
         conn.execute("""
             CREATE TABLE IF NOT EXISTS "audit_log" (
                 id_log INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -67,6 +115,19 @@ def _ensure_table_exists() -> None:
             "CREATE INDEX IF NOT EXISTS idx_audit_expira ON audit_log (dt_expira)"
         )
         
+        # Índices compostos da busca (search_history): filtro + ordem por data.
+        # O id_log (rowid) fica implícito no fim do índice, cobrindo o
+        # desempate da paginação por keyset.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_user_data ON audit_log (id_user, dt_operacao)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_campo_data ON audit_log (campo, dt_operacao)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_op_data ON audit_log (operacao, dt_operacao)"
+        )
+        
         conn.commit()
 
 
@@ -79,6 +140,298 @@ def _serialize_value(value: Any) -> Optional[str]:
     return str(value)
 
 
+def _build_row(
+    id_user: int,
+    user_nome: str,
+    id_princ: int,
+    operacao: str,
+    campo: Optional[str],
+    valor_anterior: Any,
+    valor_novo: Any,
+) -> tuple:
+    """Monta a tupla de INSERT (data capturada no momento do evento)."""
+    now = datetime.now()
+    
+    # Calcular data de expiração (14 meses)
+    dt_expira = (now + timedelta(days=RETENTION_MONTHS * 30)).strftime("%Y-%m-%d")
+    
+    return (
+        id_user,
+        user_nome,  # Grava short_nome na coluna user_email
+        id_princ,
+        operacao,
+        campo,
+        _serialize_value(valor_anterior),
+        _serialize_value(valor_novo),
+        now.strftime("%Y-%m-%d %H:%M:%S"),
+        dt_expira,
+    )
+
+
+def _write_rows(rows: list[tuple]) -> None:
+    """Grava um lote de eventos em uma única transação."""
+    _ensure_table_exists()
+    
+    with get_audit_db() as conn:
+        conn.executemany(_INSERT_SQL, rows)
+        conn.commit()
+
+
+# =============================================================================
+# WRITER ASSÍNCRONO (fila limitada + thread de fundo)
+# =============================================================================
+
+class _FlushRequest:
+    """Marcador na fila: sinaliza quando tudo antes dele foi gravado."""
+    
+    __slots__ = ("event",)
+    
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Grava eventos de auditoria em lote numa thread de fundo.
+    
+    Backpressure: com a fila cheia o produtor aguarda até
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS; se ainda estiver cheia, grava o evento
+    de forma síncrona (nenhum evento é descartado).
+    
+    Erro de gravação: o lote é repetido até AUDIT_WRITE_RETRIES vezes e,
+    persistindo o erro, gravado evento a evento; só o evento que falha
+    sozinho é descartado (registrado no log com o conteúdo).
+    """
+    
+    def __init__(
+        self,
+        max_events: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float,
+        retries: int = 3,
+        retry_delay: float = 0.5,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue: queue.Queue = queue.Queue(maxsize=max_events)
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        
+        # Métricas
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.retried = 0
+        self.blocked = 0
+        self.sync_fallback = 0
+        self.max_depth = 0
+        self.last_batch_ms = 0.0
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        logger.info("AUDIT: writer iniciado (fila=%d, lote=%d)", self._queue.maxsize, self.batch_size)
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """Grava os eventos pendentes e encerra a thread."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("AUDIT: writer não finalizou em %.1fs", timeout)
+        else:
+            logger.info("AUDIT: writer finalizado (%d evento(s) gravado(s))", self.written)
+        self._thread = None
+    
+    def submit(self, row: tuple) -> None:
+        """Enfileira um evento (com backpressure)."""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self.blocked += 1
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self.sync_fallback += 1
+                logger.warning("AUDIT: fila cheia, gravando evento de forma síncrona")
+                _write_rows([row])
+                return
+        
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self.enqueued += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Aguarda a gravação de todos os eventos enfileirados até agora."""
+        if not self.running:
+            return True
+        request = _FlushRequest()
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            logger.warning("AUDIT: fila cheia, flush não enfileirado em %.1fs", timeout)
+            return False
+        return request.event.wait(max(deadline - time.monotonic(), 0))
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: list[tuple] = []
+            waiters: list[_FlushRequest] = []
+            deadline = time.monotonic() + self.flush_interval
+            
+            # Junta eventos até completar o lote ou estourar o intervalo
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _FlushRequest):
+                    waiters.append(item)
+                elif item is not None:
+                    batch.append(item)
+                
+                if stopping or waiters or len(batch) >= self.batch_size:
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            
+            # No encerramento, drena o que restou na fila
+            if stopping:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushRequest):
+                        waiters.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            
+            if batch:
+                self._flush_batch(batch)
+            for w in waiters:
+                w.event.set()
+    
+    def _flush_batch(self, batch: list[tuple]) -> None:
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                _write_rows(batch)
+                break
+            except Exception as e:
+                logger.error(
+                    "AUDIT: erro ao gravar lote de %d evento(s) (tentativa %d/%d): %s",
+                    len(batch), attempt + 1, self.retries + 1, e
+                )
+                if attempt < self.retries:
+                    with self._stats_lock:
+                        self.retried += 1
+                    time.sleep(self.retry_delay * (attempt + 1))
+        else:
+            self._flush_rows(batch)
+            return
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.written += len(batch)
+            self.batches += 1
+            self.last_batch_ms = round(elapsed_ms, 2)
+        logger.info("AUDIT: lote gravado (%d evento(s), %.1f ms)", len(batch), elapsed_ms)
+    
+    def _flush_rows(self, batch: list[tuple]) -> None:
+        """Lote que falhou em todas as tentativas: grava evento a evento."""
+        written = 0
+        for row in batch:
+            try:
+                _write_rows([row])
+                written += 1
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += 1
+                logger.error("AUDIT: evento descartado após falha de gravação: %r - %s", row, e)
+        
+        with self._stats_lock:
+            self.written += written
+        logger.warning(
+            "AUDIT: lote gravado evento a evento (%d de %d gravado(s))", written, len(batch)
+        )
+    
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "queue_max": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "failed": self.failed,
+                "retried": self.retried,
+                "blocked": self.blocked,
+                "sync_fallback": self.sync_fallback,
+                "last_batch_ms": self.last_batch_ms,
+            }
+
+
+_settings = get_settings()
+_writer = AuditWriter(
+    max_events=_settings.AUDIT_QUEUE_MAX_EVENTS,
+    batch_size=_settings.AUDIT_BATCH_SIZE,
+    flush_interval=_settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=_settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+    retries=_settings.AUDIT_WRITE_RETRIES,
+    retry_delay=_settings.AUDIT_WRITE_RETRY_SECONDS,
+)
+
+
+def start_audit_writer() -> None:
+    """Inicia a thread de gravação (chamado no startup da API)."""
+    _ensure_table_exists()
+    _writer.start()
+
+
+def stop_audit_writer() -> None:
+    """Grava pendências e encerra a thread (chamado no shutdown da API)."""
+    _writer.stop()
+
+
+def flush_audit(timeout: float = 5.0) -> bool:
+    """Aguarda a gravação dos eventos pendentes (leitura consistente)."""
+    return _writer.flush(timeout)
+
+
+def get_writer_stats() -> dict:
+    """Métricas da fila de auditoria (profundidade, backpressure, lotes)."""
+    return _writer.stats()
+
+
 def log_operation(
     id_user: int,
     user_nome: str,
@@ -91,6 +444,8 @@ def log_operation(
     """
     Registra uma operação de auditoria.
     
+    O evento é enfileirado e gravado em lote pelo writer de fundo.
+    
     Args:
         id_user: ID do usuário que realizou a operação
         user_nome: Nome curto do usuário (short_nome)
@@ -101,63 +456,75 @@ def log_operation(
         valor_novo: Valor após a alteração
     """
     try:
-        _ensure_table_exists()
-        
-        # Debug: log valores recebidos
-        logger.info(
-            "AUDIT INSERT: princ=%s, op=%s, campo=%s, anterior=%s, novo=%s",
+        logger.debug(
+            "AUDIT: princ=%s, op=%s, campo=%s, anterior=%s, novo=%s",
             id_princ, operacao, campo, valor_anterior, valor_novo
         )
         
-        # Calcular data de expiração (14 meses)
-        expira_date = datetime.now() + timedelta(days=RETENTION_MONTHS * 30)
-        dt_expira = expira_date.strftime("%Y-%m-%d")
-        
-        with get_db() as conn:
-            conn.execute(
-                """
-                INSERT INTO audit_log (
-                    id_user, user_email, id_princ, operacao, campo,
-                    valor_anterior, valor_novo, dt_expira
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    id_user,
-                    user_nome,  # Grava short_nome na coluna user_email
-                    id_princ,
-                    operacao,
-                    campo,
-                    _serialize_value(valor_anterior),
-                    _serialize_value(valor_novo),
-                    dt_expira,
-                )
-            )
-            conn.commit()
-            
-        logger.info(
-            "Audit: %s | user=%s | princ=%d | campo=%s",
-            operacao, user_nome, id_princ, campo
-        )
+        row = _build_row(id_user, user_nome, id_princ, operacao, campo, valor_anterior, valor_novo)
+        
+        if _writer.running:
+            _writer.submit(row)
+        else:
+            _write_rows([row])
         
     except Exception as e:
         # Não interrompe a operação principal se o log falhar
         logger.error("Erro ao registrar auditoria: %s", e)
 
 
-def get_history(id_princ: int, limit: int = 100) -> list[dict]:
+def log_operations(
+    id_user: int,
+    user_nome: str,
+    events: list[tuple[int, str, Optional[str], Any, Any]],
+) -> None:
+    """
+    Registra várias operações de um mesmo usuário de uma vez.
+    
+    Sem writer ativo, grava tudo numa única transação; com writer, os
+    eventos entram juntos na fila e saem no mesmo lote.
+    
+    Args:
+        id_user: ID do usuário que realizou as operações
+        user_nome: Nome curto do usuário (short_nome)
+        events: Lista de (id_princ, operacao, campo, valor_anterior, valor_novo)
+    """
+    try:
+        rows = [
+            _build_row(id_user, user_nome, id_princ, operacao, campo, anterior, novo)
+            for id_princ, operacao, campo, anterior, novo in events
+        ]
+        if not rows:
+            return
+        
+        if _writer.running:
+            for row in rows:
+                _writer.submit(row)
+        else:
+            _write_rows(rows)
+        
+    except Exception as e:
+        # Não interrompe a operação principal se o log falhar
+        logger.error("Erro ao registrar auditoria em lote: %s", e)
+
+
+def get_history(id_princ: int, limit: int = 100, include_archived: bool = False) -> list[dict]:
     """
     Retorna histórico de operações de um registro.
     
     Args:
         id_princ: ID do registro
         limit: Limite de registros (padrão 100)
+        include_archived: Completar com meses antigos do arquivo frio
+            (services/audit_archive.py) se o banco não atingir o limite
         
     Returns:
-        Lista de operações ordenadas por data (mais recente primeiro)
+        Lista de operações ordenadas por data (mais recente primeiro).
     """
     _ensure_table_exists()
+    flush_audit()
     
-    with get_db() as conn:
+    with get_audit_db() as conn:
         cursor = conn.execute(
             """
             SELECT 
@@ -179,7 +546,7 @@ def get_history(id_princ: int, limit: int = 100) -> list[dict]:
         
         rows = cursor.fetchall()
         
-        return [
+        history = [
             {
                 "id_log": row["id_log"],
                 "id_user": row["id_user"],
@@ -192,26 +559,282 @@ def get_history(id_princ: int, limit: int = 100) -> list[dict]:
             }
             for row in rows
         ]
+    
+    if include_archived and len(history) < limit:
+        from services.audit_archive import read_archived_history
+        history.extend(read_archived_history(
+            id_princ,
+            limit - len(history),
+            exclude_ids={h["id_log"] for h in history},
+        ))
+    
+    return history
+
+
+# =============================================================================
+# BUSCA (filtros + paginação por keyset)
+# =============================================================================
+
+def _encode_cursor(dt_operacao: str, id_log: int) -> str:
+    """Cursor opaco da paginação: posição (dt_operacao, id_log) do último item."""
+    raw = f"{dt_operacao}|{id_log}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """Decodifica cursor. Levanta ValueError se inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        dt_operacao, id_log = raw.rsplit("|", 1)
+        return dt_operacao, int(id_log)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def search_history(
+    id_user: Optional[int] = None,
+    operacao: Optional[str] = None,
+    campo: Optional[str] = None,
+    id_princ: Optional[int] = None,
+    dt_ini: Optional[str] = None,
+    dt_fim: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> dict:
+    """
+    Busca operações de auditoria com filtros.
+    
+    Ordem: mais recente primeiro (dt_operacao DESC, id_log DESC).
+    Paginação por keyset: passe `next_cursor` da página anterior em `cursor`.
+    
+    Args:
+        id_user: Usuário que realizou a operação
+        operacao: CREATE, UPDATE, DELETE, ENCAMINHAR
+        campo: Campo alterado
+        id_princ: Registro afetado
+        dt_ini: Data inicial (YYYY-MM-DD, inclusive)
+        dt_fim: Data final (YYYY-MM-DD, inclusive)
+        cursor: Cursor de continuação
+        limit: Itens por página
+        
+    Returns:
+        Dict com entries e next_cursor (None na última página)
+        
+    Raises:
+        ValueError: Cursor inválido
+    """
+    clauses = []
+    params: list[Any] = []
+    
+    if id_user is not None:
+        clauses.append("id_user = ?")
+        params.append(id_user)
+    
+    if operacao:
+        clauses.append("operacao = ?")
+        params.append(operacao.upper())
+    
+    if campo:
+        clauses.append("campo = ?")
+        params.append(campo)
+    
+    if id_princ is not None:
+        clauses.append("id_princ = ?")
+        params.append(id_princ)
+    
+    if dt_ini:
+        clauses.append("dt_operacao >= ?")
+        params.append(dt_ini)
+    
+    if dt_fim:
+        clauses.append("dt_operacao < date(?, '+1 day')")
+        params.append(dt_fim)
+    
+    if cursor:
+        clauses.append("(dt_operacao, id_log) < (?, ?)")
+        params.extend(_decode_cursor(cursor))
+    
+    where = " AND ".join(clauses) if clauses else "1=1"
+    
+    _ensure_table_exists()
+    flush_audit()
+    
+    with get_audit_db() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT
+                id_log,
+                id_user,
+                user_email,
+                id_princ,
+                operacao,
+                campo,
+                valor_anterior,
+                valor_novo,
+                dt_operacao
+            FROM audit_log
+            WHERE {where}
+            ORDER BY dt_operacao DESC, id_log DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1)
+        ).fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last["dt_operacao"], last["id_log"])
+    
+    return {
+        "entries": [dict(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+# =============================================================================
+# RETENÇÃO (limpeza em lotes)
+# =============================================================================
+
+_cleanup_lock = threading.Lock()
+_cleanup_progress: dict[str, Any] = {
+    "running": False,
+    "started_at": None,
+    "finished_at": None,
+    "deleted": 0,
+    "batches": 0,
+    "vacuum_pages": 0,
+    "error": None,
+}
+
+
+def get_cleanup_progress() -> dict:
+    """Progresso da limpeza em andamento (ou da última execução)."""
+    return dict(_cleanup_progress)
+
+
+def _incremental_vacuum(conn) -> int:
+    """
+    Devolve ao sistema as páginas livres do banco de auditoria.
+    
+    Requer auto_vacuum = INCREMENTAL, que o SQLite só aplica em banco novo
+    (criado por _create_table) ou após um VACUUM completo. Em banco de
+    auditoria já existente, habilitar uma vez, com a API parada:
+    
+        PRAGMA auto_vacuum = INCREMENTAL;
+        VACUUM;
+    
+    Sem isso o vacuum é ignorado (apenas registra no log).
+    
+    O pragma devolve uma linha por página liberada: conn.execute só avança
+    o primeiro passo (1 página), executescript roda até o fim.
+    
+    Returns:
+        Número de páginas liberadas (freelist antes - depois)
+    """
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        logger.info("Audit cleanup: auto_vacuum não é INCREMENTAL, vacuum ignorado")
+        return 0
+    
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not before:
+        return 0
+    conn.executescript("PRAGMA incremental_vacuum;")
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return before - after
 
 
-def cleanup_expired() -> int:
+def cleanup_expired(
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    vacuum: Optional[bool] = None,
+) -> int:
     """
     Remove registros expirados (mais antigos que 14 meses).
     
+    Apaga em lotes limitados, cada um em transação curta, com pausa entre
+    lotes para não segurar o lock de escrita (o writer da fila continua
+    gravando entre um lote e outro).
+    
+    Args:
+        batch_size: Registros por lote (padrão AUDIT_CLEANUP_BATCH_SIZE)
+        pause: Pausa entre lotes em segundos (padrão AUDIT_CLEANUP_PAUSE_SECONDS)
+        vacuum: Executar PRAGMA incremental_vacuum ao final
+                (padrão AUDIT_CLEANUP_INCREMENTAL_VACUUM)
+    
     Returns:
-        Número de registros removidos
+        Número de registros removidos (0 se já houver limpeza em andamento)
     """
+    settings = get_settings()
+    batch_size = batch_size or settings.AUDIT_CLEANUP_BATCH_SIZE
+    pause = settings.AUDIT_CLEANUP_PAUSE_SECONDS if pause is None else pause
+    vacuum = settings.AUDIT_CLEANUP_INCREMENTAL_VACUUM if vacuum is None else vacuum
+    
+    # Antes do lock: uma falha aqui não pode deixar o lock preso
     _ensure_table_exists()
     
-    with get_db() as conn:
-        cursor = conn.execute(
-            "DELETE FROM audit_log WHERE dt_expira < date('now')"
-        )
-        deleted = cursor.rowcount
-        conn.commit()
+    if not _cleanup_lock.acquire(blocking=False):
+        logger.warning("Audit cleanup: limpeza já em andamento, ignorando")
+        return 0
+    
+    _cleanup_progress.update({
+        "running": True,
+        "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "finished_at": None,
+        "deleted": 0,
+        "batches": 0,
+        "vacuum_pages": 0,
+        "error": None,
+    })
+    
+    deleted = 0
+    try:
+        with get_audit_db() as conn:
+            while True:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM audit_log
+                    WHERE id_log IN (
+                        SELECT id_log FROM audit_log
+                        WHERE dt_expira < date('now')
+                        LIMIT ?
+                    )
+                    """,
+                    (batch_size,)
+                )
+                conn.commit()
+                
+                count = cursor.rowcount
+                deleted += count
+                _cleanup_progress["deleted"] = deleted
+                _cleanup_progress["batches"] += 1
+                
+                if count < batch_size:
+                    break
+                
+                logger.debug("Audit cleanup: %d registros removidos até agora", deleted)
+                time.sleep(pause)
+            
+            if vacuum and deleted:
+                _cleanup_progress["vacuum_pages"] = _incremental_vacuum(conn)
         
-        logger.info("Audit cleanup: %d registros removidos", deleted)
+        logger.info(
+            "Audit cleanup: %d registros removidos em %d lote(s)",
+            deleted, _cleanup_progress["batches"]
+        )
         return deleted
+    
+    except Exception as e:
+        _cleanup_progress["error"] = str(e)
+        raise
+    
+    finally:
+        _cleanup_progress["running"] = False
+        _cleanup_progress["finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _cleanup_lock.release()
 
 
 def get_stats() -> dict:
@@ -221,9 +844,12 @@ def get_stats() -> dict:
     Returns:
         Dict com total de registros, mais antigo, etc.
     """
+    from services.audit_archive import get_archive_stats
+    
     _ensure_table_exists()
+    flush_audit()
     
-    with get_db() as conn:
+    with get_audit_db() as conn:
         # Total de registros
         total = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
         
@@ -241,4 +867,7 @@ def get_stats() -> dict:
             "total_registros": total,
             "registro_mais_antigo": oldest,
             "registros_expirados": expired,
+            "writer": get_writer_stats(),
+            "cleanup": get_cleanup_progress(),
+            "arquivo": get_archive_stats(),
         }
@@ -0,0 +1,366 @@
+"""
+Arquivo Frio da Auditoria - xFinance
+
+Move meses fechados do audit_log para arquivos CSV compactados (gzip) no
+mount de backup, mantendo um manifesto pequeno para localizar os dados.
+
+Layout (em <NAS_BACKUP_PATH>/audit_archive/):
+    audit_2025-01_1-18342.csv.gz   (mês + faixa de id_log)
+    manifest.json                  (índice dos arquivos)
+
+Cada entrada do manifesto guarda mês, faixa de id_log/datas, total de
+linhas, maior dt_expira e os id_princ presentes, para que get_history
+abra apenas os arquivos relevantes.
+
+Leitura (get_history com include_archived):
+- Manifesto em memória (id_princs como set); stat do arquivo no máximo a
+  cada AUDIT_ARCHIVE_MANIFEST_TTL_SECONDS, releitura só se o mtime mudar
+- Mount indisponível no monitor de storage → nada é lido
+- Leitura no pool de I/O com timeout (AUDIT_ARCHIVE_READ_TIMEOUT_SECONDS)
+
+Execução: job mensal no scheduler (archive_closed_months).
+"""
+
+import csv
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+from config import get_settings
+from database import get_audit_db
+from services.audit import _ensure_table_exists
+from services.backup import NAS_BACKUP_PATH, TARGET_BACKUP, _is_backup_path_accessible
+from services.storage_health import invalidate, run_io
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(NAS_BACKUP_PATH) / "audit_archive"
+MANIFEST_NAME = "manifest.json"
+
+COLUMNS = (
+    "id_log", "id_user", "user_email", "id_princ", "operacao", "campo",
+    "valor_anterior", "valor_novo", "dt_operacao", "dt_expira",
+)
+
+# Registros removidos do banco por transação após arquivar
+DELETE_BATCH_SIZE = 2000
+
+_archive_lock = threading.Lock()
+
+# Manifesto para leitura: (mtime, monotonic do último stat, entradas)
+_manifest_lock = threading.Lock()
+_manifest_cache: Optional[tuple[Optional[float], float, list[dict]]] = None
+
+
+# =============================================================================
+# MANIFESTO
+# =============================================================================
+
+def _load_manifest() -> dict:
+    """Lê o manifesto (vazio se não existir)."""
+    path = ARCHIVE_DIR / MANIFEST_NAME
+    if not path.exists():
+        return {"version": 1, "files": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest: dict) -> None:
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+    path = ARCHIVE_DIR / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    _cache_manifest(path.stat().st_mtime, manifest)
+
+
+def _cache_manifest(mtime: Optional[float], manifest: dict) -> list[dict]:
+    """Guarda as entradas do manifesto em memória (id_princs como set)."""
+    global _manifest_cache
+    entries = [{**e, "id_princs": frozenset(e["id_princs"])} for e in manifest["files"]]
+    with _manifest_lock:
+        _manifest_cache = (mtime, time.monotonic(), entries)
+    return entries
+
+
+def _cached_entries() -> list[dict]:
+    """
+    Entradas do manifesto para leitura (cache em memória).
+    
+    Faz stat do manifest.json no máximo a cada
+    AUDIT_ARCHIVE_MANIFEST_TTL_SECONDS e só relê o JSON se o mtime mudou.
+    """
+    global _manifest_cache
+    with _manifest_lock:
+        cached = _manifest_cache
+    if cached is not None and time.monotonic() - cached[1] < get_settings().AUDIT_ARCHIVE_MANIFEST_TTL_SECONDS:
+        return cached[2]
+    
+    try:
+        mtime = (ARCHIVE_DIR / MANIFEST_NAME).stat().st_mtime
+    except FileNotFoundError:
+        return _cache_manifest(None, {"files": []})
+    
+    if cached is not None and cached[0] == mtime:
+        with _manifest_lock:
+            _manifest_cache = (mtime, time.monotonic(), cached[2])
+        return cached[2]
+    return _cache_manifest(mtime, _load_manifest())
+
+
+# =============================================================================
+# ARQUIVAMENTO
+# =============================================================================
+
+def _cutoff_month(months: int) -> str:
+    """Primeiro mês NÃO arquivável (YYYY-MM): mês atual - `months`."""
+    today = date.today()
+    total = today.year * 12 + (today.month - 1) - months
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def _write_month(month: str, rows: list) -> dict:
+    """Grava as linhas de um mês em CSV gzip e retorna a entrada do manifesto."""
+    id_min = rows[0]["id_log"]
+    id_max = rows[-1]["id_log"]
+    filename = f"audit_{month}_{id_min}-{id_max}.csv.gz"
+    path = ARCHIVE_DIR / filename
+    tmp = path.with_suffix(".tmp")
+    
+    with gzip.open(tmp, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow([row[c] for c in COLUMNS])
+    
+    # Verificação: relê o arquivo antes de apagar do banco
+    with gzip.open(tmp, "rt", encoding="utf-8", newline="") as f:
+        written = sum(1 for _ in csv.reader(f)) - 1
+    if written != len(rows):
+        tmp.unlink(missing_ok=True)
+        raise IOError(f"Arquivo {filename}: {written} linhas gravadas, esperado {len(rows)}")
+    
+    os.replace(tmp, path)
+    
+    return {
+        "file": filename,
+        "month": month,
+        "rows": len(rows),
+        "id_min": id_min,
+        "id_max": id_max,
+        "dt_min": min(r["dt_operacao"] for r in rows),
+        "dt_max": max(r["dt_operacao"] for r in rows),
+        "dt_expira_max": max((r["dt_expira"] or "") for r in rows),
+        "id_princs": sorted({r["id_princ"] for r in rows}),
+    }
+
+
+def _delete_archived(conn, id_min: int, id_max: int, month: str) -> None:
+    """Remove do banco, em lotes curtos, as linhas já arquivadas."""
+    while True:
+        cursor = conn.execute(
+            """
+            DELETE FROM audit_log
+            WHERE id_log IN (
+                SELECT id_log FROM audit_log
+                WHERE id_log BETWEEN ? AND ? AND substr(dt_operacao, 1, 7) = ?
+                LIMIT ?
+            )
+            """,
+            (id_min, id_max, month, DELETE_BATCH_SIZE)
+        )
+        conn.commit()
+        if cursor.rowcount < DELETE_BATCH_SIZE:
+            break
+
+
+def _purge_expired_files(manifest: dict) -> int:
+    """Remove arquivos cujo conteúdo inteiro já passou da retenção."""
+    today = date.today().isoformat()
+    kept, removed = [], 0
+    for entry in manifest["files"]:
+        if entry["dt_expira_max"] and entry["dt_expira_max"] < today:
+            (ARCHIVE_DIR / entry["file"]).unlink(missing_ok=True)
+            removed += 1
+        else:
+            kept.append(entry)
+    manifest["files"] = kept
+    return removed
+
+
+def archive_closed_months(months: Optional[int] = None) -> dict:
+    """
+    Arquiva meses fechados do audit_log em CSV gzip no mount de backup.
+    
+    Um mês é arquivado quando é anterior a (mês atual - `months`).
+    Ordem por mês: grava arquivo → verifica → atualiza manifesto → apaga
+    do banco. Se algo falhar, as linhas continuam no banco.
+    
+    Args:
+        months: Meses mantidos no banco (padrão AUDIT_ARCHIVE_AFTER_MONTHS)
+    
+    Returns:
+        Dict com meses arquivados, linhas movidas e arquivos expirados removidos
+    """
+    months = get_settings().AUDIT_ARCHIVE_AFTER_MONTHS if months is None else months
+    result: dict[str, Any] = {"months": [], "rows": 0, "expired_files": 0}
+    
+    if not _archive_lock.acquire(blocking=False):
+        logger.warning("AUDIT ARCHIVE: arquivamento já em andamento")
+        return result
+    
+    try:
+        if not _is_backup_path_accessible():
+            logger.warning("AUDIT ARCHIVE: mount de backup inacessível, arquivamento adiado")
+            return result
+        
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        _ensure_table_exists()
+        manifest = _load_manifest()
+        cutoff = _cutoff_month(months)
+        
+        with get_audit_db() as conn:
+            pending = [
+                row[0] for row in conn.execute(
+                    """
+                    SELECT DISTINCT substr(dt_operacao, 1, 7)
+                    FROM audit_log
+                    WHERE dt_operacao < ?
+                    ORDER BY 1
+                    """,
+                    (cutoff,)
+                )
+            ]
+            
+            for month in pending:
+                rows = conn.execute(
+                    f"""
+                    SELECT {", ".join(COLUMNS)}
+                    FROM audit_log
+                    WHERE dt_operacao >= ? AND dt_operacao < date(? || '-01', '+1 month')
+                    ORDER BY id_log
+                    """,
+                    (month, month)
+                ).fetchall()
+                
+                # Linhas já arquivadas numa execução interrompida: só apagar
+                ranges = [(e["id_min"], e["id_max"]) for e in manifest["files"] if e["month"] == month]
+                for id_min, id_max in ranges:
+                    _delete_archived(conn, id_min, id_max, month)
+                rows = [r for r in rows if not any(a <= r["id_log"] <= b for a, b in ranges)]
+                if not rows:
+                    continue
+                
+                entry = _write_month(month, rows)
+                manifest["files"].append(entry)
+                _save_manifest(manifest)
+                _delete_archived(conn, entry["id_min"], entry["id_max"], month)
+                
+                result["months"].append(month)
+                result["rows"] += entry["rows"]
+                logger.info("AUDIT ARCHIVE: %s arquivado (%d linhas)", month, entry["rows"])
+        
+        result["expired_files"] = _purge_expired_files(manifest)
+        _save_manifest(manifest)
+        
+        return result
+    
+    finally:
+        _archive_lock.release()
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+def read_archived_history(
+    id_princ: int,
+    limit: int,
+    exclude_ids: Optional[set[int]] = None,
+) -> list[dict]:
+    """
+    Busca histórico de um registro nos arquivos (mais recente primeiro).
+    
+    Abre apenas os arquivos cujo manifesto contém o id_princ.
+    Retorna [] se o mount estiver inacessível ou não responder a tempo.
+    """
+    if limit <= 0:
+        return []
+    
+    if not _is_backup_path_accessible():
+        logger.info("AUDIT ARCHIVE: mount de backup indisponível, histórico arquivado ignorado")
+        return []
+    
+    timeout = get_settings().AUDIT_ARCHIVE_READ_TIMEOUT_SECONDS
+    try:
+        return run_io(_read_archived, id_princ, limit, exclude_ids or set(), timeout=timeout)
+    except FuturesTimeoutError:
+        logger.warning("AUDIT ARCHIVE: leitura não terminou em %.0fs", timeout)
+        invalidate(TARGET_BACKUP)
+    except Exception as e:
+        logger.warning("AUDIT ARCHIVE: manifesto indisponível - %s", e)
+    return []
+
+
+def _read_archived(id_princ: int, limit: int, exclude_ids: set[int]) -> list[dict]:
+    """Leitura dos arquivos (executada no pool de I/O)."""
+    entries = [e for e in _cached_entries() if id_princ in e["id_princs"]]
+    entries.sort(key=lambda e: e["id_max"], reverse=True)
+    
+    result: list[dict] = []
+    for entry in entries:
+        try:
+            with gzip.open(ARCHIVE_DIR / entry["file"], "rt", encoding="utf-8", newline="") as f:
+                found = [
+                    row for row in csv.DictReader(f)
+                    if row["id_princ"] == str(id_princ) and int(row["id_log"]) not in exclude_ids
+                ]
+        except Exception as e:
+            logger.warning("AUDIT ARCHIVE: erro ao ler %s - %s", entry["file"], e)
+            continue
+        
+        found.sort(key=lambda r: (r["dt_operacao"], int(r["id_log"])), reverse=True)
+        for row in found:
+            result.append({
+                "id_log": int(row["id_log"]),
+                "id_user": int(row["id_user"]),
+                "user_email": row["user_email"],
+                "operacao": row["operacao"],
+                "campo": row["campo"] or None,
+                "valor_anterior": row["valor_anterior"] or None,
+                "valor_novo": row["valor_novo"] or None,
+                "dt_operacao": row["dt_operacao"],
+            })
+            if len(result) >= limit:
+                return result
+    
+    return result
+
+
+def get_archive_stats() -> dict:
+    """Resumo do arquivo frio (a partir do manifesto em cache)."""
+    empty = {"files": 0, "rows": 0, "oldest_month": None}
+    if not _is_backup_path_accessible():
+        return empty
+    try:
+        files = run_io(_cached_entries, timeout=get_settings().AUDIT_ARCHIVE_READ_TIMEOUT_SECONDS)
+    except FuturesTimeoutError:
+        logger.warning("AUDIT ARCHIVE: manifesto não respondeu a tempo")
+        return empty
+    except Exception as e:
+        logger.warning("AUDIT ARCHIVE: manifesto indisponível - %s", e)
+        return empty
+    
+    return {
+        "files": len(files),
+        "rows": sum(e["rows"] for e in files),
+        "oldest_month": min((e["month"] for e in files), default=None),
+    }
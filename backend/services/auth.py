@@ -4,7 +4,11 @@ Serviço de Autenticação - xFinance
 Baseado em: x_main/services/db/auth.py
 """
 
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -15,6 +19,7 @@ from jose import jwt
 
 from config import get_settings
 from database import get_db
+from services.login_attempts import MAX_FAILED_ATTEMPTS, attempt_store
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -88,6 +93,22 @@ def _ensure_user_security_columns(conn) -> None:
     if "locked_until" not in existing_cols:
         cur.execute("ALTER TABLE user ADD COLUMN locked_until TEXT")
         altered = True
+    if "attempts_version" not in existing_cols:
+        # Versão das tentativas/bloqueio: qualquer escrita (API, scripts,
+        # SQL manual) incrementa; services/login_attempts.py detecta por ela
+        # alterações externas ao estado em memória
+        cur.execute("ALTER TABLE user ADD COLUMN attempts_version INTEGER NOT NULL DEFAULT 0")
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_user_attempts_version
+            AFTER UPDATE OF failed_attempts, locked_until ON user
+            BEGIN
+                UPDATE user SET attempts_version = attempts_version + 1
+                WHERE id_user = NEW.id_user;
+            END
+            """
+        )
+        altered = True
     
     if altered:
         conn.commit()
@@ -120,7 +141,9 @@ def check_email_status(email: str) -> LoginResult:
             """
             SELECT hash_senha,
                    COALESCE(ativo, 1),
-                   locked_until
+                   COALESCE(failed_attempts, 0),
+                   locked_until,
+                   COALESCE(attempts_version, 0)
             FROM user
             WHERE email = ?
             """,
@@ -134,7 +157,8 @@ def check_email_status(email: str) -> LoginResult:
                 message="Email não cadastrado no sistema"
             )
         
-        hash_db, ativo_db, locked_until = row
+        hash_db, ativo_db, failed_attempts, locked_until, attempts_version = row
+        _attempts, locked_until = attempt_store.get(email, failed_attempts, locked_until, attempts_version)
         
         # Usuário bloqueado
         if locked_until:
@@ -181,6 +205,8 @@ def verify_login(email: str, password: str) -> LoginResult:
         - Bloqueia após 5 tentativas por 15 minutos
         - Usuário inativo não pode logar
         - Senha vazia retorna MISSING_PASSWORD
+        - Tentativas/bloqueio ficam em memória (services.login_attempts);
+          o banco é atualizado em lote, e o bloqueio na hora
     """
     with get_db() as conn:
         cur = conn.cursor()
@@ -197,7 +223,8 @@ def verify_login(email: str, password: str) -> LoginResult:
                    short_nome,
                    COALESCE(ativo, 1),
                    COALESCE(failed_attempts, 0),
-                   locked_until
+                   locked_until,
+                   COALESCE(attempts_version, 0)
             FROM user
             WHERE email = ?
             """,
@@ -223,7 +250,10 @@ def verify_login(email: str, password: str) -> LoginResult:
             ativo_db,
             failed_attempts,
             locked_until,
+            attempts_version,
         ) = row
+        db_attempts, db_locked = failed_attempts, locked_until
+        failed_attempts, locked_until = attempt_store.get(email, db_attempts, db_locked, attempts_version)
         
         # Bloqueio temporário
         if locked_until:
@@ -257,11 +287,7 @@ def verify_login(email: str, password: str) -> LoginResult:
         # Verificar senha
         if bcrypt.checkpw(password.encode("utf-8"), hash_db.encode("utf-8")):
             # Sucesso: resetar tentativas
-            cur.execute(
-                "UPDATE user SET failed_attempts = 0, locked_until = NULL WHERE email = ?",
-                (email,),
-            )
-            conn.commit()
+            attempt_store.record_success(email, db_attempts, db_locked, attempts_version)
             
             logger.info("Login bem-sucedido: %s (papel=%s)", email, papel_db)
             user = UserResponse(
@@ -275,23 +301,16 @@ def verify_login(email: str, password: str) -> LoginResult:
             return LoginResult(status=LoginStatus.SUCCESS, user=user)
         
         # Falha: incrementar tentativas
-        new_attempts = (failed_attempts or 0) + 1
-        locked_until_val = None
+        new_attempts, locked_until_val = attempt_store.record_failure(email, db_attempts, db_locked, attempts_version)
         
-        if new_attempts >= 5:
-            locked_until_val = (datetime.utcnow() + timedelta(minutes=15)).isoformat()
+        if locked_until_val:
             logger.warning(
-                "Login bloqueado após 5 tentativas para %s até %s",
+                "Login bloqueado após %d tentativas para %s até %s",
+                MAX_FAILED_ATTEMPTS,
                 email,
                 locked_until_val,
             )
         
-        cur.execute(
-            "UPDATE user SET failed_attempts = ?, locked_until = ? WHERE email = ?",
-            (new_attempts, locked_until_val, email),
-        )
-        conn.commit()
-        
         logger.info("Login falhou para %s (tentativas=%s)", email, new_attempts)
         return LoginResult(
             status=LoginStatus.WRONG_PASSWORD,
@@ -376,6 +395,7 @@ def set_missing_password(email: str, new_password: str) -> LoginResult:
             (hashed_password, salt.decode("utf-8"), email),
         )
         conn.commit()
+        attempt_store.reset(email)
         
         logger.info("Senha definida com sucesso para %s (primeiro acesso)", email)
         
@@ -450,13 +470,133 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+# =============================================================================
+# CACHE DE TOKENS VALIDADOS + REVOGAÇÃO
+# =============================================================================
+
+class _TokenCache:
+    """
+    Cache LRU de tokens já validados (chave: SHA-256 do token).
+    
+    Cada entrada vale até o `exp` do próprio token, então requisições
+    repetidas da mesma sessão não refazem o jwt.decode (HMAC + claims).
+    
+    Revogação (ex: logout) fica num conjunto em memória até o `exp` do
+    token; é por processo e não sobrevive a reinício.
+    """
+    
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._revoked: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> tuple[bool, Optional[dict]]:
+        """Retorna (encontrado, user_data). user_data None = revogado."""
+        now = time.time()
+        with self._lock:
+            revoked_exp = self._revoked.get(key)
+            if revoked_exp is not None:
+                if revoked_exp > now:
+                    return True, None
+                del self._revoked[key]
+            
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            user_data, exp = entry
+            if exp <= now:
+                del self._data[key]
+                self.misses += 1
+                return False, None
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, user_data
+    
+    def set(self, key: str, user_data: dict, exp: float) -> None:
+        with self._lock:
+            self._data[key] = (user_data, exp)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def revoke(self, key: str, exp: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._data.pop(key, None)
+            self._revoked[key] = exp
+            # Descarta revogações de tokens já expirados
+            for k in [k for k, e in self._revoked.items() if e <= now]:
+                del self._revoked[k]
+    
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_token_cache = _TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def _payload_exp(payload: dict) -> float:
+    """Timestamp de expiração do token (exp pode vir int/float)."""
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        return float(exp)
+    return time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def revoke_token(token: str) -> None:
+    """
+    Revoga um token até sua expiração (ex: logout).
+    
+    Tokens inválidos são ignorados (já seriam rejeitados).
+    """
+    payload = decode_access_token(token)
+    if not payload:
+        return
+    _token_cache.revoke(_TokenCache.key(token), _payload_exp(payload))
+    logger.info("Token revogado para %s", payload.get("sub"))
+
+
+def get_token_cache_stats() -> dict:
+    """Métricas do cache de tokens validados."""
+    return _token_cache.stats()
+
+
 def get_current_user_from_token(token: str) -> Optional[dict]:
     """
     Obtém dados do usuário a partir do token.
     
+    Usa o cache de tokens validados; só decodifica o JWT no primeiro uso
+    do token (ou após sair do cache). Tokens revogados retornam None.
+    
+    ⚠️ O dict retornado é compartilhado pelo cache: não mutar.
+    
     Returns:
         Dict com id_user, email e papel, ou None se token inválido
     """
+    key = _TokenCache.key(token)
+    found, cached_user = _token_cache.get(key)
+    if found:
+        return cached_user
+    
     payload = decode_access_token(token)
     if not payload:
         return None
@@ -468,7 +608,7 @@ def get_current_user_from_token(token: str) -> Optional[dict]:
     if not email or not papel:
         return None
     
-    return {
+    user_data = {
         "id_user": id_user,
         "email": email,
         "papel": papel,
@@ -476,4 +616,7 @@ def get_current_user_from_token(token: str) -> Optional[dict]:
         "nick": payload.get("nick"),
         "short_nome": payload.get("short_nome"),
     }
+    _token_cache.set(key, user_data, _payload_exp(payload))
+    
+    return user_data
 
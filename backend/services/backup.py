@@ -5,6 +5,9 @@ Realiza cópias de segurança do SQLite para o NAS QNAP.
 Backup automático a cada 2h (7h-19h, dias úteis) + backup manual.
 
 Suporta tanto ambiente Windows (caminhos UNC) quanto Linux/Docker (volumes montados).
+
+A disponibilidade do destino de backup vem do monitor em
+services/storage_health.py (status em memória, verificado em segundo plano).
 """
 
 import logging
@@ -14,10 +17,12 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import TimeoutError as FuturesTimeoutError, wait
 from zoneinfo import ZoneInfo
 
-from config import resolve_sqlite_path
+from config import resolve_audit_db_path, resolve_sqlite_path
+from services.cache import bump_all_versions
+from services.storage_health import invalidate, io_executor, is_available, register_probe
 
 # Timezone do Brasil (São Paulo)
 TZ_BRASIL = ZoneInfo("America/Sao_Paulo")
@@ -58,6 +63,10 @@ else:
 # Número máximo de backups a manter
 MAX_BACKUPS = 21
 
+# Backups do banco de auditoria (agenda própria, ver scheduler.py)
+MAX_AUDIT_BACKUPS = 7
+AUDIT_BACKUP_SUFFIX = "_xFinanceAudit.db"
+
 # Timeout para operações de rede (segundos)
 NETWORK_TIMEOUT = 30
 
@@ -148,9 +157,9 @@ def _ensure_backup_connection() -> bool:
         return False
 
 
-def _is_backup_path_accessible() -> bool:
+def _probe_backup_path() -> bool:
     """
-    Verifica se o caminho de backup está acessível.
+    Verifica (na hora) se o caminho de backup está acessível.
     
     Returns:
         bool: True se acessível
@@ -178,6 +187,16 @@ def _is_backup_path_accessible() -> bool:
         return False
 
 
+TARGET_BACKUP = "backup"
+
+register_probe(TARGET_BACKUP, _probe_backup_path)
+
+
+def _is_backup_path_accessible() -> bool:
+    """Caminho de backup acessível (status do monitor)."""
+    return is_available(TARGET_BACKUP)
+
+
 # =============================================================================
 # FUNÇÕES DE BACKUP
 # =============================================================================
@@ -194,32 +213,32 @@ def _generate_backup_filename() -> str:
     return now.strftime("%y%m%d_%H%M_xFinanceDB.db")
 
 
-def _copy_with_timeout(src: str, dst: str, timeout: int = NETWORK_TIMEOUT) -> bool:
+def _copy_with_timeout(src: str, dst: str, timeout: int = NETWORK_TIMEOUT, wait_on_timeout: bool = False) -> bool:
     """
-    Copia arquivo com timeout usando thread.
+    Copia arquivo com timeout (pool de I/O compartilhado).
     
     Args:
         src: Caminho de origem
         dst: Caminho de destino
         timeout: Timeout em segundos
+        wait_on_timeout: Após o timeout, aguarda a cópia terminar antes de
+            retornar (quando o chamador vai reescrever o mesmo destino)
         
     Returns:
         bool: True se copiado com sucesso
     """
-    def _do_copy():
-        shutil.copy2(src, dst)
-        return True
-    
+    future = io_executor.submit(shutil.copy2, src, dst)
     try:
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_do_copy)
-            return future.result(timeout=timeout)
+        future.result(timeout=timeout)
+        return True
     except FuturesTimeoutError:
         logger.warning("BACKUP: Timeout ao copiar arquivo")
-        return False
+        if wait_on_timeout and not future.cancel():
+            wait([future])
     except Exception as e:
         logger.warning("BACKUP: Erro ao copiar - %s", e)
-        return False
+    invalidate(TARGET_BACKUP)
+    return False
 
 
 def create_backup() -> Tuple[bool, str]:
@@ -266,9 +285,13 @@ def create_backup() -> Tuple[bool, str]:
         return False, f"Erro: {e}"
 
 
-def _cleanup_old_backups() -> int:
+def _cleanup_old_backups(pattern: str = "*_xFinanceDB.db", keep: int = MAX_BACKUPS) -> int:
     """
-    Remove backups antigos, mantendo apenas os últimos MAX_BACKUPS.
+    Remove backups antigos, mantendo apenas os últimos `keep`.
+    
+    Args:
+        pattern: Glob dos arquivos de backup
+        keep: Quantidade a manter (padrão MAX_BACKUPS)
     
     Returns:
         int: Número de backups removidos
@@ -279,14 +302,14 @@ def _cleanup_old_backups() -> int:
             return 0
         
         # Listar todos os arquivos de backup (padrão: *_xFinanceDB.db)
-        backups = list(backup_dir.glob("*_xFinanceDB.db"))
+        backups = list(backup_dir.glob(pattern))
         
         # Ordenar por data de modificação (mais recente primeiro)
         backups.sort(key=lambda p: p.stat().st_mtime, reverse=True)
         
         # Remover excedentes
         removed = 0
-        for old_backup in backups[MAX_BACKUPS:]:
+        for old_backup in backups[keep:]:
             try:
                 old_backup.unlink()
                 logger.debug("BACKUP: Removido backup antigo - %s", old_backup.name)
@@ -301,6 +324,51 @@ def _cleanup_old_backups() -> int:
         return 0
 
 
+def create_audit_backup() -> Tuple[bool, str]:
+    """
+    Cria uma cópia de backup do banco de auditoria (xFinanceAudit.db).
+    
+    Roda em agenda própria (menos frequente que o banco principal).
+    Antes da cópia grava a fila pendente e faz checkpoint do WAL para que
+    o arquivo copiado esteja completo.
+    
+    Returns:
+        tuple: (sucesso: bool, mensagem: str)
+    """
+    from database import get_audit_db
+    from services.audit import flush_audit
+    
+    try:
+        if not _is_backup_path_accessible():
+            return False, "NAS de backup inacessível"
+        
+        audit_path = resolve_audit_db_path()
+        if not os.path.exists(audit_path):
+            return False, f"Banco de auditoria não encontrado: {audit_path}"
+        
+        flush_audit()
+        with get_audit_db() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        backup_filename = datetime.now(TZ_BRASIL).strftime("%y%m%d_%H%M") + AUDIT_BACKUP_SUFFIX
+        backup_path = os.path.join(NAS_BACKUP_PATH, backup_filename)
+        
+        logger.info("BACKUP: Iniciando cópia da auditoria para %s", backup_path)
+        
+        if not _copy_with_timeout(audit_path, backup_path, timeout=NETWORK_TIMEOUT * 2):
+            return False, "Falha ao copiar banco de auditoria (timeout ou erro)"
+        
+        cleanup_count = _cleanup_old_backups(f"*{AUDIT_BACKUP_SUFFIX}", MAX_AUDIT_BACKUPS)
+        if cleanup_count > 0:
+            logger.info("BACKUP: Removidos %d backups antigos de auditoria", cleanup_count)
+        
+        return True, f"Backup de auditoria criado: {backup_filename}"
+        
+    except Exception as e:
+        logger.error("BACKUP: Erro no backup de auditoria - %s", e)
+        return False, f"Erro: {e}"
+
+
 def list_backups() -> List[dict]:
     """
     Lista todos os backups disponíveis no NAS.
@@ -445,7 +513,7 @@ def restore_backup(backup_filename: str) -> Tuple[bool, str]:
         
         # Passo 2: Copiar backup para substituir o banco atual
         logger.info("RESTORE: Copiando backup para substituir banco...")
-        if not _copy_with_timeout(backup_path, db_path, timeout=60):
+        if not _copy_with_timeout(backup_path, db_path, timeout=60, wait_on_timeout=True):
             # Tentar reverter: copiar o damage de volta
             logger.error("RESTORE: Falha ao copiar backup! Tentando reverter...")
             try:
@@ -455,6 +523,9 @@ def restore_backup(backup_filename: str) -> Tuple[bool, str]:
                 logger.error("RESTORE: Falha ao reverter! %s", e)
             return False, "Falha ao copiar backup para banco atual"
         
+        # Banco substituído: descartar todos os resultados em cache
+        bump_all_versions()
+        
         logger.info("RESTORE: Restauração concluída com sucesso!")
         logger.info("RESTORE: Banco restaurado de: %s", backup_filename)
         logger.info("RESTORE: Banco anterior salvo como: %s", damage_filename)
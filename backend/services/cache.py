@@ -0,0 +1,237 @@
+"""
+Cache de resultados de queries - xFinance
+
+Cache em memória (LRU limitado + TTL) para funções de leitura cujos dados
+só mudam quando determinadas tabelas são escritas (ex: performance → princ,
+investimentos → finan).
+
+Invalidação:
+- Cada entrada é marcada com as tabelas de origem (tags) e guarda a versão
+  de cada tabela no momento do cálculo.
+- Todo ponto de escrita chama bump_table_version("princ", ...) após o commit.
+  Na próxima leitura a versão diverge e a entrada é descartada.
+- O TTL limita a defasagem quando o banco é alterado por fora da API
+  (scripts, sistema legado).
+
+Uso:
+    @cached(tables=("princ", "contr"))
+    def fetch_kpis(...):
+        ...
+
+⚠️ O resultado é compartilhado entre os chamadores: quem consome NÃO deve
+mutar o dict/list retornado.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional, TypeVar
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+# =============================================================================
+# VERSÃO DOS DADOS (por tabela)
+# =============================================================================
+
+_versions_lock = threading.Lock()
+_table_versions: dict[str, int] = {}
+
+
+def get_table_version(table: str) -> int:
+    """Retorna a versão atual (em memória) de uma tabela."""
+    return _table_versions.get(table, 0)
+
+
+def bump_table_version(*tables: str) -> None:
+    """
+    Marca tabelas como alteradas.
+
+    Chamar APÓS o commit de qualquer escrita nas tabelas informadas.
+    """
+    with _versions_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+    logger.debug("CACHE: versão incrementada para %s", ", ".join(tables))
+
+
+def bump_all_versions() -> None:
+    """Invalida todas as tabelas conhecidas (ex: após restaurar backup)."""
+    with _versions_lock:
+        for table in list(_table_versions):
+            _table_versions[table] += 1
+    for cache in _caches.values():
+        cache.clear()
+    logger.info("CACHE: todas as entradas invalidadas")
+
+
+# =============================================================================
+# CACHE LRU + TTL
+# =============================================================================
+
+class _Entry:
+    """Entrada do cache."""
+
+    __slots__ = ("value", "expires_at", "versions")
+
+    def __init__(self, value: Any, expires_at: float, versions: tuple[int, ...]) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.versions = versions
+
+
+class QueryCache:
+    """
+    Cache LRU com TTL e invalidação por versão de tabela.
+
+    Thread-safe (rotas síncronas rodam no threadpool do FastAPI).
+    """
+
+    def __init__(self, name: str, tables: tuple[str, ...], ttl: float, maxsize: int) -> None:
+        self.name = name
+        self.tables = tables
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, _Entry] = OrderedDict()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _current_versions(self) -> tuple[int, ...]:
+        return tuple(get_table_version(t) for t in self.tables)
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Retorna (encontrado, valor)."""
+        now = time.monotonic()
+        versions = self._current_versions()
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            if entry.versions != versions:
+                del self._data[key]
+                self.invalidations += 1
+                self.misses += 1
+                return False, None
+
+            if entry.expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry.value
+
+    def set(self, key: Hashable, value: Any, versions: tuple[int, ...]) -> None:
+        """
+        Armazena valor calculado com as versões lidas ANTES do cálculo.
+
+        Se uma escrita ocorrer durante o cálculo, a entrada já nasce
+        desatualizada e será descartada na próxima leitura.
+        """
+        with self._lock:
+            self._data[key] = _Entry(value, time.monotonic() + self.ttl, versions)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Retorna métricas do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "tables": list(self.tables),
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Registro global (para métricas e invalidação total)
+_caches: dict[str, QueryCache] = {}
+
+
+def cached(
+    tables: Iterable[str],
+    ttl: Optional[float] = None,
+    maxsize: Optional[int] = None,
+) -> Callable[[F], F]:
+    """
+    Decorator: cacheia o resultado da função por argumentos.
+
+    Args:
+        tables: Tabelas de origem dos dados (invalidação por versão)
+        ttl: Tempo de vida em segundos (padrão: QUERY_CACHE_TTL_SECONDS)
+        maxsize: Máximo de entradas (padrão: QUERY_CACHE_MAX_ENTRIES)
+
+    Os argumentos são normalizados pela assinatura (posicional, nomeado e
+    defaults geram a mesma chave) e devem ser hashable.
+    """
+    settings = get_settings()
+    tables = tuple(tables)
+    ttl = settings.QUERY_CACHE_TTL_SECONDS if ttl is None else ttl
+    maxsize = settings.QUERY_CACHE_MAX_ENTRIES if maxsize is None else maxsize
+
+    def decorator(fn: F) -> F:
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        cache = QueryCache(name, tables, ttl, maxsize)
+        _caches[name] = cache
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.QUERY_CACHE_ENABLED:
+                return fn(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            versions = cache._current_versions()
+            value = fn(*args, **kwargs)
+            cache.set(key, value, versions)
+            return value
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def get_cache_stats() -> list[dict]:
+    """Retorna métricas de todos os caches registrados."""
+    return [cache.stats() for cache in _caches.values()]
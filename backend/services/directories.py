@@ -3,23 +3,44 @@ Serviço de criação de diretórios - xFinance
 
 Cria diretórios no NAS e pasta de fotos após inserção de nova inspeção.
 Suporta tanto ambiente Windows (caminhos UNC) quanto Linux/Docker (volumes montados).
+
+Os endpoints de criação não esperam o NAS: enfileiram um job
+(enqueue_create_directories, ver services/jobs.py) e retornam o id_job;
+o status é consultado em GET /api/jobs/{id}.
+
+A disponibilidade do NAS e do servidor de Fotos vem do monitor em
+services/storage_health.py (status em memória, verificado em segundo plano).
+
+Os destinos (Trabalhos e Fotos) são criados em paralelo no pool de I/O, e
+um índice das pastas existentes por player/ano (DirectoryIndex) evita
+idas ao NAS para pastas que já existem.
 """
 
 import logging
 import os
 import platform
 import socket
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from typing import Optional, Tuple, List
 
+from config import get_settings
+from services.jobs import JobError, enqueue_job, register_job_handler
 from services.queries.new_inspection import get_directory_info
+from services.storage_health import invalidate, io_executor, is_available, register_probe
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # Timeout para operações de rede (segundos)
 NETWORK_TIMEOUT = 5
 
+# Timeout para criar as pastas de um job (todos os destinos, em paralelo)
+PROVISION_TIMEOUT = 15
+
 # Detectar ambiente de execução
 IS_LINUX = platform.system() == "Linux"
 
@@ -121,45 +142,150 @@ def _is_server_reachable(server_path: str) -> bool:
         return False
 
 
-def _is_nas_reachable() -> bool:
-    """Verifica se o NAS de Trabalhos está acessível."""
+def _probe_nas() -> bool:
+    """Verifica (na hora) se o NAS de Trabalhos está acessível."""
     if USE_LINUX_MOUNTS:
         return _is_mount_available(NAS_MOUNT)
     return _is_server_reachable(NAS_SERVER_UNC)
 
 
-def _is_photos_server_reachable() -> bool:
-    """Verifica se o servidor de Fotos está acessível."""
+def _probe_photos() -> bool:
+    """Verifica (na hora) se o servidor de Fotos está acessível."""
     if USE_LINUX_MOUNTS:
         return _is_mount_available(PHOTOS_MOUNT)
     return _is_server_reachable(PHOTOS_SERVER_UNC)
 
 
-def _create_directory_with_timeout(path: str, timeout: int = 10) -> bool:
+TARGET_NAS = "nas"
+TARGET_PHOTOS = "fotos"
+
+register_probe(TARGET_NAS, _probe_nas)
+register_probe(TARGET_PHOTOS, _probe_photos)
+
+
+def _is_nas_reachable() -> bool:
+    """NAS de Trabalhos acessível (status do monitor)."""
+    return is_available(TARGET_NAS)
+
+
+def _is_photos_server_reachable() -> bool:
+    """Servidor de Fotos acessível (status do monitor)."""
+    return is_available(TARGET_PHOTOS)
+
+
+# =============================================================================
+# ÍNDICE DE DIRETÓRIOS EXISTENTES
+# =============================================================================
+
+class DirectoryIndex:
     """
-    Cria diretório com timeout usando thread.
+    Pastas de job já existentes, por diretório pai (ex: Trabalhos/2025/PLAYER).
     
-    Args:
-        path: Caminho do diretório
-        timeout: Timeout em segundos
+    Cada pai é listado uma vez (os.scandir) e atualizado a cada pasta
+    criada; pedidos repetidos ou locais adicionais no mesmo pai não fazem
+    nova ida ao NAS. A listagem é refeita após DIRECTORY_INDEX_TTL_SECONDS
+    (pastas criadas fora da API).
+    
+    Pasta encontrada no índice é confirmada com os.path.isdir (um stat,
+    em vez de listar o pai): se foi removida/renomeada fora da API, sai do
+    índice e é recriada, sem esperar o TTL.
+    
+    ⚠️ contains()/add() fazem I/O de rede: chamar no pool de I/O.
+    """
+    
+    def __init__(self, ttl: float, max_parents: int = 256) -> None:
+        self.ttl = ttl
+        self.max_parents = max_parents
+        self._lock = threading.Lock()
+        # pai -> (nomes das subpastas, monotonic da listagem)
+        self._parents: OrderedDict[str, tuple[set[str], float]] = OrderedDict()
+        
+        # Métricas
+        self.scans = 0
+        self.hits = 0
+        self.stale = 0
+        self.created = 0
+    
+    def _names(self, parent: str) -> set[str]:
+        """Subpastas do pai (listagem em cache ou nova leitura)."""
+        with self._lock:
+            entry = self._parents.get(parent)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                self._parents.move_to_end(parent)
+                return entry[0]
+        
+        try:
+            with os.scandir(parent) as it:
+                names = {e.name for e in it if e.is_dir()}
+        except FileNotFoundError:
+            names = set()  # Pai ainda não existe (1º job do player/ano)
+        
+        with self._lock:
+            self.scans += 1
+            self._parents[parent] = (names, time.monotonic())
+            self._parents.move_to_end(parent)
+            while len(self._parents) > self.max_parents:
+                self._parents.popitem(last=False)
+        return names
+    
+    def contains(self, path: str) -> bool:
+        parent, name = os.path.split(path)
+        if name not in self._names(parent):
+            return False
         
+        if not os.path.isdir(path):
+            # Removida/renomeada fora da API depois da listagem
+            with self._lock:
+                self.stale += 1
+                entry = self._parents.get(parent)
+                if entry is not None:
+                    entry[0].discard(name)
+            return False
+        
+        with self._lock:
+            self.hits += 1
+        return True
+    
+    def add(self, path: str) -> None:
+        parent, name = os.path.split(path)
+        with self._lock:
+            self.created += 1
+            entry = self._parents.get(parent)
+            if entry is not None:
+                entry[0].add(name)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "parents": len(self._parents),
+                "folders": sum(len(names) for names, _ in self._parents.values()),
+                "scans": self.scans,
+                "hits": self.hits,
+                "stale": self.stale,
+                "created": self.created,
+            }
+
+
+directory_index = DirectoryIndex(settings.DIRECTORY_INDEX_TTL_SECONDS)
+
+
+def get_directory_index_stats() -> dict:
+    """Métricas do índice de diretórios existentes."""
+    return directory_index.stats()
+
+
+def _provision_path(path: str) -> bool:
+    """
+    Garante a pasta (executa no pool de I/O).
+    
     Returns:
-        bool: True se criado, False se falhou
+        bool: True se já existia (segundo o índice), False se foi criada
     """
-    def _make_dirs():
-        os.makedirs(path, exist_ok=True)
+    if directory_index.contains(path):
         return True
-    
-    try:
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_make_dirs)
-            return future.result(timeout=timeout)
-    except FuturesTimeoutError:
-        logger.warning("Timeout ao criar diretório: %s", path)
-        return False
-    except Exception as e:
-        logger.warning("Erro ao criar diretório: %s -> %s", path, e)
-        return False
+    os.makedirs(path, exist_ok=True)
+    directory_index.add(path)
+    return False
 
 
 # =============================================================================
@@ -354,48 +480,42 @@ def create_directories(
         failures = []
         
         # =========================================
-        # 1. Criar diretório no NAS de Trabalhos
+        # Destinos: NAS (Trabalhos) + servidor de Fotos
         # =========================================
-        nas_reachable = _is_nas_reachable()
-        
-        if nas_reachable:
-            # Garantir autenticação no NAS
-            _ensure_nas_connection()
-            
-            # Criar diretório no NAS com timeout
-            if _create_directory_with_timeout(target_trabalhos, timeout=15):
-                created.append(target_trabalhos)
-                created_display.append(f"NAS: {name_part}")
-                logger.info("NAS criado: %s", target_trabalhos)
-            else:
-                failures.append((target_trabalhos, "Timeout ou erro ao criar"))
-                logger.warning("ERRO AO CRIAR NAS: %s", target_trabalhos)
-        else:
-            # NAS inacessível - pular sem esperar
-            failures.append((target_trabalhos, "NAS inacessível"))
-            logger.warning("NAS INACESSÍVEL - Pulando criação de diretório")
+        targets = [
+            (TARGET_NAS, "NAS", target_trabalhos, "NAS inacessível", _ensure_nas_connection),
+            (TARGET_PHOTOS, "Fotos", target_fotos, "Servidor de fotos inacessível", _ensure_photos_connection),
+        ]
         
-        # =========================================
-        # 2. Criar diretório no servidor de Fotos
-        # =========================================
-        photos_reachable = _is_photos_server_reachable()
+        # Disparar todos os destinos acessíveis ao mesmo tempo
+        pending = []
+        for target, label, path, unreachable_msg, ensure_connection in targets:
+            if not is_available(target):
+                # Destino inacessível - pular sem esperar
+                failures.append((path, unreachable_msg))
+                logger.warning("%s INACESSÍVEL - Pulando criação de diretório", label.upper())
+                continue
+            ensure_connection()
+            pending.append((target, label, path, io_executor.submit(_provision_path, path)))
         
-        if photos_reachable:
-            # Garantir autenticação no servidor de fotos
-            _ensure_photos_connection()
+        # Aguardar com prazo único para o conjunto
+        deadline = time.monotonic() + PROVISION_TIMEOUT
+        for target, label, path, future in pending:
+            try:
+                existed = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except Exception as e:
+                future.cancel()  # Timeout: só tem efeito se ainda não começou
+                failures.append((path, "Timeout ou erro ao criar"))
+                logger.warning(
+                    "ERRO AO CRIAR %s: %s -> %s",
+                    label.upper(), path, "timeout" if isinstance(e, FuturesTimeoutError) else e
+                )
+                invalidate(target)
+                continue
             
-            # Criar diretório de fotos com timeout
-            if _create_directory_with_timeout(target_fotos, timeout=15):
-                created.append(target_fotos)
-                created_display.append(f"Fotos: {name_part}")
-                logger.info("FOTOS criado: %s", target_fotos)
-            else:
-                failures.append((target_fotos, "Timeout ou erro ao criar"))
-                logger.warning("ERRO AO CRIAR FOTOS: %s", target_fotos)
-        else:
-            # Servidor de fotos inacessível - pular sem esperar
-            failures.append((target_fotos, "Servidor de fotos inacessível"))
-            logger.warning("FOTOS: Mount/servidor inacessível - pulando")
+            created.append(path)
+            created_display.append(f"{label}: {name_part}")
+            logger.info("%s %s: %s", label.upper(), "já existia" if existed else "criado", path)
         
         # Retornar resultado
         if len(created) == 2:
@@ -409,3 +529,57 @@ def create_directories(
     except Exception as e:
         logger.warning("Falha ao preparar diretórios: %s", e)
         return (f"❌ Erro: {e}", [])
+
+
+# =============================================================================
+# JOB EM SEGUNDO PLANO
+# =============================================================================
+
+JOB_CREATE_DIRECTORIES = "create_directories"
+
+# Destinos criados por job: Trabalhos (NAS) + Fotos
+_TOTAL_TARGETS = 2
+
+
+def _create_directories_job(payload: dict) -> dict:
+    """
+    Handler do job: cria os diretórios e pede nova tentativa se algum
+    destino falhou (os.makedirs com exist_ok torna a repetição segura).
+    """
+    dir_msg, dirs_created = create_directories(**payload)
+    result = {"message": dir_msg, "dirs_created": dirs_created}
+    if len(dirs_created) < _TOTAL_TARGETS:
+        raise JobError(dir_msg, result)
+    return result
+
+
+register_job_handler(JOB_CREATE_DIRECTORIES, _create_directories_job)
+
+
+def enqueue_create_directories(
+    id_contr: int,
+    id_segur: int,
+    dt_acerto: str,
+    id_uf: int,
+    id_cidade: int,
+    unidade: Optional[str] = None,
+    id_princ: Optional[int] = None,
+    id_user: Optional[int] = None,
+) -> int:
+    """
+    Enfileira a criação de diretórios (mesmos argumentos de create_directories).
+    
+    id_user identifica quem criou o job (acesso ao status).
+    
+    Returns:
+        id_job para acompanhamento em GET /api/jobs/{id}
+    """
+    payload = {
+        "id_contr": id_contr,
+        "id_segur": id_segur,
+        "dt_acerto": dt_acerto,
+        "id_uf": id_uf,
+        "id_cidade": id_cidade,
+        "unidade": unidade,
+    }
+    return enqueue_job(JOB_CREATE_DIRECTORIES, payload, id_princ=id_princ, id_user=id_user)
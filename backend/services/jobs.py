@@ -0,0 +1,458 @@
+"""
+Fila Persistente de Jobs - xFinance
+
+Tarefas lentas que não precisam segurar a resposta HTTP (ex: criação de
+diretórios no NAS/Fotos) são gravadas na tabela `jobs` e executadas por
+threads de fundo.
+
+Ciclo de vida:
+    pending → running → done
+                      ↘ pending (nova tentativa, com backoff exponencial)
+                      ↘ failed  (esgotou JOBS_MAX_ATTEMPTS)
+
+Persistência:
+- A tabela fica no banco principal (criada na primeira chamada do processo)
+- Jobs 'running' de um processo interrompido voltam para 'pending' no start
+- Jobs concluídos/falhos são removidos após JOBS_RETENTION_DAYS (no start
+  e diariamente pelo scheduler, ver purge_old_jobs)
+
+Handlers:
+    register_job_handler("create_directories", fn)   # fn(payload) -> dict
+    id_job = enqueue_job("create_directories", payload, id_princ=123, id_user=7)
+    get_job(id_job)                                  # GET /api/jobs/{id}
+
+Acesso: GET /api/jobs/{id} só mostra o job ao usuário que o criou (id_user)
+ou a um admin.
+
+O handler levanta exceção para pedir nova tentativa (JobError permite
+guardar um resultado parcial). Handlers devem ser idempotentes.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from config import get_settings
+from database import get_db
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_JOB_COLUMNS = (
+    "id_job", "tipo", "id_princ", "id_user", "status", "tentativas", "max_tentativas",
+    "proximo_em", "resultado", "erro", "dt_criacao", "dt_atualizacao",
+)
+
+
+class JobError(Exception):
+    """Falha de um job (nova tentativa), opcionalmente com resultado parcial."""
+    
+    def __init__(self, message: str, result: Optional[dict] = None) -> None:
+        super().__init__(message)
+        self.result = result
+
+
+# =============================================================================
+# TABELA
+# =============================================================================
+
+# DDL executado uma única vez por processo
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def _ensure_table_exists() -> None:
+    """Cria a tabela jobs se não existir (apenas na primeira chamada)."""
+    global _table_ready
+    if _table_ready:
+        return
+    
+    with _table_lock:
+        if _table_ready:
+            return
+        with get_db() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS "jobs" (
+                    id_job INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tipo TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    id_princ INTEGER,
+                    id_user INTEGER,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    max_tentativas INTEGER NOT NULL,
+                    proximo_em TEXT NOT NULL,
+                    resultado TEXT,
+                    erro TEXT,
+                    dt_criacao TEXT NOT NULL,
+                    dt_atualizacao TEXT NOT NULL
+                )
+            """)
+            # Tabelas criadas antes do dono do job (id_user)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "id_user" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN id_user INTEGER")
+            # Busca do próximo job: status + horário da próxima execução
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status_proximo ON jobs (status, proximo_em)"
+            )
+            conn.commit()
+        _table_ready = True
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def _fmt(dt: datetime) -> str:
+    return dt.strftime(_DT_FORMAT)
+
+
+# =============================================================================
+# API DE JOBS
+# =============================================================================
+
+_handlers: dict[str, Callable[[dict], dict]] = {}
+
+
+def register_job_handler(tipo: str, handler: Callable[[dict], dict]) -> None:
+    """Registra a função que executa jobs de um tipo."""
+    _handlers[tipo] = handler
+
+
+def enqueue_job(
+    tipo: str,
+    payload: dict,
+    id_princ: Optional[int] = None,
+    id_user: Optional[int] = None,
+) -> int:
+    """
+    Grava um job na fila e acorda os workers.
+    
+    Args:
+        tipo: Tipo do job (register_job_handler)
+        payload: Argumentos do handler (JSON)
+        id_princ: Inspeção relacionada (opcional)
+        id_user: Usuário que criou o job (acesso ao status)
+    
+    Returns:
+        id_job
+    """
+    _ensure_table_exists()
+    now = _fmt(_now())
+    
+    with get_db() as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO jobs (
+                tipo, payload, id_princ, id_user, status, tentativas, max_tentativas,
+                proximo_em, dt_criacao, dt_atualizacao
+            ) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
+            """,
+            (
+                tipo,
+                json.dumps(payload, ensure_ascii=False),
+                id_princ,
+                id_user,
+                STATUS_PENDING,
+                settings.JOBS_MAX_ATTEMPTS,
+                now, now, now,
+            )
+        )
+        conn.commit()
+        id_job = cursor.lastrowid
+    
+    job_queue.notify()
+    logger.info("JOBS: #%d enfileirado (%s, princ=%s)", id_job, tipo, id_princ)
+    return id_job
+
+
+def get_job(id_job: int) -> Optional[dict]:
+    """Status de um job (None se não existir)."""
+    _ensure_table_exists()
+    
+    with get_db() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id_job = ?",
+            (id_job,)
+        ).fetchone()
+    
+    if not row:
+        return None
+    
+    job = dict(row)
+    job["resultado"] = json.loads(job["resultado"]) if job["resultado"] else None
+    return job
+
+
+def _retry_delay(tentativas: int) -> float:
+    """Backoff exponencial: base, 2×base, 4×base... limitado a JOBS_RETRY_MAX_SECONDS."""
+    delay = settings.JOBS_RETRY_BASE_SECONDS * (2 ** max(tentativas - 1, 0))
+    return min(delay, settings.JOBS_RETRY_MAX_SECONDS)
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+class JobQueue:
+    """
+    Executa os jobs pendentes em threads de fundo.
+    
+    Os workers acordam a cada enqueue (notify) ou a cada JOBS_POLL_SECONDS
+    (jobs com nova tentativa agendada). A reserva de um job é serializada
+    por um lock do processo + UPDATE condicionado ao status.
+    """
+    
+    def __init__(self, workers: int, poll_interval: float) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Condition()
+        self._pending_signals = 0
+        self._claim_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        
+        # Métricas
+        self.executed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.recovered = 0
+    
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        _ensure_table_exists()
+        self._recover()
+        self.purge_old()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"jobs-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+        logger.info("JOBS: %d worker(s) iniciado(s)", self.workers)
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """Encerra os workers (jobs em execução terminam; pendentes ficam no banco)."""
+        if not self._threads:
+            return
+        self._stop.set()
+        self.notify(len(self._threads))
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        logger.info("JOBS: workers finalizados")
+    
+    def notify(self, count: int = 1) -> None:
+        """Acorda workers ociosos (novo job na fila)."""
+        with self._wakeup:
+            self._pending_signals += count
+            self._wakeup.notify(count)
+    
+    def _wait(self) -> None:
+        with self._wakeup:
+            if self._pending_signals == 0:
+                self._wakeup.wait(self.poll_interval)
+            self._pending_signals = max(self._pending_signals - 1, 0)
+    
+    # =========================================================================
+    # MANUTENÇÃO
+    # =========================================================================
+    
+    def _recover(self) -> None:
+        """Jobs 'running' de um processo interrompido voltam para a fila."""
+        with get_db() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, dt_atualizacao = ? WHERE status = ?",
+                (STATUS_PENDING, _fmt(_now()), STATUS_RUNNING)
+            )
+            conn.commit()
+        if cursor.rowcount:
+            with self._stats_lock:
+                self.recovered += cursor.rowcount
+            logger.warning("JOBS: %d job(s) interrompido(s) devolvido(s) à fila", cursor.rowcount)
+    
+    def purge_old(self) -> int:
+        """
+        Remove jobs finalizados mais antigos que a retenção.
+        
+        Returns:
+            Número de jobs removidos
+        """
+        _ensure_table_exists()
+        cutoff = _fmt(_now() - timedelta(days=settings.JOBS_RETENTION_DAYS))
+        with get_db() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND dt_atualizacao < ?",
+                (STATUS_DONE, STATUS_FAILED, cutoff)
+            )
+            conn.commit()
+        if cursor.rowcount:
+            logger.info("JOBS: %d job(s) antigo(s) removido(s)", cursor.rowcount)
+        return cursor.rowcount
+    
+    # =========================================================================
+    # EXECUÇÃO
+    # =========================================================================
+    
+    def _claim(self) -> Optional[tuple[int, str, dict, int, int]]:
+        """Reserva o próximo job vencido (status → running)."""
+        now = _fmt(_now())
+        with self._claim_lock, get_db() as conn:
+            row = conn.execute(
+                """
+                SELECT id_job, tipo, payload, tentativas, max_tentativas
+                FROM jobs
+                WHERE status = ? AND proximo_em <= ?
+                ORDER BY proximo_em, id_job
+                LIMIT 1
+                """,
+                (STATUS_PENDING, now)
+            ).fetchone()
+            if not row:
+                return None
+            
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET status = ?, tentativas = tentativas + 1, dt_atualizacao = ?
+                WHERE id_job = ? AND status = ?
+                """,
+                (STATUS_RUNNING, now, row[0], STATUS_PENDING)
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                return None
+        
+        return row[0], row[1], json.loads(row[2]), row[3] + 1, row[4]
+    
+    def _finish(self, id_job: int, status: str, result: Optional[dict], error: Optional[str], proximo_em: Optional[str] = None) -> None:
+        now = _fmt(_now())
+        with get_db() as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, resultado = ?, erro = ?,
+                    proximo_em = COALESCE(?, proximo_em), dt_atualizacao = ?
+                WHERE id_job = ?
+                """,
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    proximo_em,
+                    now,
+                    id_job,
+                )
+            )
+            conn.commit()
+    
+    def run_next(self) -> bool:
+        """
+        Executa um job vencido, se houver.
+        
+        Returns:
+            True se algum job foi executado
+        """
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        
+        id_job, tipo, payload, tentativas, max_tentativas = claimed
+        handler = _handlers.get(tipo)
+        
+        try:
+            if handler is None:
+                raise JobError(f"Tipo de job desconhecido: {tipo}")
+            result = handler(payload)
+        except Exception as e:
+            partial = e.result if isinstance(e, JobError) else None
+            if handler is not None and tentativas < max_tentativas:
+                delay = _retry_delay(tentativas)
+                proximo_em = _fmt(_now() + timedelta(seconds=delay))
+                self._finish(id_job, STATUS_PENDING, partial, str(e), proximo_em)
+                with self._stats_lock:
+                    self.executed += 1
+                    self.retried += 1
+                logger.warning(
+                    "JOBS: #%d (%s) falhou na tentativa %d/%d, nova tentativa em %.0fs - %s",
+                    id_job, tipo, tentativas, max_tentativas, delay, e
+                )
+            else:
+                self._finish(id_job, STATUS_FAILED, partial, str(e))
+                with self._stats_lock:
+                    self.executed += 1
+                    self.failed += 1
+                logger.error("JOBS: #%d (%s) falhou definitivamente - %s", id_job, tipo, e)
+            return True
+        
+        self._finish(id_job, STATUS_DONE, result, None)
+        with self._stats_lock:
+            self.executed += 1
+            self.succeeded += 1
+        logger.info("JOBS: #%d (%s) concluído", id_job, tipo)
+        return True
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception as e:
+                logger.error("JOBS: erro no worker - %s", e)
+            self._wait()
+    
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "executed": self.executed,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+                "recovered": self.recovered,
+            }
+
+
+# =============================================================================
+# INSTÂNCIA GLOBAL
+# =============================================================================
+
+job_queue = JobQueue(settings.JOBS_WORKERS, settings.JOBS_POLL_SECONDS)
+
+
+def start_job_workers() -> None:
+    """Inicia os workers da fila (chamado no startup da API)."""
+    job_queue.start()
+
+
+def stop_job_workers() -> None:
+    """Encerra os workers (chamado no shutdown da API)."""
+    job_queue.stop()
+
+
+def purge_old_jobs() -> int:
+    """Remove jobs finalizados além da retenção (job diário no scheduler)."""
+    return job_queue.purge_old()
+
+
+def get_job_stats() -> dict:
+    """Métricas da fila de jobs."""
+    return job_queue.stats()
@@ -0,0 +1,295 @@
+"""
+Tentativas de Login em Memória - xFinance
+
+Contadores de falha (`user.failed_attempts`) e bloqueios (`user.locked_until`)
+ficam num dicionário em memória; o banco é atualizado em lote por uma
+thread de fundo, em vez de uma transação por tentativa.
+
+Persistência:
+- Contadores: gravados a cada AUTH_ATTEMPTS_FLUSH_SECONDS (executemany)
+- Bloqueio: gravado na hora (evento raro) → sobrevive a reinício/queda
+- Shutdown: grava todas as pendências
+
+Estado do banco é a base: na primeira consulta de um email, os valores
+lidos do `user` são usados; a partir daí a memória prevalece enquanto a
+versão do banco (`user.attempts_version`) for a da última leitura/gravação.
+Toda escrita em failed_attempts/locked_until incrementa a versão (trigger
+criado em services/auth.py), inclusive escritas de fora da API que gravem
+os mesmos valores. Versão mais nova no banco = alteração externa
+(set_missing_password, scripts de reset): a entrada em memória é
+descartada e a gravação em lote não sobrescreve o valor novo (UPDATE
+condicionado à versão). No mesmo processo, use reset(email).
+
+As gravações (periódica e a imediata do bloqueio) são serializadas: uma
+não pode tomar a versão da outra por conflito.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from config import get_settings
+from database import get_db
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Regras de bloqueio (mesmas do verify_login original)
+MAX_FAILED_ATTEMPTS = 5
+LOCK_MINUTES = 15
+
+
+class LoginAttemptStore:
+    """Estado de tentativas por email + gravação periódica em lote."""
+    
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # email -> (failed_attempts, locked_until ISO | None)
+        self._state: dict[str, tuple[int, Optional[str]]] = {}
+        # email -> user.attempts_version na última leitura/gravação
+        self._synced: dict[str, int] = {}
+        self._dirty: set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # Métricas
+        self.flushes = 0
+        self.written = 0
+        self.lockouts = 0
+        self.failed = 0
+        self.external_resets = 0
+    
+    # =========================================================================
+    # ESTADO
+    # =========================================================================
+    
+    def _drop(self, email: str) -> None:
+        """Remove o email da memória (chamar com self._lock)."""
+        self._state.pop(email, None)
+        self._synced.pop(email, None)
+        self._dirty.discard(email)
+    
+    def _current(
+        self,
+        email: str,
+        db_attempts: int,
+        db_locked: Optional[str],
+        db_version: int,
+    ) -> tuple[int, Optional[str]]:
+        """
+        Estado do email (chamar com self._lock).
+        
+        Versão do banco mais nova que a conhecida = alteração externa
+        (reset de senha/tentativas): o banco prevalece. Versão mais antiga
+        é uma leitura anterior à nossa última gravação e é ignorada.
+        """
+        db_version = db_version or 0
+        if email in self._state and db_version > self._synced.get(email, 0):
+            logger.info("LOGIN ATTEMPTS: %s alterado no banco, descartando estado em memória", email)
+            self._drop(email)
+            self.external_resets += 1
+        
+        if email not in self._state:
+            self._synced[email] = db_version
+            return (db_attempts or 0, db_locked)
+        return self._state[email]
+    
+    def get(
+        self,
+        email: str,
+        db_attempts: int,
+        db_locked: Optional[str],
+        db_version: int,
+    ) -> tuple[int, Optional[str]]:
+        """Estado atual do email (memória, ou os valores lidos do banco)."""
+        with self._lock:
+            state = self._current(email, db_attempts, db_locked, db_version)
+            if email not in self._state:
+                self._synced.pop(email, None)
+            return state
+    
+    def reset(self, email: str) -> None:
+        """Descarta o estado do email (após zerar tentativas/bloqueio no banco)."""
+        with self._lock:
+            self._drop(email)
+    
+    def record_failure(
+        self,
+        email: str,
+        db_attempts: int,
+        db_locked: Optional[str],
+        db_version: int,
+    ) -> tuple[int, Optional[str]]:
+        """
+        Registra uma falha de senha.
+        
+        Returns:
+            (tentativas, locked_until) após a falha
+        """
+        with self._lock:
+            attempts, _locked = self._current(email, db_attempts, db_locked, db_version)
+            attempts += 1
+            locked_until = None
+            if attempts >= MAX_FAILED_ATTEMPTS:
+                locked_until = (datetime.utcnow() + timedelta(minutes=LOCK_MINUTES)).isoformat()
+            self._state[email] = (attempts, locked_until)
+            self._dirty.add(email)
+        
+        if locked_until:
+            with self._lock:
+                self.lockouts += 1
+            # Bloqueio não pode se perder num reinício: grava imediatamente
+            self.flush(emails=[email])
+        
+        return attempts, locked_until
+    
+    def record_success(
+        self,
+        email: str,
+        db_attempts: int,
+        db_locked: Optional[str],
+        db_version: int,
+    ) -> None:
+        """Login bem-sucedido: zera tentativas (só grava se havia algo a zerar)."""
+        with self._lock:
+            attempts, locked = self._current(email, db_attempts, db_locked, db_version)
+            if attempts == 0 and locked is None:
+                if email not in self._state:
+                    self._synced.pop(email, None)
+                return
+            self._state[email] = (0, None)
+            self._dirty.add(email)
+    
+    # =========================================================================
+    # PERSISTÊNCIA
+    # =========================================================================
+    
+    def flush(self, emails: Optional[list[str]] = None) -> int:
+        """
+        Grava no banco os emails pendentes (todos, ou apenas `emails`).
+        
+        Returns:
+            Número de usuários gravados
+        """
+        with self._flush_lock:
+            return self._flush(emails)
+    
+    def _flush(self, emails: Optional[list[str]]) -> int:
+        """Gravação em si (chamar com self._flush_lock)."""
+        with self._lock:
+            pending = self._dirty if emails is None else self._dirty.intersection(emails)
+            rows = [(*self._state[e], self._synced.get(e, 0), e) for e in pending]
+            self._dirty.difference_update(pending)
+        
+        if not rows:
+            return 0
+        
+        # Só grava se o banco ainda está na versão conhecida (senão foi
+        # alterado por fora e essa alteração prevalece); o trigger incrementa
+        # a versão e a nova é lida na mesma transação
+        conflicts: set[str] = set()
+        versions: dict[str, int] = {}
+        try:
+            with get_db() as conn:
+                for attempts, locked, synced_version, email in rows:
+                    cursor = conn.execute(
+                        """
+                        UPDATE user SET failed_attempts = ?, locked_until = ?
+                        WHERE email = ? AND COALESCE(attempts_version, 0) = ?
+                        """,
+                        (attempts, locked, email, synced_version),
+                    )
+                    if cursor.rowcount == 0:
+                        conflicts.add(email)
+                        continue
+                    versions[email] = conn.execute(
+                        "SELECT COALESCE(attempts_version, 0) FROM user WHERE email = ?",
+                        (email,),
+                    ).fetchone()[0]
+                conn.commit()
+        except Exception as e:
+            # Devolve para a próxima rodada (sem sobrescrever estado mais novo)
+            with self._lock:
+                self._dirty.update(r[3] for r in rows)
+                self.failed += 1
+            logger.error("LOGIN ATTEMPTS: erro ao gravar %d usuário(s) - %s", len(rows), e)
+            return 0
+        
+        with self._lock:
+            self.flushes += 1
+            self.written += len(versions)
+            for attempts, locked, _synced_version, email in rows:
+                if email in conflicts:
+                    self._drop(email)
+                    self.external_resets += 1
+                    continue
+                if email in self._synced:
+                    self._synced[email] = versions[email]
+                # Entradas zeradas e já gravadas não precisam ficar em memória
+                if email not in self._dirty and self._state.get(email) == (0, None):
+                    self._drop(email)
+        
+        if conflicts:
+            logger.info("LOGIN ATTEMPTS: %d usuário(s) alterado(s) no banco, gravação descartada", len(conflicts))
+        return len(versions)
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="login-attempts", daemon=True)
+        self._thread.start()
+        logger.info("LOGIN ATTEMPTS: flush a cada %.0fs", self.flush_interval)
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """Encerra a thread e grava as pendências."""
+        if self.running:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tracked": len(self._state),
+                "pending": len(self._dirty),
+                "flushes": self.flushes,
+                "written": self.written,
+                "lockouts": self.lockouts,
+                "failed": self.failed,
+                "external_resets": self.external_resets,
+            }
+
+
+# =============================================================================
+# INSTÂNCIA GLOBAL
+# =============================================================================
+
+attempt_store = LoginAttemptStore(settings.AUTH_ATTEMPTS_FLUSH_SECONDS)
+
+
+def start_attempt_flusher() -> None:
+    """Inicia a gravação periódica (chamado no startup da API)."""
+    attempt_store.start()
+
+
+def stop_attempt_flusher() -> None:
+    """Grava pendências e encerra (chamado no shutdown da API)."""
+    attempt_store.stop()
+
+
+def get_attempt_stats() -> dict:
+    """Métricas das tentativas em memória e da gravação em lote."""
+    return attempt_store.stats()
@@ -0,0 +1,259 @@
+"""
+Proteção do Login - xFinance
+
+1. Executor dedicado para operações de autenticação (bcrypt)
+   - Pool próprio e limitado: rajadas de login não ocupam o threadpool
+     compartilhado pelas demais rotas síncronas
+   - Fila limitada: com o pool saturado a requisição é rejeitada na hora
+     (HTTP 429) em vez de esperar
+
+2. Limite de tentativas em memória (janela deslizante)
+   - Por IP e por email
+   - Número de chaves limitado (descarta as mais antigas)
+   - IP real do cliente: atrás do nginx o peer é sempre o proxy; se o peer
+     está em AUTH_TRUSTED_PROXIES, vale X-Real-IP / X-Forwarded-For
+
+Uso (router):
+    ip = client_ip(request.client.host, request.headers)
+    login_throttle.check(ip, email)          # levanta TooManyAttemptsError
+    result = await run_auth_task(verify_login, email, password)
+"""
+
+import asyncio
+import ipaddress
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TooManyAttemptsError(Exception):
+    """Login rejeitado por excesso de tentativas ou pool saturado."""
+    
+    def __init__(self, message: str, retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.message = message
+        self.retry_after = max(1, retry_after)
+
+
+# =============================================================================
+# EXECUTOR DEDICADO (bcrypt)
+# =============================================================================
+
+class AuthExecutor:
+    """
+    Pool limitado para tarefas de autenticação.
+    
+    Admite no máximo `workers + queue_max` tarefas ao mesmo tempo
+    (executando + aguardando). Acima disso, rejeita imediatamente.
+    """
+    
+    def __init__(self, workers: int, queue_max: int) -> None:
+        self.workers = workers
+        self.capacity = workers + queue_max
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+    
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Executa fn(*args) no pool dedicado; TooManyAttemptsError se saturado."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("AUTH: pool de autenticação saturado, requisição rejeitada")
+            raise TooManyAttemptsError("Servidor ocupado. Tente novamente em instantes.")
+        
+        with self._lock:
+            self.in_flight += 1
+        
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+# =============================================================================
+# LIMITE DE TENTATIVAS (janela deslizante)
+# =============================================================================
+
+class SlidingWindowLimiter:
+    """Conta eventos por chave numa janela de tempo (em memória, thread-safe)."""
+    
+    def __init__(self, max_events: int, window: float, max_keys: int = 10000) -> None:
+        self.max_events = max_events
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._events: OrderedDict[str, deque] = OrderedDict()
+    
+    def _prune(self, events: deque, now: float) -> None:
+        while events and events[0] <= now - self.window:
+            events.popleft()
+    
+    def retry_after(self, key: str) -> int:
+        """Segundos até liberar a chave (0 se ainda há tentativas disponíveis)."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0
+            self._prune(events, now)
+            if len(events) < self.max_events:
+                return 0
+            return math.ceil(events[0] + self.window - now)
+    
+    def hit(self, key: str) -> None:
+        """Registra uma tentativa."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                events = deque()
+                self._events[key] = events
+            else:
+                self._events.move_to_end(key)
+            self._prune(events, now)
+            events.append(now)
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+    
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+_TRUSTED_PROXIES = [
+    ipaddress.ip_network(net, strict=False) for net in settings.AUTH_TRUSTED_PROXIES
+]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(addr in net for net in _TRUSTED_PROXIES)
+
+
+def client_ip(peer: Optional[str], headers: Mapping[str, str]) -> Optional[str]:
+    """
+    IP do cliente para o limite por IP (peer = endereço da conexão).
+    
+    Cabeçalhos só valem quando a conexão vem de um proxy confiável (o
+    cliente não consegue forjá-los passando direto pela API). X-Real-IP é
+    definido pelo nginx ($remote_addr); sem ele, usa o último endereço de
+    X-Forwarded-For (acrescentado pelo próprio proxy).
+    """
+    if not peer or not _is_trusted_proxy(peer):
+        return peer
+    
+    real_ip = headers.get("x-real-ip", "").strip()
+    if real_ip:
+        return real_ip
+    forwarded = [h.strip() for h in headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    return forwarded[-1] if forwarded else peer
+
+
+class LoginThrottle:
+    """Limites de tentativas de login por IP e por email."""
+    
+    def __init__(self) -> None:
+        window = settings.AUTH_THROTTLE_WINDOW_SECONDS
+        self.by_ip = SlidingWindowLimiter(settings.AUTH_THROTTLE_MAX_PER_IP, window)
+        self.by_email = SlidingWindowLimiter(settings.AUTH_THROTTLE_MAX_PER_EMAIL, window)
+        # Consulta + registro atômicos (requisições simultâneas não passam do limite)
+        self._lock = threading.Lock()
+        self.blocked = 0
+    
+    def check(self, ip: Optional[str], email: str) -> None:
+        """
+        Registra a tentativa e valida os limites.
+        
+        Raises:
+            TooManyAttemptsError: IP ou email excederam o limite da janela
+        """
+        email_key = email.strip().lower()
+        with self._lock:
+            wait = max(
+                self.by_ip.retry_after(ip) if ip else 0,
+                self.by_email.retry_after(email_key),
+            )
+            if wait:
+                self.blocked += 1
+            else:
+                if ip:
+                    self.by_ip.hit(ip)
+                self.by_email.hit(email_key)
+        
+        if wait:
+            logger.warning("AUTH: tentativas excedidas (ip=%s, email=%s)", ip, email_key)
+            raise TooManyAttemptsError(
+                f"Muitas tentativas. Aguarde {wait} segundo(s).",
+                retry_after=wait,
+            )
+    
+    def success(self, email: str) -> None:
+        """Login bem-sucedido: zera o contador do email."""
+        self.by_email.reset(email.strip().lower())
+    
+    def stats(self) -> dict:
+        return {
+            "tracked_ips": len(self.by_ip),
+            "tracked_emails": len(self.by_email),
+            "blocked": self.blocked,
+        }
+
+
+# =============================================================================
+# INSTÂNCIAS GLOBAIS
+# =============================================================================
+
+auth_executor = AuthExecutor(settings.AUTH_BCRYPT_WORKERS, settings.AUTH_BCRYPT_QUEUE_MAX)
+login_throttle = LoginThrottle()
+
+
+async def run_auth_task(fn: Callable[..., Any], *args: Any) -> Any:
+    """Executa tarefa de autenticação (bcrypt + banco) no pool dedicado."""
+    return await auth_executor.run(fn, *args)
+
+
+def get_login_guard_stats() -> dict:
+    """Métricas do pool de autenticação e dos limites de tentativas."""
+    return {
+        "executor": auth_executor.stats(),
+        "throttle": login_throttle.stats(),
+    }
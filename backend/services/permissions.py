@@ -8,10 +8,14 @@ Ver também: docs/system/SIGILO.md
 """
 
 import logging
-from functools import lru_cache
-from typing import Optional
+import threading
+import time
+from operator import itemgetter
+from typing import Callable, Iterable, Mapping, Optional
 
+from config import get_settings
 from database import get_db
+from services.cache import bump_table_version, get_table_version
 
 logger = logging.getLogger(__name__)
 
@@ -50,24 +54,8 @@ ACOES_POR_PAPEL = {
 # CONSULTA DE PERMISSÕES (TABELA PERMI)
 # =============================================================================
 
-@lru_cache(maxsize=32)
-def fetch_permissoes_cols(papel: str) -> frozenset[str]:
-    """
-    Busca colunas permitidas para um papel na tabela permi.
-    
-    🔒 CRÍTICO: Esta função determina quais dados o usuário pode ver.
-    
-    Args:
-        papel: Papel do usuário (admin, BackOffice, Inspetor, etc.)
-        
-    Returns:
-        Conjunto de nomes de colunas permitidas (frozenset para cache)
-        
-    Nota:
-        - Usa @lru_cache para evitar consultas repetidas
-        - Retorna frozenset para ser hashable (cache)
-        - Se papel não existe em permi, retorna conjunto vazio
-    """
+def _load_permissoes_cols(papel: str) -> frozenset[str]:
+    """Consulta a tabela permi (sem cache)."""
     with get_db() as conn:
         cursor = conn.execute(
             "SELECT coluna FROM permi WHERE user_papel = ?",
@@ -84,19 +72,157 @@ def fetch_permissoes_cols(papel: str) -> frozenset[str]:
         return colunas
 
 
-def get_permitted_columns(papel: str) -> set[str]:
+# =============================================================================
+# PROJEÇÃO POR PAPEL
+# =============================================================================
+
+# Formatos de linha compilados por projeção (limite de memória)
+_MAX_SHAPES = 64
+
+RowGetter = Callable[[Mapping], tuple]
+
+
+def _tuple_getter(keys: tuple[str, ...]) -> RowGetter:
+    """itemgetter que sempre devolve tupla (também para 0 ou 1 chave)."""
+    if not keys:
+        return lambda row: ()
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda row: (row[key],)
+    return itemgetter(*keys)
+
+
+class PermissionProjection:
     """
-    Retorna colunas permitidas como set mutável.
+    Colunas permitidas de um papel, lidas de permi uma vez por versão.
+    
+    `version` é a versão da tabela "permi" no momento da leitura; caches
+    derivados (ex: templates do grid) comparam com ela para se recompilar.
     
-    Wrapper de fetch_permissoes_cols para uso em código que precisa de set.
+    Para cada formato de linha (chaves da linha + colunas extras) guarda a
+    tupla de chaves permitidas e um itemgetter: filtrar uma linha é uma
+    chamada do getter, sem montar conjuntos por linha.
     """
-    return set(fetch_permissoes_cols(papel))
+    
+    def __init__(self, papel: str, columns: frozenset[str], version: int) -> None:
+        self.papel = papel
+        self.columns = columns
+        self.version = version
+        self._shapes: dict[tuple, tuple[tuple[str, ...], RowGetter]] = {}
+        self._shapes_lock = threading.Lock()
+    
+    def compile(
+        self,
+        row_keys: Iterable[str],
+        additional_allowed: frozenset[str] = frozenset(),
+    ) -> tuple[tuple[str, ...], RowGetter]:
+        """
+        Chaves permitidas (na ordem da linha) + getter para um formato de linha.
+        
+        Args:
+            row_keys: Chaves da linha (ex: o próprio dict)
+            additional_allowed: Colunas sempre permitidas (ex: id_princ)
+        """
+        shape = (tuple(row_keys), additional_allowed)
+        compiled = self._shapes.get(shape)
+        if compiled is not None:
+            return compiled
+        
+        allowed = self.columns | additional_allowed if additional_allowed else self.columns
+        keys = tuple(key for key in shape[0] if key in allowed)
+        compiled = (keys, _tuple_getter(keys))
+        with self._shapes_lock:
+            if len(self._shapes) >= _MAX_SHAPES:
+                self._shapes.clear()
+            self._shapes[shape] = compiled
+        return compiled
+
+
+_projections_lock = threading.Lock()
+_projections: dict[str, PermissionProjection] = {}
 
+# Detecção de alterações em permi (feitas por fora da API)
+_check_lock = threading.Lock()
+_last_check = 0.0
+_fingerprint: Optional[str] = None
 
-def clear_permissions_cache() -> None:
-    """Limpa cache de permissões (usar após alterações em permi)."""
-    fetch_permissoes_cols.cache_clear()
-    logger.info("Cache de permissões limpo")
+
+def _permi_fingerprint() -> str:
+    """Conteúdo completo de permi numa string (tabela pequena)."""
+    with get_db() as conn:
+        row = conn.execute(
+            """
+            SELECT COUNT(*) || ':' || COALESCE(group_concat(user_papel || char(31) || coluna, char(30)), '')
+            FROM (SELECT user_papel, coluna FROM permi ORDER BY user_papel, coluna)
+            """
+        ).fetchone()
+        return row[0]
+
+
+def _check_permi_changes() -> None:
+    """
+    Invalida as projeções se permi mudou no banco.
+    
+    Compara o conteúdo de permi no máximo a cada PERMISSIONS_CHECK_SECONDS;
+    uma alteração incrementa a versão de "permi" (projeções e templates do
+    grid são recompilados na próxima leitura).
+    """
+    global _last_check, _fingerprint
+    now = time.monotonic()
+    if now - _last_check < get_settings().PERMISSIONS_CHECK_SECONDS:
+        return
+    
+    with _check_lock:
+        if now - _last_check < get_settings().PERMISSIONS_CHECK_SECONDS:
+            return
+        fingerprint = _permi_fingerprint()
+        if _fingerprint is not None and fingerprint != _fingerprint:
+            bump_table_version("permi")
+            with _projections_lock:
+                _projections.clear()
+            logger.info("Permissões alteradas em permi: projeções invalidadas")
+        _fingerprint = fingerprint
+        _last_check = time.monotonic()
+
+
+def get_permission_projection(papel: str) -> PermissionProjection:
+    """
+    Projeção do papel (cacheada).
+    
+    Invalidação: alterações em permi são detectadas por _check_permi_changes
+    (versão da tabela "permi" incrementada → releitura do banco).
+    """
+    _check_permi_changes()
+    
+    version = get_table_version("permi")
+    projection = _projections.get(papel)
+    if projection is not None and projection.version == version:
+        return projection
+    
+    projection = PermissionProjection(papel, _load_permissoes_cols(papel), version)
+    with _projections_lock:
+        _projections[papel] = projection
+    return projection
+
+
+def fetch_permissoes_cols(papel: str) -> frozenset[str]:
+    """
+    Busca colunas permitidas para um papel na tabela permi.
+    
+    🔒 CRÍTICO: Esta função determina quais dados o usuário pode ver.
+    
+    Args:
+        papel: Papel do usuário (admin, BackOffice, Inspetor, etc.)
+        
+    Returns:
+        Conjunto de nomes de colunas permitidas (frozenset para cache)
+        
+    Nota:
+        - Lido da projeção do papel (consulta o banco uma vez por versão
+          de permi)
+        - Se papel não existe em permi, retorna conjunto vazio
+    """
+    return get_permission_projection(papel).columns
 
 
 # =============================================================================
@@ -165,16 +291,9 @@ def filter_columns_for_papel(
     Returns:
         Dicionário filtrado com apenas colunas permitidas
     """
-    permitted = get_permitted_columns(papel)
-    
-    if additional_allowed:
-        permitted = permitted | additional_allowed
-    
-    return {
-        key: value
-        for key, value in data.items()
-        if key in permitted
-    }
+    projection = get_permission_projection(papel)
+    keys, getter = projection.compile(data, frozenset(additional_allowed or ()))
+    return dict(zip(keys, getter(data)))
 
 
 def filter_rows_for_papel(
@@ -185,6 +304,9 @@ def filter_rows_for_papel(
     """
     Filtra lista de dicionários removendo colunas não permitidas.
     
+    O formato é compilado uma vez (primeira linha) e reaproveitado nas
+    linhas com as mesmas chaves; linhas com outro formato compilam o seu.
+    
     Args:
         rows: Lista de dicionários (ex: resultado de query)
         papel: Papel do usuário
@@ -193,10 +315,22 @@ def filter_rows_for_papel(
     Returns:
         Lista de dicionários filtrados
     """
-    return [
-        filter_columns_for_papel(row, papel, additional_allowed)
-        for row in rows
-    ]
+    if not rows:
+        return []
+    
+    projection = get_permission_projection(papel)
+    extra = frozenset(additional_allowed or ())
+    first_keys = rows[0].keys()
+    keys, getter = projection.compile(first_keys, extra)
+    
+    filtered = []
+    for row in rows:
+        if row.keys() == first_keys:
+            filtered.append(dict(zip(keys, getter(row))))
+        else:
+            row_keys, row_getter = projection.compile(row, extra)
+            filtered.append(dict(zip(row_keys, row_getter(row))))
+    return filtered
 
 
 # =============================================================================
@@ -209,7 +343,7 @@ def get_permission_info(papel: str) -> dict:
     
     Útil para debugging e documentação.
     """
-    colunas = get_permitted_columns(papel)
+    colunas = fetch_permissoes_cols(papel)
     acoes = ACOES_POR_PAPEL.get(papel, set())
     
     return {
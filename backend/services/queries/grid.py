@@ -5,18 +5,23 @@ Baseado em: x_main/services/db/grid.py
 
 Contém:
 - Cláusulas ORDER BY complexas
+- Templates SELECT compilados por papel (colunas + filtros de sigilo)
 - Função load_grid para carregar dados com permissões
 - Cálculo de status para cores condicionais
 - Cálculo dinâmico do campo prazo
 """
 
 import logging
+import threading
+from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional
 
 from database import get_db
-from services.permissions import fetch_permissoes_cols
+from services.cache import bump_table_version
+from services.permissions import get_permission_projection
 from services.queries.column_metadata import get_sql_expression
+from services.queries.markers import MARKER_TYPES, marker_sql
 
 logger = logging.getLogger(__name__)
 
@@ -213,6 +218,7 @@ def _save_prazo_to_db(id_princ: int, prazo: int) -> None:
                 (prazo, id_princ)
             )
             conn.commit()
+        bump_table_version("princ")
         logger.info("Prazo %d gravado para id_princ=%d", prazo, id_princ)
     except Exception as e:
         logger.error("Erro ao gravar prazo para id_princ=%d: %s", id_princ, e)
@@ -241,29 +247,39 @@ def _enrich_with_prazo(rows: list[dict]) -> list[dict]:
     return rows
 
 
-def _enrich_with_status(rows: list[dict]) -> list[dict]:
+# Status de pagamento → coluna de origem
+PAYMENT_STATUS_FIELDS = {
+    "dt_guy_pago__status": "dt_guy_pago",
+    "dt_guy_dpago__status": "dt_guy_dpago",
+    "dt_dpago__status": "dt_dpago",
+}
+
+
+def _enrich_with_status(rows: list[dict], status_fields: tuple[str, ...]) -> list[dict]:
     """
     Enriquece rows com campos de status calculados.
     
-    Adiciona:
+    Calcula apenas os campos em `status_fields` (definidos pelo template
+    do papel), dentre:
         - dt_guy_pago__status
         - dt_guy_dpago__status
         - dt_dpago__status
         - delivery_status
     """
+    payment = [(field, PAYMENT_STATUS_FIELDS[field]) for field in status_fields if field in PAYMENT_STATUS_FIELDS]
+    delivery = "delivery_status" in status_fields
+    
     for row in rows:
-        # Status de pagamento do Guy
-        row["dt_guy_pago__status"] = _compute_payment_status(row.get("dt_guy_pago"))
-        row["dt_guy_dpago__status"] = _compute_payment_status(row.get("dt_guy_dpago"))
-        
-        # Status de pagamento de despesas
-        row["dt_dpago__status"] = _compute_payment_status(row.get("dt_dpago"))
+        # Status de pagamento (Guy e despesas)
+        for field, source in payment:
+            row[field] = _compute_payment_status(row.get(source))
         
         # Status de entrega (para destaque visual)
-        row["delivery_status"] = _compute_delivery_status(
-            row.get("dt_entregue"),
-            row.get("dt_envio")
-        )
+        if delivery:
+            row["delivery_status"] = _compute_delivery_status(
+                row.get("dt_entregue"),
+                row.get("dt_envio")
+            )
     
     return rows
 
@@ -447,66 +463,75 @@ def get_order_by_clause(modo_ordenacao: str) -> str:
 
 
 # =============================================================================
-# FUNÇÃO PRINCIPAL DE CARREGAMENTO
+# TEMPLATES SELECT POR PAPEL
 # =============================================================================
 
-def load_grid(
-    papel: str,
-    modo_ordenacao: str = "normal",
-    limit: Optional[int] = None,
-    my_job_user_id: Optional[int] = None,
-    my_guy_user_id: Optional[int] = None,
-) -> list[dict]:
+# Colunas auxiliares para cálculo do prazo (sempre lidas, mesmo sem permissão de exibição)
+PRAZO_AUX_FIELDS = ("dt_inspecao", "dt_entregue", "dt_envio", "dt_pago", "prazo", "id_princ")
+
+# Colunas de marcadores (princ.marcadores, 2 bits cada) - sempre incluir para ações do grid
+# Valores 0-3: 0=sem marcador, 1=azul, 2=amarelo, 3=vermelho
+MARKER_COLUMNS = tuple(
+    f'{marker_sql(marker_type)} AS "{marker_type}"' for marker_type in MARKER_TYPES
+)
+
+# 🔒 SIGILO: filtros de linha obrigatórios por papel (parâmetro = id_user)
+# Inspetor vê apenas seus casos (atribuídos como guy)
+ROW_FILTERS = {
+    "Inspetor": "p.id_user_guy = ?",
+}
+
+# Templates distintos guardados (papel × modo)
+_MAX_TEMPLATES = 64
+
+
+@dataclass(frozen=True)
+class GridTemplate:
     """
-    Carrega dados do grid principal conforme permissões.
-    
-    🔒 CRÍTICO: Respeita matriz de sigilo via fetch_permissoes_cols.
-    
-    Args:
-        papel: Papel do usuário (admin, BackOffice, Inspetor)
-        modo_ordenacao: Modo de ordenação (normal, player, prazo)
-        limit: Limite de registros (opcional)
-        my_job_user_id: Se fornecido, filtra por id_user_guilty = este ID
-        my_guy_user_id: Se fornecido, filtra por id_user_guy = este ID (para Inspetor)
-        
-    Returns:
-        Lista de dicionários com dados filtrados por permissão
+    SELECT do grid compilado para um papel e modo de ordenação.
+    
+    Gerado a partir de permi e recompilado quando a versão de permi muda
+    (alterações em permi detectadas por services/permissions.py). Só
+    WHERE dinâmico (my_job/limit) e parâmetros variam por requisição.
+    
+    Por que template e não CREATE VIEW por papel: o filtro de linha do
+    Inspetor depende do usuário da requisição (p.id_user_guy = ?), o que
+    uma view não parametriza, e recriar views a cada alteração de permi
+    seria DDL recorrente, em tempo de requisição, no banco compartilhado
+    com o legado (a mudança de schema invalida os statements preparados de
+    todas as conexões abertas). Alterações de schema da API são pontuais:
+    scripts em backend/scripts, verificados no startup (schema_check).
     """
-    permissoes = fetch_permissoes_cols(papel)
-    
-    if not permissoes:
-        logger.warning("Sem permissões para papel: %s", papel)
-        return []
-    
-    # Montar colunas SQL
+    papel: str
+    modo: str
+    version: int
+    select_sql: str            # SELECT ... FROM princ p JOIN ...
+    order_by_sql: str
+    row_filter: Optional[str]  # Filtro de sigilo por linha (ROW_FILTERS)
+    status_fields: tuple[str, ...]  # Status calculados visíveis ao papel
+    strip_fields: tuple[str, ...]   # Auxiliares removidos após os cálculos
+
+
+_templates_lock = threading.Lock()
+_templates: dict[tuple[str, str], GridTemplate] = {}
+
+
+def _build_grid_template(papel: str, modo_ordenacao: str, permissoes: frozenset[str], version: int) -> GridTemplate:
+    """Monta colunas, JOINs, ORDER BY e regras de sigilo de um papel."""
+    # Montar colunas SQL (ordem estável)
     colunas_sql = []
-    for campo_db in permissoes:
+    for campo_db in sorted(permissoes):
         sql_expression = get_sql_expression(campo_db)
         colunas_sql.append(f'{sql_expression} AS "{campo_db}"')
     
-    if not colunas_sql:
-        logger.warning("Nenhuma coluna válida para papel: %s", papel)
-        return []
-    
-    # Colunas auxiliares para cálculo do prazo (sempre incluir, mesmo sem permissão de exibição)
+    # Colunas auxiliares para cálculo do prazo
     # Necessários para calcular prazo dinâmico independente do papel
-    prazo_aux_fields = ["dt_inspecao", "dt_entregue", "dt_envio", "dt_pago", "prazo", "id_princ"]
-    for field in prazo_aux_fields:
+    for field in PRAZO_AUX_FIELDS:
         if field not in permissoes:
             colunas_sql.append(f'p.{field} AS "{field}"')
     
-    # Colunas de marcadores (tempstate) - sempre incluir para ações do grid
-    # Valores 0-3: 0=sem marcador, 1=azul, 2=amarelo, 3=vermelho
-    marker_columns = [
-        'COALESCE(ts.state_loc, 0) AS "state_loc"',
-        'COALESCE(ts.state_dt_envio, 0) AS "state_dt_envio"',
-        'COALESCE(ts.state_dt_denvio, 0) AS "state_dt_denvio"',
-        'COALESCE(ts.state_dt_pago, 0) AS "state_dt_pago"',
-    ]
-    colunas_sql.extend(marker_columns)
-    
+    colunas_sql.extend(MARKER_COLUMNS)
     colunas_sql_str = ",\n        ".join(colunas_sql)
-    order_by_clause = get_order_by_clause(modo_ordenacao)
     
     # Montar JOINs dinâmicos
     joins = []
@@ -531,124 +556,155 @@ def load_grid(
     if any(k in permissoes for k in ["id_ativi", "step_atividade"]):
         joins.append("LEFT JOIN ativi a ON p.id_ativi = a.id_ativi")
     
-    # Tempstate - sempre necessário para marcadores
-    joins.append("LEFT JOIN tempstate ts ON ts.state_id_princ = p.id_princ")
-    
     joins_sql = "\n        ".join(joins)
     
+    # 🔒 SIGILO: status só aparecem se a coluna de origem é visível
+    status_fields = [
+        field for field, source in PAYMENT_STATUS_FIELDS.items()
+        if source in permissoes
+    ]
+    # delivery_status depende de dt_entregue e dt_envio
+    if "dt_entregue" in permissoes or "dt_envio" in permissoes:
+        status_fields.append("delivery_status")
+    
+    return GridTemplate(
+        papel=papel,
+        modo=modo_ordenacao,
+        version=version,
+        select_sql=f"""
+            SELECT
+                {colunas_sql_str}
+            FROM princ p
+            {joins_sql}
+        """,
+        order_by_sql=get_order_by_clause(modo_ordenacao),
+        row_filter=ROW_FILTERS.get(papel),
+        status_fields=tuple(status_fields),
+        strip_fields=tuple(f for f in PRAZO_AUX_FIELDS if f not in permissoes),
+    )
+
+
+def get_grid_template(papel: str, modo_ordenacao: str = "normal") -> Optional[GridTemplate]:
+    """
+    Template compilado do grid (cacheado por papel × modo).
+    
+    🔒 CRÍTICO: Define as colunas lidas e os filtros de sigilo do papel.
+    
+    Returns:
+        GridTemplate, ou None se o papel não tem permissões em permi
+    """
+    projection = get_permission_projection(papel)
+    if not projection.columns:
+        return None
+    
+    key = (papel, modo_ordenacao)
+    template = _templates.get(key)
+    if template is not None and template.version == projection.version:
+        return template
+    
+    template = _build_grid_template(papel, modo_ordenacao, projection.columns, projection.version)
+    with _templates_lock:
+        if len(_templates) >= _MAX_TEMPLATES:
+            _templates.clear()
+        _templates[key] = template
+    logger.debug("Template do grid compilado para %s/%s (permi v%d)", papel, modo_ordenacao, projection.version)
+    return template
+
+
+# =============================================================================
+# FUNÇÃO PRINCIPAL DE CARREGAMENTO
+# =============================================================================
+
+def load_grid(
+    papel: str,
+    modo_ordenacao: str = "normal",
+    limit: Optional[int] = None,
+    my_job_user_id: Optional[int] = None,
+    my_guy_user_id: Optional[int] = None,
+) -> list[dict]:
+    """
+    Carrega dados do grid principal conforme permissões.
+    
+    🔒 CRÍTICO: Respeita matriz de sigilo via template compilado do papel
+    (colunas de permi + filtros de linha em SQL).
+    
+    Args:
+        papel: Papel do usuário (admin, BackOffice, Inspetor)
+        modo_ordenacao: Modo de ordenação (normal, player, prazo)
+        limit: Limite de registros (opcional)
+        my_job_user_id: Se fornecido, filtra por id_user_guilty = este ID
+        my_guy_user_id: Se fornecido, filtra por id_user_guy = este ID.
+            Obrigatório para papéis com filtro de sigilo (Inspetor): sem ele
+            o grid vem vazio (antes vinham todas as linhas).
+        
+    Returns:
+        Lista de dicionários com dados filtrados por permissão
+    """
+    template = get_grid_template(papel, modo_ordenacao)
+    
+    if template is None:
+        logger.warning("Sem permissões para papel: %s", papel)
+        return []
+    
     # Montar cláusula WHERE (para filtros)
     where_clauses = []
     query_params = []
     
+    # 🔒 SIGILO: Filtro de linha obrigatório do papel (Inspetor → id_user_guy)
+    if template.row_filter:
+        if my_guy_user_id is None:
+            logger.warning("Filtro de sigilo sem usuário para papel %s: grid vazio", papel)
+            return []
+        where_clauses.append(template.row_filter)
+        query_params.append(my_guy_user_id)
+    elif my_guy_user_id is not None:
+        where_clauses.append("p.id_user_guy = ?")
+        query_params.append(my_guy_user_id)
+    
     # Filtro My Job (por guilty - colaborador responsável)
     if my_job_user_id is not None:
         where_clauses.append("p.id_user_guilty = ?")
         query_params.append(my_job_user_id)
     
-    # 🔒 SIGILO: Filtro para Inspetor (ver apenas seus casos atribuídos como guy)
-    if my_guy_user_id is not None:
-        where_clauses.append("p.id_user_guy = ?")
-        query_params.append(my_guy_user_id)
+    # Se há limite, usar subquery para pegar os N registros mais recentes por id_princ
+    # (id_princ é auto-increment, então reflete a ordem de criação)
+    if limit is not None and limit > 0:
+        where_clauses.append("p.id_princ IN (SELECT id_princ FROM princ ORDER BY id_princ DESC LIMIT ?)")
+        query_params.append(int(limit))
     
     where_sql = ""
     if where_clauses:
         where_sql = "WHERE " + " AND ".join(where_clauses)
     
-    # Montar query final
-    # Se há limite, usar subquery para pegar os N registros mais recentes por id_princ
-    # (id_princ é auto-increment, então reflete a ordem de criação)
-    if limit is not None and limit > 0:
-        # Montar filtro de IDs: pegar os últimos N id_princ
-        # Isso garante que sempre teremos os registros mais recentes
-        limit_where = f"p.id_princ IN (SELECT id_princ FROM princ ORDER BY id_princ DESC LIMIT {limit})"
-        
-        if where_sql:
-            full_where = f"{where_sql} AND {limit_where}"
-        else:
-            full_where = f"WHERE {limit_where}"
-        
-        query = f"""
-            SELECT
-                {colunas_sql_str}
-            FROM princ p
-            {joins_sql}
-            {full_where}
-            {order_by_clause}
-        """
-    else:
-        query = f"""
-            SELECT
-                {colunas_sql_str}
-            FROM princ p
-            {joins_sql}
-            {where_sql}
-            {order_by_clause}
-        """
+    query = f"""
+        {template.select_sql}
+        {where_sql}
+        {template.order_by_sql}
+    """
     
     logger.debug("Query grid para papel %s (limite=%s, my_job=%s)", papel, limit, my_job_user_id)
     
     # Executar query
+    # (tuplas cruas + nomes das colunas resolvidos uma vez por query)
     with get_db() as conn:
-        conn.row_factory = lambda cursor, row: dict(
-            zip([column[0] for column in cursor.description], row)
-        )
-        cursor = conn.cursor()
-        cursor.execute(query, query_params)
-        rows = cursor.fetchall()
+        conn.row_factory = None
+        cursor = conn.execute(query, query_params)
+        keys = [column[0] for column in cursor.description]
+        rows = [dict(zip(keys, row)) for row in cursor.fetchall()]
     
     # Calcular prazo dinâmico (e gravar se finalizado)
     rows = _enrich_with_prazo(rows)
     
-    # Enriquecer com status calculados (para cores condicionais)
-    rows = _enrich_with_status(rows)
+    # Enriquecer com status calculados (apenas os visíveis ao papel)
+    rows = _enrich_with_status(rows, template.status_fields)
     
     # 🔒 SIGILO: Remover campos auxiliares que foram incluídos apenas para cálculo
     # mas que o usuário não tem permissão para ver
-    rows = _remove_auxiliary_fields(rows, permissoes)
-    
-    return rows
-
-
-def _remove_auxiliary_fields(rows: list[dict], permissoes: frozenset[str]) -> list[dict]:
-    """
-    Remove campos que foram incluídos apenas para cálculos internos
-    mas que o usuário não tem permissão para ver.
-    
-    🔒 CRÍTICO: Garante que dados sigilosos não vazem na resposta.
-    """
-    # Campos que podem ter sido incluídos para cálculo de prazo
-    prazo_aux_fields = {"dt_inspecao", "dt_entregue", "dt_envio", "dt_pago", "prazo", "id_princ"}
-    
-    # Identificar campos que devem ser removidos
-    # (estão na lista auxiliar mas não nas permissões do papel)
-    fields_to_remove = prazo_aux_fields - set(permissoes)
-    
-    # Campos de status calculados são sempre permitidos (não são dados do banco)
-    # mas campos de status dependem de outros campos
-    status_fields_to_remove = set()
-    
-    # dt_guy_pago__status só deve aparecer se dt_guy_pago está nas permissões
-    if "dt_guy_pago" not in permissoes:
-        status_fields_to_remove.add("dt_guy_pago__status")
-    if "dt_guy_dpago" not in permissoes:
-        status_fields_to_remove.add("dt_guy_dpago__status")
-    if "dt_dpago" not in permissoes:
-        status_fields_to_remove.add("dt_dpago__status")
-    # delivery_status depende de dt_entregue e dt_envio
-    if "dt_entregue" not in permissoes and "dt_envio" not in permissoes:
-        status_fields_to_remove.add("delivery_status")
-    
-    fields_to_remove = fields_to_remove | status_fields_to_remove
-    
-    if not fields_to_remove:
-        return rows
-    
-    # Remover campos de cada row
-    for row in rows:
-        for field in fields_to_remove:
-            row.pop(field, None)
+    if template.strip_fields:
+        for row in rows:
+            for field in template.strip_fields:
+                row.pop(field, None)
     
-    logger.debug("Campos auxiliares removidos: %s", fields_to_remove)
     return rows
 
 
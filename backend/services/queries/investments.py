@@ -4,41 +4,68 @@ Queries de Investimentos/Aportes - xFinance
 Funções para busca, cálculo de KPIs, highlights e alocação
 de investimentos da tabela `finan`.
 
+Todas as leituras filtradas passam por get_portfolio_snapshot(), cacheado
+até `finan` mudar. Agregações (KPIs, extremos, alocação) são feitas no SQL.
+
 🔒 SIGILO: Apenas admin tem acesso a estes dados.
 """
 
 import logging
+from dataclasses import dataclass, field
 from typing import Any, Optional
 
 from database import get_db
+from services.cache import bump_table_version, cached
+from services.singleflight import single_flight
 
 logger = logging.getLogger(__name__)
 
 
 # =============================================================================
-# FETCH ALL (com filtros)
+# SNAPSHOT DA CARTEIRA (uma leitura de `finan` por conjunto de filtros)
 # =============================================================================
 
-def fetch_all_investments(
-    investidor: Optional[str] = None,
-    instituicao: Optional[str] = None,
-    tipo: Optional[str] = None,
-    dt_ini: Optional[str] = None,
-    dt_fim: Optional[str] = None,
-) -> list[dict]:
+# Campos válidos para agrupamento da alocação
+ALLOCATION_GROUPS = ("tipo", "investidor", "instituicao")
+
+# Paleta de cores premium (alocação)
+ALLOCATION_COLORS = [
+    "#CE62D9",  # Purple/Primary
+    "#9B7ED9",  # Light Purple
+    "#00BCD4",  # Cyan
+    "#F97316",  # Orange
+    "#22C55E",  # Green
+    "#EAB308",  # Yellow
+    "#EC4899",  # Pink
+    "#8B5CF6",  # Violet
+    "#06B6D4",  # Teal
+]
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
     """
-    Busca todos os investimentos com filtros opcionais.
+    Visão consolidada da carteira para um conjunto de filtros.
     
-    Args:
-        investidor: Filtro por investidor
-        instituicao: Filtro por instituição
-        tipo: Filtro por tipo de investimento
-        dt_ini: Data de aplicação inicial (YYYY-MM-DD)
-        dt_fim: Data de aplicação final (YYYY-MM-DD)
+    Construída com uma conexão por conjunto de filtros (linhas + agregados
+    em SQL); todos os endpoints /api/investments/* derivam suas respostas daqui.
     
-    Returns:
-        Lista de dicts com dados dos investimentos
+    ⚠️ Compartilhado via cache: não mutar `rows` nem os dicts derivados.
     """
+    rows: list[dict]
+    kpis: dict[str, float]
+    highlights: dict[str, dict]
+    allocation: dict[str, list[dict]] = field(default_factory=dict)
+
+
+def _build_where(
+    investidor: Optional[str],
+    instituicao: Optional[str],
+    tipo: Optional[str],
+    dt_ini: Optional[str],
+    dt_fim: Optional[str],
+) -> tuple[str, list[Any]]:
+    """Monta cláusula WHERE dos filtros de investimentos."""
     clauses = ["1=1"]
     params: list[Any] = []
     
@@ -62,8 +89,11 @@ def fetch_all_investments(
         clauses.append("dt_aplicacao <= ?")
         params.append(dt_fim)
     
-    where = " AND ".join(clauses)
-    
+    return " AND ".join(clauses), params
+
+
+def _load_rows(conn, where: str, params: list[Any]) -> list[dict]:
+    """Lê os investimentos de `finan` (sem cache) já normalizados."""
     sql = f"""
         SELECT
             id_finan,
@@ -76,7 +106,7 @@ def fetch_all_investments(
             v_liquido,
             ganho_perda,
             resgate_bruto,
-            rentabilidade,
+            rentabilidade_num,
             dt_aplicacao,
             dt_vence,
             ir_iof
@@ -85,9 +115,7 @@ def fetch_all_investments(
         ORDER BY dt_vence DESC, id_finan DESC
     """
     
-    with get_db() as conn:
-        cursor = conn.execute(sql, params)
-        rows = cursor.fetchall()
+    rows = conn.execute(sql, params).fetchall()
     
     result = []
     for row in rows:
@@ -102,7 +130,8 @@ def fetch_all_investments(
             "v_liquido": row["v_liquido"] or 0.0,
             "ganho_perda": row["ganho_perda"] or 0,
             "resgate_bruto": row["resgate_bruto"] or 0.0,
-            "rentabilidade": _parse_rentabilidade(row["rentabilidade"]),
+            # Coluna REAL mantida por trigger (scripts/add_rentabilidade_num.py)
+            "rentabilidade": row["rentabilidade_num"] or 0.0,
             "dt_aplicacao": row["dt_aplicacao"] or "",
             "dt_vence": row["dt_vence"] or "",
             "ir_iof": row["ir_iof"] or 0.0,
@@ -111,24 +140,178 @@ def fetch_all_investments(
     return result
 
 
-def _parse_rentabilidade(value: Any) -> float:
-    """Converte rentabilidade de TEXT para float."""
-    if value is None:
-        return 0.0
-    if isinstance(value, (int, float)):
-        return float(value)
-    try:
-        # Remove % se existir e converte
-        clean = str(value).replace("%", "").replace(",", ".").strip()
-        return float(clean) if clean else 0.0
-    except (ValueError, TypeError):
-        return 0.0
+# Ganho percentual calculado no SQL (mesma fórmula da tela)
+_GANHO_PCT_SQL = "(COALESCE(v_bruto, 0) - v_aplicado) * 100.0 / v_aplicado"
+
+# Nome de exibição da posição: "tipo detalhe" (ou "-")
+_NOME_SQL = "COALESCE(NULLIF(TRIM(COALESCE(tipo, '') || ' ' || COALESCE(detalhe, '')), ''), '-')"
+
+
+def _load_kpis(conn, where: str, params: list[Any]) -> dict[str, float]:
+    """KPIs agregados via SUM no SQL."""
+    row = conn.execute(
+        f"""
+        SELECT
+            COALESCE(SUM(v_bruto), 0.0) AS patrimonio_total,
+            COALESCE(SUM(v_aplicado), 0.0) AS valor_aplicado
+        FROM finan
+        WHERE {where}
+        """,
+        params,
+    ).fetchone()
+    
+    patrimonio_total = float(row["patrimonio_total"])
+    valor_aplicado = float(row["valor_aplicado"])
+    resultado = patrimonio_total - valor_aplicado
+    
+    return {
+        "patrimonio_total": patrimonio_total,
+        "valor_aplicado": valor_aplicado,
+        "resultado": resultado,
+        "rentabilidade_pct": (resultado / valor_aplicado * 100) if valor_aplicado > 0 else 0.0,
+    }
+
+
+def _load_highlights(conn, where: str, params: list[Any]) -> dict[str, dict]:
+    """
+    Extremos da carteira via MAX/MIN no SQL.
+    
+    Usa a semântica de "bare column" do SQLite: em SELECT com um único
+    MAX()/MIN(), as demais colunas vêm da linha que atingiu o extremo.
+    """
+    sql = f"""
+        SELECT 'winner' AS chave, {_NOME_SQL} AS nome, MAX({_GANHO_PCT_SQL}) AS valor
+        FROM finan WHERE {where} AND v_aplicado > 0
+        UNION ALL
+        SELECT 'loser', {_NOME_SQL}, MIN({_GANHO_PCT_SQL})
+        FROM finan WHERE {where} AND v_aplicado > 0
+        UNION ALL
+        SELECT 'maior_posicao', {_NOME_SQL}, MAX(v_bruto)
+        FROM finan WHERE {where} AND v_bruto > 0
+    """
+    
+    highlights = {
+        "winner": {"nome": "-", "valor": 0.0},
+        "loser": {"nome": "-", "valor": 0.0},
+        "maior_posicao": {"nome": "-", "valor": 0.0},
+    }
+    
+    for row in conn.execute(sql, params * 3):
+        # Agregado sem linhas retorna valor NULL → mantém default
+        if row["valor"] is not None:
+            highlights[row["chave"]] = {"nome": row["nome"], "valor": float(row["valor"])}
+    
+    return highlights
+
+
+def _load_allocation_groups(conn, where: str, params: list[Any]) -> dict[str, dict[str, float]]:
+    """Totais de v_bruto por tipo / investidor / instituição via GROUP BY."""
+    sql = " UNION ALL ".join(
+        f"""
+        SELECT '{g}' AS grupo, COALESCE(NULLIF({g}, ''), 'Outros') AS nome,
+               COALESCE(SUM(v_bruto), 0.0) AS valor
+        FROM finan WHERE {where}
+        GROUP BY 2
+        """
+        for g in ALLOCATION_GROUPS
+    )
+    
+    groups: dict[str, dict[str, float]] = {g: {} for g in ALLOCATION_GROUPS}
+    for row in conn.execute(sql, params * len(ALLOCATION_GROUPS)):
+        groups[row["grupo"]][row["nome"]] = float(row["valor"])
+    
+    return groups
+
+
+def _build_allocation(groups: dict[str, float]) -> list[dict]:
+    """Converte totais por grupo em lista ordenada com percentual e cor."""
+    total = sum(groups.values())
+    
+    result = []
+    for i, (name, value) in enumerate(sorted(groups.items(), key=lambda x: x[1], reverse=True)):
+        percentage = (value / total * 100) if total > 0 else 0.0
+        result.append({
+            "id": name.lower().replace(" ", "-").replace("/", "-"),
+            "name": name,
+            "value": value,
+            "percentage": round(percentage, 1),
+            "color": ALLOCATION_COLORS[i % len(ALLOCATION_COLORS)],
+        })
+    
+    return result
+
+
+@cached(tables=("finan",))
+@single_flight
+def get_portfolio_snapshot(
+    investidor: Optional[str] = None,
+    instituicao: Optional[str] = None,
+    tipo: Optional[str] = None,
+    dt_ini: Optional[str] = None,
+    dt_fim: Optional[str] = None,
+) -> PortfolioSnapshot:
+    """
+    Constrói (ou retorna do cache) o snapshot da carteira para os filtros.
+    
+    Em uma única conexão:
+    - linhas da carteira (rentabilidade já numérica)
+    - KPIs agregados (SUM)
+    - extremos: winner, loser, maior posição (MAX/MIN)
+    - alocação por tipo, investidor e instituição (GROUP BY)
+    
+    Cacheado até a próxima escrita em `finan`.
+    """
+    where, params = _build_where(investidor, instituicao, tipo, dt_ini, dt_fim)
+    
+    with get_db() as conn:
+        rows = _load_rows(conn, where, params)
+        kpis = _load_kpis(conn, where, params)
+        highlights = _load_highlights(conn, where, params)
+        groups = _load_allocation_groups(conn, where, params)
+    
+    allocation = {g: _build_allocation(totals) for g, totals in groups.items()}
+    
+    return PortfolioSnapshot(
+        rows=rows,
+        kpis=kpis,
+        highlights=highlights,
+        allocation=allocation,
+    )
+
+
+# =============================================================================
+# FETCH ALL (com filtros)
+# =============================================================================
+
+def fetch_all_investments(
+    investidor: Optional[str] = None,
+    instituicao: Optional[str] = None,
+    tipo: Optional[str] = None,
+    dt_ini: Optional[str] = None,
+    dt_fim: Optional[str] = None,
+) -> list[dict]:
+    """
+    Busca todos os investimentos com filtros opcionais.
+    
+    Args:
+        investidor: Filtro por investidor
+        instituicao: Filtro por instituição
+        tipo: Filtro por tipo de investimento
+        dt_ini: Data de aplicação inicial (YYYY-MM-DD)
+        dt_fim: Data de aplicação final (YYYY-MM-DD)
+    
+    Returns:
+        Lista de dicts com dados dos investimentos
+    """
+    return get_portfolio_snapshot(investidor, instituicao, tipo, dt_ini, dt_fim).rows
 
 
 # =============================================================================
 # FILTROS DISPONÍVEIS
 # =============================================================================
 
+@cached(tables=("finan",))
+@single_flight
 def fetch_filter_options() -> dict[str, list[dict]]:
     """
     Busca opções únicas para filtros.
@@ -185,27 +368,7 @@ def fetch_kpis(
     Returns:
         Dict com patrimonio_total, valor_aplicado, resultado, rentabilidade_pct
     """
-    data = fetch_all_investments(investidor, instituicao, tipo, dt_ini, dt_fim)
-    
-    if not data:
-        return {
-            "patrimonio_total": 0.0,
-            "valor_aplicado": 0.0,
-            "resultado": 0.0,
-            "rentabilidade_pct": 0.0,
-        }
-    
-    patrimonio_total = sum(r["v_bruto"] for r in data)
-    valor_aplicado = sum(r["v_aplicado"] for r in data)
-    resultado = patrimonio_total - valor_aplicado
-    rentabilidade_pct = (resultado / valor_aplicado * 100) if valor_aplicado > 0 else 0.0
-    
-    return {
-        "patrimonio_total": patrimonio_total,
-        "valor_aplicado": valor_aplicado,
-        "resultado": resultado,
-        "rentabilidade_pct": rentabilidade_pct,
-    }
+    return get_portfolio_snapshot(investidor, instituicao, tipo, dt_ini, dt_fim).kpis
 
 
 # =============================================================================
@@ -227,60 +390,7 @@ def fetch_highlights(
     Returns:
         Dict com winner, loser, maior_posicao (cada um com nome e valor)
     """
-    data = fetch_all_investments(investidor, instituicao, tipo, dt_ini, dt_fim)
-    
-    default = {
-        "winner": {"nome": "-", "valor": 0.0},
-        "loser": {"nome": "-", "valor": 0.0},
-        "maior_posicao": {"nome": "-", "valor": 0.0},
-    }
-    
-    if not data:
-        return default
-    
-    # Calcular ganho percentual para cada registro
-    for r in data:
-        if r["v_aplicado"] > 0:
-            r["ganho_pct"] = (r["v_bruto"] - r["v_aplicado"]) / r["v_aplicado"] * 100
-        else:
-            r["ganho_pct"] = 0.0
-    
-    # Filtrar registros com valores válidos
-    com_ganho = [r for r in data if r["v_aplicado"] > 0]
-    
-    # Winner (maior ganho percentual)
-    if com_ganho:
-        winner = max(com_ganho, key=lambda x: x["ganho_pct"])
-        winner_nome = f"{winner['tipo']} {winner['detalhe']}".strip() or "-"
-        winner_valor = winner["ganho_pct"]
-    else:
-        winner_nome = "-"
-        winner_valor = 0.0
-    
-    # Loser (menor ganho percentual / maior perda)
-    if com_ganho:
-        loser = min(com_ganho, key=lambda x: x["ganho_pct"])
-        loser_nome = f"{loser['tipo']} {loser['detalhe']}".strip() or "-"
-        loser_valor = loser["ganho_pct"]
-    else:
-        loser_nome = "-"
-        loser_valor = 0.0
-    
-    # Maior Posição (maior v_bruto)
-    com_valor = [r for r in data if r["v_bruto"] > 0]
-    if com_valor:
-        maior = max(com_valor, key=lambda x: x["v_bruto"])
-        maior_nome = f"{maior['tipo']} {maior['detalhe']}".strip() or "-"
-        maior_valor = maior["v_bruto"]
-    else:
-        maior_nome = "-"
-        maior_valor = 0.0
-    
-    return {
-        "winner": {"nome": winner_nome, "valor": winner_valor},
-        "loser": {"nome": loser_nome, "valor": loser_valor},
-        "maior_posicao": {"nome": maior_nome, "valor": maior_valor},
-    }
+    return get_portfolio_snapshot(investidor, instituicao, tipo, dt_ini, dt_fim).highlights
 
 
 # =============================================================================
@@ -305,48 +415,11 @@ def fetch_allocation(
         Lista de dicts com name, value, percentage, color
     """
     # Validar group_by
-    if group_by not in ("tipo", "investidor", "instituicao"):
+    if group_by not in ALLOCATION_GROUPS:
         group_by = "tipo"
     
-    data = fetch_all_investments(investidor, instituicao, tipo, dt_ini, dt_fim)
-    
-    if not data:
-        return []
-    
-    # Agrupar por campo
-    allocation: dict[str, float] = {}
-    for r in data:
-        campo = r.get(group_by) or "Outros"
-        allocation[campo] = allocation.get(campo, 0.0) + r["v_bruto"]
-    
-    # Calcular total e percentuais
-    total = sum(allocation.values())
-    
-    # Paleta de cores premium
-    colors = [
-        "#CE62D9",  # Purple/Primary
-        "#9B7ED9",  # Light Purple
-        "#00BCD4",  # Cyan
-        "#F97316",  # Orange
-        "#22C55E",  # Green
-        "#EAB308",  # Yellow
-        "#EC4899",  # Pink
-        "#8B5CF6",  # Violet
-        "#06B6D4",  # Teal
-    ]
-    
-    result = []
-    for i, (name, value) in enumerate(sorted(allocation.items(), key=lambda x: x[1], reverse=True)):
-        percentage = (value / total * 100) if total > 0 else 0.0
-        result.append({
-            "id": name.lower().replace(" ", "-").replace("/", "-"),
-            "name": name,
-            "value": value,
-            "percentage": round(percentage, 1),
-            "color": colors[i % len(colors)],
-        })
-    
-    return result
+    snapshot = get_portfolio_snapshot(investidor, instituicao, tipo, dt_ini, dt_fim)
+    return snapshot.allocation[group_by]
 
 
 # =============================================================================
@@ -368,4 +441,6 @@ def delete_investment(id_finan: int) -> bool:
     with get_db() as conn:
         cursor = conn.execute(sql, (id_finan,))
         conn.commit()
-        return cursor.rowcount > 0
+    
+    bump_table_version("finan")
+    return cursor.rowcount > 0
@@ -0,0 +1,225 @@
+"""
+Séries Temporais da Carteira - xFinance
+
+Curvas de valor da carteira (diárias ou mensais) por investidor,
+instituição ou tipo, calculadas de forma vetorizada (NumPy) sobre as
+linhas de `finan` já carregadas no snapshot da carteira.
+
+Modelo de valorização por posição (não há histórico de cotas em `finan`):
+- antes de dt_aplicacao: 0
+- entre dt_aplicacao e a data de referência: v_aplicado capitalizado a taxa
+  constante (juros compostos) até atingir v_bruto
+- após a data de referência: v_bruto (estável)
+
+Data de referência = min(hoje, dt_vence). Assim o último ponto da curva
+coincide com o patrimônio total exibido nos KPIs, exceto quando há
+posições com dt_aplicacao futura ou inválida: essas ficam fora da curva
+(e continuam somadas nos KPIs).
+
+Memória limitada:
+- no máximo MAX_POINTS datas (freq D em períodos longos usa passo de N
+  dias; o último ponto é sempre hoje)
+- posições processadas em blocos de até MAX_CELLS células (posição × data)
+
+🔒 SIGILO: Apenas admin tem acesso a estes dados.
+"""
+
+import logging
+from datetime import date
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência listada em requirements.txt
+    np = None
+
+from services.cache import cached
+from services.queries.investments import (
+    ALLOCATION_COLORS,
+    ALLOCATION_GROUPS,
+    get_portfolio_snapshot,
+)
+from services.singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# Frequências suportadas
+TIMESERIES_FREQS = ("D", "M")
+
+# Limite de datas por curva (D: ~5 anos diários; acima disso, passo de N dias)
+MAX_POINTS = 1830
+
+# Células (posição × data) por bloco de cálculo (~8 MB por matriz float64)
+MAX_CELLS = 1_000_000
+
+
+def is_timeseries_available() -> bool:
+    """Indica se o NumPy está instalado."""
+    return np is not None
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _to_dates(values: list[str]) -> "np.ndarray":
+    """Converte datas ISO (YYYY-MM-DD...) em datetime64[D]; inválidas viram NaT."""
+    out = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+    for i, v in enumerate(values):
+        if v:
+            try:
+                out[i] = np.datetime64(v[:10], "D")
+            except ValueError:
+                pass
+    return out
+
+
+def _build_grid(start: "np.datetime64", end: "np.datetime64", freq: str) -> "np.ndarray":
+    """
+    Eixo de datas da curva.
+    
+    D: todos os dias de start a end (passo de N dias se passar de
+       MAX_POINTS, contado a partir de `end`).
+    M: último dia de cada mês (o mês corrente termina em `end`).
+    """
+    if freq == "D":
+        days = int((end - start).astype(int)) + 1
+        step = -(-days // MAX_POINTS)  # ceil
+        return np.arange(end, start - 1, -step, dtype="datetime64[D]")[::-1]
+    
+    months = np.arange(
+        start.astype("datetime64[M]"),
+        end.astype("datetime64[M]") + 1,
+        dtype="datetime64[M]",
+    )
+    month_ends = (months + 1).astype("datetime64[D]") - 1
+    return np.minimum(month_ends, end)
+
+
+def _empty_result(group_by: str, freq: str) -> dict[str, Any]:
+    return {
+        "group_by": group_by,
+        "freq": freq,
+        "dates": [],
+        "total": {"aplicado": [], "valor": []},
+        "series": [],
+    }
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+@cached(tables=("finan",))
+@single_flight
+def fetch_timeseries(
+    group_by: str = "tipo",
+    freq: str = "M",
+    investidor: Optional[str] = None,
+    instituicao: Optional[str] = None,
+    tipo: Optional[str] = None,
+    dt_ini: Optional[str] = None,
+    dt_fim: Optional[str] = None,
+    hoje: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Calcula curvas de valor da carteira agrupadas.
+    
+    Args:
+        group_by: Campo para agrupar (tipo, investidor, instituicao)
+        freq: "D" (diária) ou "M" (mensal, fim de mês)
+        investidor/instituicao/tipo/dt_ini/dt_fim: Mesmos filtros da carteira
+        hoje: Data de referência (YYYY-MM-DD); padrão: data atual.
+              Faz parte da chave do cache (virada de dia gera nova curva).
+    
+    Returns:
+        Dict com dates, total {aplicado, valor} e series
+        [{id, name, color, aplicado, valor}] alinhadas a `dates`
+    """
+    if np is None:
+        raise RuntimeError("NumPy não instalado: séries temporais indisponíveis")
+    
+    if group_by not in ALLOCATION_GROUPS:
+        group_by = "tipo"
+    if freq not in TIMESERIES_FREQS:
+        freq = "M"
+    
+    rows = get_portfolio_snapshot(investidor, instituicao, tipo, dt_ini, dt_fim).rows
+    
+    today = np.datetime64(hoje or date.today().isoformat(), "D")
+    start = _to_dates([r["dt_aplicacao"] for r in rows])
+    valid = ~np.isnat(start) & (start <= today)
+    
+    if not valid.any():
+        return _empty_result(group_by, freq)
+    
+    idx = np.flatnonzero(valid)
+    start = start[idx]
+    vence = _to_dates([rows[i]["dt_vence"] for i in idx])
+    aplicado = np.array([rows[i]["v_aplicado"] for i in idx], dtype=float)
+    bruto = np.array([rows[i]["v_bruto"] for i in idx], dtype=float)
+    nomes = [rows[i][group_by] or "Outros" for i in idx]
+    
+    # Data de referência por posição: min(hoje, dt_vence)
+    ref = np.where(np.isnat(vence), today, np.minimum(vence, today))
+    ref = np.maximum(ref, start)
+    
+    grid = _build_grid(start.min(), today, freq)
+    
+    # Crescimento composto v_aplicado → v_bruto (sem base válida: valor constante)
+    growth_ok = (aplicado > 0) & (bruto > 0)
+    ratio = np.divide(bruto, aplicado, out=np.ones_like(bruto), where=growth_ok)
+    base = np.where(growth_ok, aplicado, bruto)
+    dur = (ref - start).astype(float)
+    
+    labels, inverse = np.unique(np.array(nomes, dtype=object), return_inverse=True)
+    group_valor = np.zeros((len(labels), len(grid)))
+    group_aplicado = np.zeros((len(labels), len(grid)))
+    
+    # Matrizes posição × data em blocos (memória limitada a MAX_CELLS por matriz)
+    chunk = max(1, MAX_CELLS // len(grid))
+    for lo in range(0, len(idx), chunk):
+        sl = slice(lo, lo + chunk)
+        held = grid[None, :] >= start[sl, None]
+        elapsed = (grid[None, :] - start[sl, None]).astype(float)
+        frac = np.clip(
+            np.divide(elapsed, dur[sl, None], out=np.ones_like(elapsed), where=dur[sl, None] > 0),
+            0.0,
+            1.0,
+        )
+        valor = np.where(held, base[sl, None] * ratio[sl, None] ** frac, 0.0)
+        investido = np.where(held, aplicado[sl, None], 0.0)
+        
+        # Agregação por grupo (soma das linhas de cada grupo)
+        np.add.at(group_valor, inverse[sl], valor)
+        np.add.at(group_aplicado, inverse[sl], investido)
+    
+    # Ordenação igual à alocação (maior valor atual primeiro)
+    order = np.argsort(-group_valor[:, -1], kind="stable")
+    
+    series = []
+    for pos, g in enumerate(order):
+        name = str(labels[g])
+        series.append({
+            "id": name.lower().replace(" ", "-").replace("/", "-"),
+            "name": name,
+            "color": ALLOCATION_COLORS[pos % len(ALLOCATION_COLORS)],
+            "aplicado": np.round(group_aplicado[g], 2).tolist(),
+            "valor": np.round(group_valor[g], 2).tolist(),
+        })
+    
+    logger.debug(
+        "TIMESERIES: %d posições × %d pontos (%s, %s)",
+        len(idx), len(grid), group_by, freq,
+    )
+    
+    return {
+        "group_by": group_by,
+        "freq": freq,
+        "dates": [str(d) for d in grid],
+        "total": {
+            "aplicado": np.round(group_aplicado.sum(axis=0), 2).tolist(),
+            "valor": np.round(group_valor.sum(axis=0), 2).tolist(),
+        },
+        "series": series,
+    }
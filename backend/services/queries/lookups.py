@@ -0,0 +1,345 @@
+"""
+Registro de Lookups (dados de referência) - xFinance
+
+Tabelas de referência usadas nos dropdowns (user, contr, segur, ativi,
+uf, cidade) carregadas em memória e servidas sem tocar no SQLite.
+
+Invalidação:
+- Cada lookup é cacheado com as tabelas de origem (services.cache); toda
+  escrita nessas tabelas já chama bump_table_version (ex:
+  get_or_create_segur / get_or_create_ativi).
+- O TTL (LOOKUP_CACHE_TTL_SECONDS) limita a defasagem para escritas feitas
+  fora da API (sistema legado).
+
+Cada lookup retorna LookupData com os itens e um ETag derivado do conteúdo,
+usado pelo router para respostas 304 e cache no navegador.
+
+Segurados e atividades também têm um índice de typeahead (TypeaheadIndex)
+construído sobre os mesmos itens.
+
+⚠️ Os itens são compartilhados entre requisições: NÃO mutar.
+"""
+
+import hashlib
+import json
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any
+
+from config import get_settings
+from database import _normalize_text, get_db
+from services.cache import cached
+from services.singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LOOKUP_TTL = settings.LOOKUP_CACHE_TTL_SECONDS
+
+
+@dataclass(frozen=True)
+class LookupData:
+    """Itens de um lookup + ETag do conteúdo."""
+    items: tuple[dict[str, Any], ...]
+    etag: str
+
+
+def _make_etag(name: str, payload: Any) -> str:
+    """ETag fraco a partir do conteúdo serializado."""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return f'W/"{name}-{digest}"'
+
+
+def _options(name: str, rows: list) -> LookupData:
+    """Converte linhas (id, label) em LookupData de LookupOption."""
+    items = tuple(
+        {"value": row[0], "label": row[1] or f"#{row[0]}"}
+        for row in rows
+    )
+    return LookupData(items, _make_etag(name, items))
+
+
+# =============================================================================
+# USUÁRIOS
+# =============================================================================
+
+def _user_options(name: str, papeis: tuple[str, ...], default_papel: str, force_ativo: bool) -> LookupData:
+    placeholders = ", ".join("?" for _ in papeis)
+    with get_db() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT id_user, short_nome, papel, ativo
+            FROM user
+            WHERE (ativo = 1 OR ativo IS NULL)
+              AND LOWER(papel) IN ({placeholders})
+            ORDER BY short_nome
+            """,
+            papeis
+        ).fetchall()
+    
+    items = tuple(
+        {
+            "value": row[0],
+            "label": row[1] or f"User {row[0]}",
+            "papel": row[2] or default_papel,
+            "ativo": True if force_ativo or row[3] is None else bool(row[3]),
+        }
+        for row in rows
+    )
+    return LookupData(items, _make_etag(name, items))
+
+
+@cached(tables=("user",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_users() -> LookupData:
+    """Usuários admin/BackOffice ativos (encaminhamento)."""
+    return _user_options("users", ("admin", "backoffice"), "user", False)
+
+
+@cached(tables=("user",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_inspetores() -> LookupData:
+    """Inspetores e admins ativos (dropdown de Guy)."""
+    return _user_options("inspetores", ("inspetor", "admin"), "Inspetor", True)
+
+
+# =============================================================================
+# TABELAS DE REFERÊNCIA
+# =============================================================================
+
+@cached(tables=("contr",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_contratantes() -> LookupData:
+    """Contratantes (players) ativos."""
+    with get_db() as conn:
+        rows = conn.execute(
+            """
+            SELECT id_contr, player
+            FROM contr
+            WHERE ativo = 1 OR ativo IS NULL
+            ORDER BY player
+            """
+        ).fetchall()
+    return _options("contratantes", rows)
+
+
+@cached(tables=("segur",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_segurados() -> LookupData:
+    """Segurados."""
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT id_segur, segur_nome FROM segur ORDER BY segur_nome"
+        ).fetchall()
+    return _options("segurados", rows)
+
+
+@cached(tables=("ativi",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_atividades() -> LookupData:
+    """Atividades."""
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT id_ativi, atividade FROM ativi ORDER BY atividade"
+        ).fetchall()
+    return _options("atividades", rows)
+
+
+@cached(tables=("uf",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_ufs() -> LookupData:
+    """UFs."""
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT id_uf, uf_sigla FROM uf ORDER BY uf_sigla"
+        ).fetchall()
+    return _options("ufs", rows)
+
+
+@cached(tables=("cidade",), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_cidades_index() -> dict[int, LookupData]:
+    """
+    Todas as cidades agrupadas por UF (uma leitura da tabela).
+    
+    Returns:
+        Dict id_uf → LookupData das cidades da UF
+    """
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT id_uf, id_cidade, cidade_nome FROM cidade ORDER BY id_uf, cidade_nome"
+        ).fetchall()
+    
+    grouped: dict[int, list] = {}
+    for id_uf, id_cidade, nome in rows:
+        grouped.setdefault(id_uf, []).append((id_cidade, nome))
+    
+    return {
+        id_uf: _options(f"cidades-{id_uf}", cidades)
+        for id_uf, cidades in grouped.items()
+    }
+
+
+def fetch_cidades(id_uf: int) -> LookupData:
+    """Cidades de uma UF (a partir do índice em memória)."""
+    data = fetch_cidades_index().get(id_uf)
+    if data is None:
+        return LookupData((), _make_etag(f"cidades-{id_uf}", []))
+    return data
+
+
+# =============================================================================
+# BUNDLE (formulário de novo registro)
+# =============================================================================
+
+@dataclass(frozen=True)
+class LookupBundle:
+    """Todos os lookups num payload JSON já serializado."""
+    version: str
+    body: bytes
+
+
+@cached(tables=("user", "contr", "segur", "ativi", "uf", "cidade"), ttl=LOOKUP_TTL)
+@single_flight
+def fetch_lookup_bundle() -> LookupBundle:
+    """
+    Monta o bundle de dados de referência (uma resposta para o formulário).
+    
+    Formato:
+        {
+            "version": "<hash do conteúdo>",
+            "contratantes": [{value, label}], "segurados": [...],
+            "atividades": [...], "ufs": [...],
+            "users": [{value, label, papel, ativo}], "inspetores": [...],
+            "cidades": {"<id_uf>": [[id_cidade, nome], ...]}
+        }
+    
+    Reaproveita os lookups individuais (mesmo cache/invalidação); o JSON é
+    serializado uma vez por versão e servido como bytes.
+    """
+    payload = {
+        "contratantes": fetch_contratantes().items,
+        "segurados": fetch_segurados().items,
+        "atividades": fetch_atividades().items,
+        "ufs": fetch_ufs().items,
+        "users": fetch_users().items,
+        "inspetores": fetch_inspetores().items,
+        "cidades": {
+            str(id_uf): [[item["value"], item["label"]] for item in data.items]
+            for id_uf, data in fetch_cidades_index().items()
+        },
+    }
+    content = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    version = hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+    
+    # Versão como primeiro campo (conteúdo já serializado começa com "{")
+    body = f'{{"version":"{version}",{content[1:]}'.encode("utf-8")
+    
+    logger.info("LOOKUPS: bundle %s gerado (%d bytes)", version, len(body))
+    return LookupBundle(version, body)
+
+
+# =============================================================================
+# TYPEAHEAD (segurados / atividades)
+# =============================================================================
+
+# Tamanho dos n-gramas do índice de substring
+NGRAM = 3
+
+
+class TypeaheadIndex:
+    """
+    Índice em memória para busca sem acento/caixa, sobre nomes já
+    normalizados na construção (a busca não chama _normalize_text por linha).
+    
+    Ranking: 1) nome começa com o texto, 2) alguma palavra começa com o
+    texto, 3) contém o texto. Dentro de cada faixa, ordem alfabética do
+    termo encontrado (nome ou palavra).
+    
+    Prefixos usam busca binária em listas ordenadas; substrings usam
+    listas de posições por trigrama (interseção + verificação). Textos com
+    menos de 3 caracteres caem numa varredura que para no limite.
+    
+    Por que em memória e não coluna normalizada/FTS5 no banco: manter a
+    coluna exigiria triggers chamando normalize(), função Python registrada
+    só nas conexões da API (database._normalize_text); inserts do sistema
+    legado em segur/ativi falhariam. O tokenizador trigram do FTS5 só
+    remove acentos a partir do SQLite 3.45.
+    """
+    
+    def __init__(self, items: tuple[dict[str, Any], ...]) -> None:
+        self.items = items
+        self.names = [_normalize_text(item["label"]) for item in items]
+        self._by_name = sorted((name, pos) for pos, name in enumerate(self.names))
+        self._by_word = sorted(
+            (word, pos)
+            for pos, name in enumerate(self.names)
+            for word in set(name.split())
+        )
+        grams: dict[str, list[int]] = {}
+        for pos, name in enumerate(self.names):
+            for gram in {name[i:i + NGRAM] for i in range(len(name) - NGRAM + 1)}:
+                grams.setdefault(gram, []).append(pos)
+        self._grams = grams
+    
+    @staticmethod
+    def _prefixed(sorted_pairs: list[tuple[str, int]], prefix: str):
+        """Posições cujo termo começa com `prefix` (ordem alfabética)."""
+        i = bisect_left(sorted_pairs, (prefix, -1))
+        while i < len(sorted_pairs) and sorted_pairs[i][0].startswith(prefix):
+            yield sorted_pairs[i][1]
+            i += 1
+    
+    def _containing(self, text: str):
+        """Posições cujo nome contém `text` (ordem alfabética)."""
+        if len(text) < NGRAM:
+            return (pos for pos, name in enumerate(self.names) if text in name)
+        
+        postings = sorted(
+            (self._grams.get(text[i:i + NGRAM], []) for i in range(len(text) - NGRAM + 1)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates.intersection_update(other)
+            if not candidates:
+                break
+        return (pos for pos in sorted(candidates) if text in self.names[pos])
+    
+    def search(self, query: str, limit: int) -> list[dict[str, Any]]:
+        """Busca ranqueada (prefixo → prefixo de palavra → substring)."""
+        text = _normalize_text(query).strip()
+        if not text:
+            return []
+        
+        found: list[int] = []
+        seen: set[int] = set()
+        for matches in (
+            self._prefixed(self._by_name, text),
+            self._prefixed(self._by_word, text),
+            self._containing(text),
+        ):
+            for pos in matches:
+                if pos not in seen:
+                    seen.add(pos)
+                    found.append(pos)
+                    if len(found) >= limit:
+                        return [self.items[p] for p in found]
+        
+        return [self.items[p] for p in found]
+
+
+@cached(tables=("segur",), ttl=LOOKUP_TTL)
+@single_flight
+def get_segurados_index() -> TypeaheadIndex:
+    """Índice de busca dos segurados (reconstruído quando segur muda)."""
+    return TypeaheadIndex(fetch_segurados().items)
+
+
+@cached(tables=("ativi",), ttl=LOOKUP_TTL)
+@single_flight
+def get_atividades_index() -> TypeaheadIndex:
+    """Índice de busca das atividades (reconstruído quando ativi muda)."""
+    return TypeaheadIndex(fetch_atividades().items)
@@ -0,0 +1,136 @@
+"""
+Queries de marcadores do grid - xFinance
+
+Marcadores de alerta por inspeção (0 = sem, 1 = azul, 2 = amarelo,
+3 = vermelho), empacotados na coluna inteira princ.marcadores, 2 bits
+por marcador:
+
+    bits 0-1: state_loc
+    bits 2-3: state_dt_envio
+    bits 4-5: state_dt_denvio
+    bits 6-7: state_dt_pago
+
+Antes ficavam na tabela tempstate (uma linha por id_princ), o que exigia
+um LEFT JOIN em toda query do grid. Migração: scripts/add_marcadores_princ.py
+(backfill a partir de tempstate + triggers por coluna para escritas legadas
+em tempstate + trigger em princ que espelha as escritas da API em tempstate,
+ainda lida pelo sistema legado).
+
+Acessores de compatibilidade (mesmos nomes de antes no grid/API):
+- marker_sql("state_loc")      -> expressão SQL (p.marcadores >> 0) & 3
+- unpack_markers(marcadores)   -> {"state_loc": ..., "state_dt_envio": ...}
+- pack_markers({...})          -> inteiro para princ.marcadores
+
+Padrão de transação:
+- Funções com sufixo _with_conn aceitam conexão externa (sem commit)
+- Funções sem sufixo criam conexão própria (commit + invalidação de cache)
+
+Benchmark: scripts/bench_marcar.py
+"""
+
+import logging
+import sqlite3
+from typing import Iterable, Mapping, Optional
+
+from database import get_db
+from services.cache import bump_table_version
+
+logger = logging.getLogger(__name__)
+
+MARKER_TYPES = ("state_loc", "state_dt_envio", "state_dt_denvio", "state_dt_pago")
+
+MARKER_VALUES = (0, 1, 2, 3)
+
+MARKER_BITS = 2
+MARKER_MASK = (1 << MARKER_BITS) - 1
+
+# Deslocamento de cada marcador em princ.marcadores
+MARKER_SHIFTS = {marker_type: i * MARKER_BITS for i, marker_type in enumerate(MARKER_TYPES)}
+
+
+# =============================================================================
+# ACESSORES
+# =============================================================================
+
+def marker_sql(marker_type: str, alias: str = "p") -> str:
+    """Expressão SQL que extrai um marcador (0-3) de princ.marcadores."""
+    return f"(({alias}.marcadores >> {MARKER_SHIFTS[marker_type]}) & {MARKER_MASK})"
+
+
+def unpack_markers(marcadores: Optional[int]) -> dict[str, int]:
+    """Valor de princ.marcadores -> {marker_type: 0-3}."""
+    packed = marcadores or 0
+    return {
+        marker_type: (packed >> shift) & MARKER_MASK
+        for marker_type, shift in MARKER_SHIFTS.items()
+    }
+
+
+def pack_markers(markers: Mapping[str, Optional[int]]) -> int:
+    """{marker_type: 0-3} -> valor de princ.marcadores (ausente/None = 0)."""
+    packed = 0
+    for marker_type, shift in MARKER_SHIFTS.items():
+        packed |= ((markers.get(marker_type) or 0) & MARKER_MASK) << shift
+    return packed
+
+
+# =============================================================================
+# ESCRITA
+# =============================================================================
+
+def set_markers_with_conn(
+    conn: sqlite3.Connection,
+    ids_princ: Iterable[int],
+    marker_type: str,
+    value: int,
+) -> int:
+    """
+    Aplica/remove um marcador em várias inspeções (sem commit).
+    
+    Um único UPDATE bit a bit para todos os ids: zera os 2 bits do
+    marcador e grava o novo valor, sem tocar nos outros marcadores.
+    
+    Args:
+        conn: Conexão (transação do chamador)
+        ids_princ: IDs das inspeções (duplicados são ignorados)
+        marker_type: Marcador (MARKER_TYPES)
+        value: 0-3
+    
+    Returns:
+        Número de inspeções marcadas/desmarcadas (ids existentes)
+    """
+    if marker_type not in MARKER_TYPES:
+        raise ValueError(f"Tipo de marcador inválido: {marker_type}")
+    if value not in MARKER_VALUES:
+        raise ValueError(f"Valor de marcador inválido: {value}")
+    
+    ids = list(dict.fromkeys(ids_princ))
+    if not ids:
+        return 0
+    
+    shift = MARKER_SHIFTS[marker_type]
+    placeholders = ",".join(["?"] * len(ids))
+    cursor = conn.execute(
+        f"""
+        UPDATE princ
+        SET marcadores = (COALESCE(marcadores, 0) & ~{MARKER_MASK << shift}) | ?
+        WHERE id_princ IN ({placeholders})
+        """,
+        [value << shift, *ids]
+    )
+    return cursor.rowcount
+
+
+def set_markers(ids_princ: Iterable[int], marker_type: str, value: int) -> int:
+    """
+    Aplica/remove um marcador em várias inspeções (transação própria).
+    
+    Returns:
+        Número de inspeções marcadas/desmarcadas
+    """
+    with get_db() as conn:
+        updated = set_markers_with_conn(conn, ids_princ, marker_type, value)
+        conn.commit()
+    
+    bump_table_version("princ")
+    return updated
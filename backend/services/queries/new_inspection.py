@@ -21,6 +21,7 @@ from datetime import date
 from typing import Optional, Dict, Any, Tuple
 
 from database import get_db, get_connection
+from services.cache import bump_table_version
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,7 @@ def get_or_create_segur(segur_nome: str) -> int:
             (segur_nome,)
         )
         conn.commit()
+        bump_table_version("segur")
         new_id = cursor.lastrowid
         logger.info("Segurado criado: %s (id=%d)", segur_nome, new_id)
         return new_id
@@ -104,6 +106,7 @@ def get_or_create_ativi(atividade: str) -> int:
             (atividade,)
         )
         conn.commit()
+        bump_table_version("ativi")
         new_id = cursor.lastrowid
         logger.info("Atividade criada: %s (id=%d)", atividade, new_id)
         return new_id
@@ -162,6 +165,7 @@ def insert_new_inspection(
             )
         )
         conn.commit()
+        bump_table_version("princ")
         new_id = cursor.lastrowid
         
         logger.info(
@@ -211,6 +215,7 @@ def insert_demais_local(
             (id_princ, dt_inspecao, id_uf, id_cidade, id_user_guy, unidade, id_ativi, atividade)
         )
         conn.commit()
+        bump_table_version("demais_locais")
         new_id = cursor.lastrowid
         
         logger.info(
@@ -244,6 +249,7 @@ def increment_princ_loc(id_princ: int) -> int:
             (id_princ,)
         )
         conn.commit()
+        bump_table_version("princ")
         
         # Buscar novo valor
         cursor = conn.execute(
@@ -536,6 +542,7 @@ def create_inspection_atomic(
         
         # 4. Commit da transação
         conn.commit()
+        bump_table_version("princ", "segur", "ativi")
         logger.info(
             "Transação COMMIT: id_princ=%d, segur=%d, ativi=%d",
             id_princ, final_id_segur, final_id_ativi
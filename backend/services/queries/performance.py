@@ -15,9 +15,14 @@ import logging
 from typing import Any, Optional
 
 from database import get_db
+from services.cache import cached
+from services.singleflight import single_flight
 
 logger = logging.getLogger(__name__)
 
+# Tabelas de origem dos dados cacheados (invalidação por versão)
+CACHE_TABLES = ("princ", "contr", "user")
+
 
 # =============================================================================
 # CONSTANTES - SQL JOINS
@@ -86,6 +91,8 @@ def _build_where(
 # FILTROS DISPONÍVEIS
 # =============================================================================
 
+@cached(tables=CACHE_TABLES)
+@single_flight
 def fetch_filter_options() -> dict[str, list[dict]]:
     """
     Busca opções para filtros de ano.
@@ -122,6 +129,8 @@ def fetch_filter_options() -> dict[str, list[dict]]:
 # KPIs
 # =============================================================================
 
+@cached(tables=CACHE_TABLES)
+@single_flight
 def fetch_kpis(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
@@ -176,6 +185,8 @@ def fetch_kpis(
 # MARKET SHARE
 # =============================================================================
 
+@cached(tables=CACHE_TABLES)
+@single_flight
 def fetch_market_share(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
@@ -263,6 +274,8 @@ def fetch_market_share(
 # BUSINESS (HONORÁRIOS POR ANO/MÊS)
 # =============================================================================
 
+@cached(tables=CACHE_TABLES)
+@single_flight
 def fetch_business(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
@@ -386,6 +399,8 @@ def fetch_business(
 # OPERATIONAL (HONORÁRIOS POR OPERADOR/ANO)
 # =============================================================================
 
+@cached(tables=CACHE_TABLES)
+@single_flight
 def fetch_operational(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
@@ -500,6 +515,7 @@ def fetch_operational(
 # DETAILS (GRID DETALHADO)
 # =============================================================================
 
+@single_flight
 def fetch_details(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
@@ -601,6 +617,7 @@ def fetch_details(
 # KPIs EXTENDED (COM SPARKLINES, TRENDS E PERÍODO ANTERIOR)
 # =============================================================================
 
+@single_flight
 def fetch_kpis_extended(
     base_date: str = "dt_envio",
     ano_ini: Optional[int] = None,
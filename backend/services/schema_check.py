@@ -0,0 +1,84 @@
+"""
+Verificação de Schema no Startup - xFinance
+
+Colunas e triggers criados por scripts de migração manuais
+(backend/scripts/) são lidos diretamente pelas queries da API. Sem a
+migração, os endpoints falhariam com HTTP 500 a cada requisição; a
+verificação no startup interrompe a API com uma mensagem que indica o
+script a executar.
+
+Ao criar uma migração da qual a API depende, acrescente-a aqui.
+"""
+
+import logging
+
+from database import get_db
+
+logger = logging.getLogger(__name__)
+
+# (tabela, coluna, script de migração)
+REQUIRED_COLUMNS = (
+    ("finan", "rentabilidade_num", "scripts/add_rentabilidade_num.py"),
+    ("segur", "uso_count", "scripts/add_lookup_usage_stats.py"),
+    ("segur", "ultimo_princ", "scripts/add_lookup_usage_stats.py"),
+    ("ativi", "uso_count", "scripts/add_lookup_usage_stats.py"),
+    ("ativi", "ultimo_princ", "scripts/add_lookup_usage_stats.py"),
+    ("princ", "marcadores", "scripts/add_marcadores_princ.py"),
+)
+
+# (trigger, script de migração)
+REQUIRED_TRIGGERS = (
+    # Espelho de princ.marcadores em tempstate (lido pelo sistema legado)
+    ("trg_princ_marcadores_tempstate", "scripts/add_marcadores_princ.py"),
+)
+
+
+class SchemaMigrationError(RuntimeError):
+    """Banco sem uma migração exigida pela API."""
+
+
+def find_missing_migrations() -> dict[str, list[str]]:
+    """
+    Itens ausentes no banco, agrupados pelo script que os cria.
+    
+    Returns:
+        {script: ["tabela.coluna" | "trigger nome", ...]} (vazio se completo)
+    """
+    missing: dict[str, list[str]] = {}
+    
+    with get_db() as conn:
+        columns_by_table: dict[str, set[str]] = {}
+        for table, column, script in REQUIRED_COLUMNS:
+            if table not in columns_by_table:
+                columns_by_table[table] = {
+                    row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+                }
+            if column not in columns_by_table[table]:
+                missing.setdefault(script, []).append(f"{table}.{column}")
+        
+        triggers = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        }
+        for trigger, script in REQUIRED_TRIGGERS:
+            if trigger not in triggers:
+                missing.setdefault(script, []).append(f"trigger {trigger}")
+    
+    return missing
+
+
+def check_schema() -> None:
+    """
+    Interrompe o startup se faltar alguma migração.
+    
+    Raises:
+        SchemaMigrationError: com os scripts a executar e o que falta
+    """
+    missing = find_missing_migrations()
+    if not missing:
+        logger.info("Schema: migrações verificadas")
+        return
+    
+    details = "; ".join(
+        f"python backend/{script} ({', '.join(items)})" for script, items in missing.items()
+    )
+    raise SchemaMigrationError(f"Migração pendente no banco, execute: {details}")
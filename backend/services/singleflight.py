@@ -0,0 +1,136 @@
+"""
+Single-flight de chamadas - xFinance
+
+Coalesce chamadas concorrentes idênticas: quando várias requisições pedem
+o mesmo cálculo (mesma função + mesmos argumentos) ao mesmo tempo, apenas
+a primeira executa a query; as demais aguardam e recebem o mesmo resultado.
+
+Uso:
+    @single_flight
+    def fetch_kpis(base_date: str = "dt_envio", ...) -> dict:
+        ...
+
+⚠️ O resultado é compartilhado entre os chamadores: quem consome NÃO deve
+mutar o dict/list retornado.
+"""
+
+import functools
+import logging
+import threading
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Call:
+    """Chamada em andamento (compartilhada entre líder e seguidores)."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlightGroup:
+    """
+    Grupo de chamadas coalescidas por chave.
+
+    Thread-safe: as rotas síncronas do FastAPI rodam no threadpool,
+    então a coordenação é feita com threading.Lock/Event.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa fn(*args, **kwargs) ou aguarda a execução idêntica em andamento.
+
+        Exceções do líder são propagadas para todos os seguidores.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.waiters:
+                logger.debug(
+                    "SINGLEFLIGHT: %s compartilhado com %d chamada(s)",
+                    self.name, call.waiters,
+                )
+            call.event.set()
+
+    def stats(self) -> dict:
+        """Retorna contadores do grupo."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "executed": self.executed,
+                "shared": self.shared,
+                "in_flight": len(self._calls),
+            }
+
+
+# Registro global (para métricas)
+_groups: dict[str, SingleFlightGroup] = {}
+
+
+def _make_key(args: tuple, kwargs: dict) -> Hashable:
+    """Monta chave hashable a partir dos argumentos."""
+    if kwargs:
+        return (args, tuple(sorted(kwargs.items())))
+    return args
+
+
+def single_flight(fn: F) -> F:
+    """
+    Decorator: coalesce chamadas concorrentes com os mesmos argumentos.
+
+    Os argumentos devem ser hashable (str, int, bool, None...).
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    group = SingleFlightGroup(name)
+    _groups[name] = group
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return group.do(_make_key(args, kwargs), fn, *args, **kwargs)
+
+    wrapper.singleflight_group = group  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+def get_singleflight_stats() -> list[dict]:
+    """Retorna contadores de todos os grupos registrados."""
+    return [group.stats() for group in _groups.values()]
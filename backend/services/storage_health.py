@@ -0,0 +1,238 @@
+"""
+Saúde dos Destinos de Rede - xFinance
+
+Disponibilidade do NAS (Trabalhos), do servidor de Fotos e do mount de
+backup, verificada por uma thread de fundo e mantida em memória.
+
+Antes, cada criação de diretório/backup testava o destino na hora
+(socket na porta 445, `net use`, stat do mount) e abria um
+ThreadPoolExecutor próprio por operação.
+
+Uso:
+    register_probe("nas", _probe_nas)     # no import do service dono
+    if is_available("nas"): ...           # leitura instantânea (cache)
+    run_io(os.makedirs, path, exist_ok=True, timeout=15)
+
+Cache:
+- A thread verifica todos os destinos a cada STORAGE_HEALTH_INTERVAL_SECONDS
+- is_available() usa o status em memória enquanto tiver até
+  STORAGE_HEALTH_TTL_SECONDS; status vencido (ou sem monitor ativo, ex:
+  scripts) é verificado na hora
+- invalidate(nome): força nova verificação após uma falha de I/O
+
+Executor: um único pool de longa duração (STORAGE_IO_WORKERS) para
+verificações e operações de arquivo com timeout. Num timeout a chamada
+retorna na hora; a operação presa continua ocupando um worker até
+terminar (o pool limita quantas podem se acumular).
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+# =============================================================================
+# EXECUTOR COMPARTILHADO
+# =============================================================================
+
+io_executor = ThreadPoolExecutor(
+    max_workers=settings.STORAGE_IO_WORKERS,
+    thread_name_prefix="storage-io",
+)
+
+
+def run_io(fn: Callable[..., Any], *args: Any, timeout: float, **kwargs: Any) -> Any:
+    """
+    Executa fn no pool de I/O e aguarda até `timeout` segundos.
+    
+    Raises:
+        concurrent.futures.TimeoutError: a operação não terminou no prazo
+    """
+    future = io_executor.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        future.cancel()  # Só tem efeito se ainda não começou
+        raise
+
+
+# =============================================================================
+# MONITOR
+# =============================================================================
+
+class StorageHealthMonitor:
+    """Status dos destinos de rede (verificação periódica + TTL)."""
+    
+    def __init__(self, interval: float, ttl: float, probe_timeout: float) -> None:
+        self.interval = interval
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self._probes: dict[str, Callable[[], bool]] = {}
+        self._lock = threading.Lock()
+        # nome -> (disponível, monotonic da verificação)
+        self._status: dict[str, tuple[bool, float]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # Métricas
+        self.hits = 0
+        self.sync_probes = 0
+        self.rounds = 0
+    
+    def register(self, name: str, probe: Callable[[], bool]) -> None:
+        with self._lock:
+            self._probes[name] = probe
+    
+    # =========================================================================
+    # VERIFICAÇÃO
+    # =========================================================================
+    
+    def _record(self, name: str, ok: bool) -> bool:
+        with self._lock:
+            previous = self._status.get(name)
+            self._status[name] = (ok, time.monotonic())
+        
+        if previous is not None and previous[0] != ok:
+            logger.info("STORAGE: %s %s", name, "disponível" if ok else "INDISPONÍVEL")
+        return ok
+    
+    def _result(self, name: str, future: Future, timeout: float) -> bool:
+        """Resultado de uma verificação (timeout/erro = indisponível)."""
+        try:
+            return bool(future.result(timeout=timeout))
+        except FuturesTimeoutError:
+            future.cancel()
+            logger.warning("STORAGE: %s não respondeu em %.0fs", name, self.probe_timeout)
+        except Exception as e:
+            logger.warning("STORAGE: erro ao verificar %s - %s", name, e)
+        return False
+    
+    def probe_all(self) -> dict[str, bool]:
+        """Verifica todos os destinos em paralelo (no pool de I/O)."""
+        with self._lock:
+            probes = list(self._probes.items())
+        
+        futures = [(name, io_executor.submit(probe)) for name, probe in probes]
+        deadline = time.monotonic() + self.probe_timeout
+        results = {
+            name: self._record(name, self._result(name, future, max(deadline - time.monotonic(), 0)))
+            for name, future in futures
+        }
+        
+        with self._lock:
+            self.rounds += 1
+        return results
+    
+    def is_available(self, name: str) -> bool:
+        """Status do destino (cache; verifica na hora se vencido)."""
+        with self._lock:
+            cached = self._status.get(name)
+            if cached is not None and time.monotonic() - cached[1] <= self.ttl:
+                self.hits += 1
+                return cached[0]
+            probe = self._probes.get(name)
+            self.sync_probes += 1
+        
+        if probe is None:
+            logger.warning("STORAGE: destino não registrado: %s", name)
+            return False
+        ok = self._result(name, io_executor.submit(probe), self.probe_timeout)
+        return self._record(name, ok)
+    
+    def invalidate(self, name: str) -> None:
+        """Descarta o status (próxima leitura verifica de novo)."""
+        with self._lock:
+            self._status.pop(name, None)
+    
+    # =========================================================================
+    # THREAD DE FUNDO
+    # =========================================================================
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-health", daemon=True)
+        self._thread.start()
+        logger.info("STORAGE: monitor iniciado (intervalo=%.0fs, ttl=%.0fs)", self.interval, self.ttl)
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error("STORAGE: erro no monitor - %s", e)
+            self._stop.wait(self.interval)
+    
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "running": self.running,
+                "targets": {
+                    name: {"available": ok, "age_seconds": round(now - checked, 1)}
+                    for name, (ok, checked) in self._status.items()
+                },
+                "hits": self.hits,
+                "sync_probes": self.sync_probes,
+                "rounds": self.rounds,
+            }
+
+
+# =============================================================================
+# INSTÂNCIA GLOBAL
+# =============================================================================
+
+storage_monitor = StorageHealthMonitor(
+    settings.STORAGE_HEALTH_INTERVAL_SECONDS,
+    settings.STORAGE_HEALTH_TTL_SECONDS,
+    settings.STORAGE_PROBE_TIMEOUT_SECONDS,
+)
+
+
+def register_probe(name: str, probe: Callable[[], bool]) -> None:
+    """Registra a verificação de um destino (chamado no import do service)."""
+    storage_monitor.register(name, probe)
+
+
+def is_available(name: str) -> bool:
+    """Disponibilidade do destino (status em memória)."""
+    return storage_monitor.is_available(name)
+
+
+def invalidate(name: str) -> None:
+    """Força nova verificação do destino na próxima leitura."""
+    storage_monitor.invalidate(name)
+
+
+def start_storage_monitor() -> None:
+    """Inicia a verificação periódica (chamado no startup da API)."""
+    storage_monitor.start()
+
+
+def stop_storage_monitor() -> None:
+    """Encerra a verificação periódica (chamado no shutdown da API)."""
+    storage_monitor.stop()
+
+
+def get_storage_stats() -> dict:
+    """Status em cache dos destinos e métricas do monitor."""
+    return storage_monitor.stats()
@@ -0,0 +1,48 @@
+"""
+Fixtures dos testes - xFinance
+
+Cada teste recebe bancos SQLite próprios (principal + auditoria) num
+diretório temporário, apontados por XFINANCE_DB_PATH e
+XFINANCE_AUDIT_DB_PATH; nada toca no banco de produção.
+
+Execução (em backend/):
+    python -m pytest -q
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Sem agendador de backups nos testes
+os.environ.setdefault("XF_ENABLE_SCHEDULER", "false")
+
+
+@pytest.fixture
+def main_db(tmp_path, monkeypatch) -> Path:
+    """Banco principal vazio (o teste cria as tabelas que usa)."""
+    path = tmp_path / "xFinanceDB.db"
+    sqlite3.connect(path).close()
+    monkeypatch.setenv("XFINANCE_DB_PATH", str(path))
+    monkeypatch.setenv("XFINANCE_AUDIT_DB_PATH", str(tmp_path / "xFinanceAudit.db"))
+    
+    # Tabelas criadas "uma vez por processo": recriar no banco novo
+    import services.audit
+    import services.jobs
+    monkeypatch.setattr(services.audit, "_table_ready", False)
+    monkeypatch.setattr(services.jobs, "_table_ready", False)
+    return path
+
+
+@pytest.fixture
+def conn(main_db):
+    """Conexão direta com o banco principal do teste."""
+    connection = sqlite3.connect(main_db)
+    connection.row_factory = sqlite3.Row
+    yield connection
+    connection.close()
@@ -0,0 +1,97 @@
+"""Testes do AuditWriter (services/audit.py): lotes, flush, stop e falhas."""
+
+import sqlite3
+
+import pytest
+
+import services.audit as audit
+from services.audit import AuditWriter, _build_row
+
+
+def _row(id_princ: int, campo: str = "obs") -> tuple:
+    return _build_row(1, "tester", id_princ, "UPDATE", campo, "a", "b")
+
+
+def _audit_ids(tmp_path) -> list[int]:
+    conn = sqlite3.connect(tmp_path / "xFinanceAudit.db")
+    try:
+        return [r[0] for r in conn.execute("SELECT id_princ FROM audit_log ORDER BY id_log")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def writer(main_db):
+    w = AuditWriter(max_events=100, batch_size=10, flush_interval=5.0, enqueue_timeout=0.1)
+    w.start()
+    yield w
+    w.stop()
+
+
+def test_flush_waits_for_pending_events(writer, tmp_path):
+    for i in range(25):
+        writer.submit(_row(i))
+    
+    # flush_interval longo: sem o flush os eventos ainda estariam na fila
+    assert writer.flush(timeout=5.0)
+    assert _audit_ids(tmp_path) == list(range(25))
+    stats = writer.stats()
+    assert stats["written"] == 25
+    assert stats["batches"] >= 3  # lotes de até 10
+
+
+def test_stop_drains_queue(main_db, tmp_path):
+    w = AuditWriter(max_events=100, batch_size=500, flush_interval=60.0, enqueue_timeout=0.1)
+    w.start()
+    for i in range(7):
+        w.submit(_row(i))
+    
+    w.stop()
+    
+    assert not w.running
+    assert _audit_ids(tmp_path) == list(range(7))
+
+
+def test_flush_without_thread_returns_immediately(main_db):
+    w = AuditWriter(max_events=10, batch_size=10, flush_interval=1.0, enqueue_timeout=0.1)
+    assert w.flush(timeout=0.1) is True
+
+
+def test_failed_batch_is_retried(main_db, monkeypatch):
+    real_write = audit._write_rows
+    attempts = []
+    
+    def flaky(rows):
+        attempts.append(len(rows))
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        real_write(rows)
+    
+    monkeypatch.setattr(audit, "_write_rows", flaky)
+    w = AuditWriter(10, 10, 1.0, 0.1, retries=2, retry_delay=0)
+    
+    w._flush_batch([_row(1), _row(2)])
+    
+    assert attempts == [2, 2]
+    assert w.written == 2
+    assert w.retried == 1
+    assert w.failed == 0
+
+
+def test_persistent_failure_writes_rows_individually(main_db, monkeypatch, tmp_path):
+    real_write = audit._write_rows
+    
+    def reject_bad(rows):
+        if any(r[4] == "bad" for r in rows):
+            raise sqlite3.IntegrityError("bad row")
+        real_write(rows)
+    
+    monkeypatch.setattr(audit, "_write_rows", reject_bad)
+    w = AuditWriter(10, 10, 1.0, 0.1, retries=1, retry_delay=0)
+    
+    w._flush_batch([_row(1), _row(2, campo="bad"), _row(3)])
+    
+    # Só o evento inválido é descartado
+    assert _audit_ids(tmp_path) == [1, 3]
+    assert w.written == 2
+    assert w.failed == 1
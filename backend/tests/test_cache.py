@@ -0,0 +1,95 @@
+"""Testes de services/cache.py (@cached + bump_table_version)."""
+
+import time
+
+from services.cache import bump_table_version, cached, get_table_version
+
+
+def test_cached_result_until_table_version_changes():
+    calls = []
+    
+    @cached(tables=("t_cache_bump",))
+    def fetch(value: int) -> list:
+        calls.append(value)
+        return [value, len(calls)]
+    
+    first = fetch(1)
+    assert fetch(1) is first
+    assert calls == [1]
+    
+    bump_table_version("t_cache_bump")
+    
+    second = fetch(1)
+    assert second is not first
+    assert second == [1, 2]
+    assert calls == [1, 1]
+    assert fetch.cache.stats()["invalidations"] == 1
+
+
+def test_bump_of_other_table_keeps_entry():
+    calls = []
+    
+    @cached(tables=("t_cache_a",))
+    def fetch() -> int:
+        calls.append(1)
+        return len(calls)
+    
+    fetch()
+    bump_table_version("t_cache_other")
+    fetch()
+    assert calls == [1]
+
+
+def test_key_normalized_by_signature():
+    calls = []
+    
+    @cached(tables=("t_cache_key",))
+    def fetch(base: str = "dt_envio", ano: int = 0) -> tuple:
+        calls.append((base, ano))
+        return base, ano
+    
+    fetch()
+    fetch("dt_envio")
+    fetch(base="dt_envio", ano=0)
+    assert len(calls) == 1
+    
+    fetch(ano=2025)
+    assert len(calls) == 2
+
+
+def test_write_during_computation_is_not_served():
+    """Versões lidas ANTES do cálculo: escrita no meio descarta o resultado."""
+    calls = []
+    
+    @cached(tables=("t_cache_race",))
+    def fetch() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            bump_table_version("t_cache_race")
+        return len(calls)
+    
+    assert fetch() == 1
+    assert fetch() == 2
+    assert fetch() == 2
+
+
+def test_ttl_expiration():
+    calls = []
+    
+    @cached(tables=("t_cache_ttl",), ttl=0.05)
+    def fetch() -> int:
+        calls.append(1)
+        return len(calls)
+    
+    fetch()
+    time.sleep(0.1)
+    fetch()
+    assert calls == [1, 1]
+    assert fetch.cache.stats()["expirations"] == 1
+
+
+def test_bump_increments_version():
+    before = get_table_version("t_cache_version")
+    bump_table_version("t_cache_version", "t_cache_version_2")
+    assert get_table_version("t_cache_version") == before + 1
+    assert get_table_version("t_cache_version_2") >= 1
@@ -0,0 +1,142 @@
+"""Testes do PATCH /api/inspections/batch (validação e transação única)."""
+
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+from dependencies import CurrentUser
+from routers.inspections import BatchEdit, BatchUpdateRequest, update_inspections_batch
+
+ADMIN = CurrentUser(email="admin@xfinance.test", papel="admin", id_user=1)
+BACKOFFICE = CurrentUser(email="bo@xfinance.test", papel="BackOffice", id_user=2)
+
+
+@pytest.fixture
+def princ_db(conn):
+    conn.executescript(
+        """
+        CREATE TABLE princ (
+            id_princ INTEGER PRIMARY KEY,
+            dt_inspecao TEXT,
+            dt_envio TEXT,
+            honorario REAL,
+            obs TEXT,
+            prazo INTEGER
+        );
+        INSERT INTO princ (id_princ, dt_inspecao, dt_envio, honorario, obs, prazo) VALUES
+            (1, '2025-01-10', NULL, 100.0, 'a', 5),
+            (2, '2025-01-11', NULL, 200.0, 'b', 7);
+        """
+    )
+    conn.commit()
+    return conn
+
+
+def _patch(user: CurrentUser, *edits: tuple):
+    request = BatchUpdateRequest(
+        edits=[BatchEdit(id_princ=i, field=f, value=v) for i, f, v in edits]
+    )
+    return asyncio.run(update_inspections_batch(request, user))
+
+
+def _rows(conn) -> list[tuple]:
+    return [
+        tuple(r)
+        for r in conn.execute("SELECT id_princ, dt_envio, honorario, obs, prazo FROM princ ORDER BY id_princ")
+    ]
+
+
+def _audit_rows(tmp_path) -> list[tuple]:
+    path = tmp_path / "xFinanceAudit.db"
+    if not path.exists():
+        return []
+    audit = sqlite3.connect(path)
+    try:
+        return audit.execute(
+            "SELECT id_princ, campo, valor_anterior, valor_novo FROM audit_log ORDER BY id_log"
+        ).fetchall()
+    finally:
+        audit.close()
+
+
+def test_batch_updates_all_records(princ_db, tmp_path):
+    response = _patch(
+        ADMIN,
+        (1, "dt_envio", "05/03/25"),
+        (1, "obs", "primeira"),
+        (2, "honorario", "1.234,50"),
+        (1, "obs", "última"),
+    )
+    
+    assert response.success
+    assert response.updated == 2
+    assert _rows(princ_db) == [
+        # dt_envio é campo crítico: prazo limpo
+        (1, "2025-03-05", 100.0, "última", None),
+        (2, None, 1234.5, "b", 7),
+    ]
+    assert sorted(_audit_rows(tmp_path)) == [
+        (1, "dt_envio", None, "2025-03-05"),
+        (1, "obs", "a", "última"),
+        (2, "honorario", "200.0", "1234.5"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "user, edit, status_code",
+    [
+        (ADMIN, (1, "prazo", 1), 400),           # campo não editável
+        (BACKOFFICE, (1, "honorario", 1), 403),  # campo de admin
+    ],
+)
+def test_invalid_edit_rejects_whole_batch(princ_db, tmp_path, user, edit, status_code):
+    before = _rows(princ_db)
+    
+    with pytest.raises(HTTPException) as exc:
+        _patch(user, (2, "obs", "válido"), edit)
+    
+    assert exc.value.status_code == status_code
+    assert _rows(princ_db) == before
+    assert _audit_rows(tmp_path) == []
+
+
+def test_missing_record_rolls_back(princ_db, tmp_path):
+    before = _rows(princ_db)
+    
+    with pytest.raises(HTTPException) as exc:
+        _patch(ADMIN, (1, "obs", "x"), (99, "obs", "y"))
+    
+    assert exc.value.status_code == 404
+    assert "99" in exc.value.detail
+    assert _rows(princ_db) == before
+    assert _audit_rows(tmp_path) == []
+
+
+def test_database_error_rolls_back_partial_writes(princ_db, tmp_path):
+    # Falha na escrita do segundo registro, depois do primeiro UPDATE
+    princ_db.execute(
+        """
+        CREATE TRIGGER trg_fail_2 BEFORE UPDATE ON princ
+        WHEN NEW.id_princ = 2
+        BEGIN
+            SELECT RAISE(ABORT, 'falha simulada');
+        END
+        """
+    )
+    princ_db.commit()
+    before = _rows(princ_db)
+    
+    with pytest.raises(HTTPException) as exc:
+        _patch(ADMIN, (1, "obs", "x"), (2, "obs", "y"))
+    
+    assert exc.value.status_code == 500
+    assert _rows(princ_db) == before
+    assert _audit_rows(tmp_path) == []
+
+
+def test_empty_batch_is_rejected(princ_db):
+    with pytest.raises(HTTPException) as exc:
+        _patch(ADMIN)
+    assert exc.value.status_code == 400
@@ -0,0 +1,121 @@
+"""Testes da fila persistente de jobs (services/jobs.py) e do GET /api/jobs/{id}."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import services.jobs as jobs
+from database import get_db
+from dependencies import CurrentUser
+from routers.jobs import get_job_status
+from services.jobs import JobError, JobQueue, enqueue_job, get_job, register_job_handler
+
+
+@pytest.fixture
+def queue(main_db, monkeypatch):
+    monkeypatch.setattr(jobs.settings, "JOBS_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs.settings, "JOBS_RETRY_BASE_SECONDS", 30.0)
+    monkeypatch.setattr(jobs.settings, "JOBS_RETRY_MAX_SECONDS", 100.0)
+    return JobQueue(workers=1, poll_interval=0.1)
+
+
+def _make_due(id_job: int) -> None:
+    """Antecipa a próxima tentativa agendada (sem esperar o backoff)."""
+    with get_db() as conn:
+        conn.execute("UPDATE jobs SET proximo_em = '2000-01-01 00:00:00' WHERE id_job = ?", (id_job,))
+        conn.commit()
+
+
+def test_successful_job(queue):
+    register_job_handler("test_ok", lambda payload: {"echo": payload["x"]})
+    id_job = enqueue_job("test_ok", {"x": 1}, id_princ=10, id_user=7)
+    
+    assert queue.run_next() is True
+    assert queue.run_next() is False
+    
+    job = get_job(id_job)
+    assert job["status"] == jobs.STATUS_DONE
+    assert job["tentativas"] == 1
+    assert job["resultado"] == {"echo": 1}
+
+
+def test_failed_job_is_retried_with_backoff(queue):
+    def failing(payload):
+        raise JobError("NAS indisponível", result={"criados": 1})
+    
+    register_job_handler("test_retry", failing)
+    id_job = enqueue_job("test_retry", {})
+    
+    before = datetime.now()
+    assert queue.run_next() is True
+    
+    job = get_job(id_job)
+    assert job["status"] == jobs.STATUS_PENDING
+    assert job["tentativas"] == 1
+    assert job["erro"] == "NAS indisponível"
+    assert job["resultado"] == {"criados": 1}
+    proximo_em = datetime.strptime(job["proximo_em"], "%Y-%m-%d %H:%M:%S")
+    assert before + timedelta(seconds=29) <= proximo_em <= datetime.now() + timedelta(seconds=31)
+    
+    # Ainda não venceu: nada a executar
+    assert queue.run_next() is False
+    
+    for _ in range(2):
+        _make_due(id_job)
+        assert queue.run_next() is True
+    
+    job = get_job(id_job)
+    assert job["status"] == jobs.STATUS_FAILED
+    assert job["tentativas"] == 3
+    assert queue.stats()["retried"] == 2
+    assert queue.stats()["failed"] == 1
+
+
+def test_unknown_job_type_fails_without_retry(queue):
+    id_job = enqueue_job("test_sem_handler", {})
+    
+    queue.run_next()
+    
+    job = get_job(id_job)
+    assert job["status"] == jobs.STATUS_FAILED
+    assert job["tentativas"] == 1
+
+
+def test_retry_delay_doubles_up_to_max(queue):
+    assert [jobs._retry_delay(t) for t in range(1, 6)] == [30.0, 60.0, 100.0, 100.0, 100.0]
+
+
+def test_purge_removes_only_old_finished_jobs(queue):
+    register_job_handler("test_ok", lambda payload: {})
+    old_done = enqueue_job("test_ok", {})
+    queue.run_next()
+    pending = enqueue_job("test_ok", {})
+    
+    with get_db() as conn:
+        conn.execute("UPDATE jobs SET dt_atualizacao = '2000-01-01 00:00:00'")
+        conn.commit()
+    
+    assert queue.purge_old() == 1
+    assert get_job(old_done) is None
+    assert get_job(pending) is not None
+
+
+def test_job_status_visible_only_to_owner_or_admin(queue):
+    id_job = enqueue_job("test_ok", {}, id_user=7)
+    
+    owner = CurrentUser(email="dono@xfinance.test", papel="BackOffice", id_user=7)
+    admin = CurrentUser(email="admin@xfinance.test", papel="admin", id_user=1)
+    other = CurrentUser(email="outro@xfinance.test", papel="BackOffice", id_user=8)
+    
+    assert get_job_status(id_job, owner)["id_job"] == id_job
+    assert get_job_status(id_job, admin)["id_job"] == id_job
+    
+    with pytest.raises(HTTPException) as exc:
+        get_job_status(id_job, other)
+    assert exc.value.status_code == 404
+    
+    # Job inexistente: mesma resposta (não revela existência)
+    with pytest.raises(HTTPException) as missing:
+        get_job_status(id_job + 1, admin)
+    assert missing.value.detail == f"Job #{id_job + 1} não encontrado"
@@ -0,0 +1,128 @@
+"""Testes de services/login_attempts.py (bloqueio e resets externos)."""
+
+import threading
+
+import pytest
+
+from services.auth import _ensure_user_security_columns
+from services.login_attempts import MAX_FAILED_ATTEMPTS, LoginAttemptStore
+
+EMAIL = "inspetor@xfinance.test"
+
+
+@pytest.fixture
+def user_db(conn):
+    conn.execute("CREATE TABLE user (id_user INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL)")
+    conn.execute("INSERT INTO user (email) VALUES (?)", (EMAIL,))
+    conn.commit()
+    _ensure_user_security_columns(conn)
+    return conn
+
+
+def _db_state(conn) -> tuple:
+    row = conn.execute(
+        "SELECT COALESCE(failed_attempts, 0), locked_until, attempts_version FROM user WHERE email = ?",
+        (EMAIL,),
+    ).fetchone()
+    return tuple(row)
+
+
+def test_failures_stay_in_memory_until_flush(user_db):
+    store = LoginAttemptStore(flush_interval=60)
+    
+    attempts, locked = store.record_failure(EMAIL, *_db_state(user_db))
+    
+    assert (attempts, locked) == (1, None)
+    assert _db_state(user_db)[:2] == (0, None)
+    assert store.flush() == 1
+    assert _db_state(user_db)[:2] == (1, None)
+
+
+def test_lockout_is_written_immediately(user_db):
+    store = LoginAttemptStore(flush_interval=60)
+    
+    for _ in range(MAX_FAILED_ATTEMPTS):
+        attempts, locked = store.record_failure(EMAIL, *_db_state(user_db))
+    
+    assert attempts == MAX_FAILED_ATTEMPTS
+    assert locked is not None
+    # Sem flush periódico: o bloqueio já está no banco
+    assert _db_state(user_db)[:2] == (MAX_FAILED_ATTEMPTS, locked)
+    assert store.stats()["lockouts"] == 1
+
+
+def test_outside_reset_with_same_values_wins(user_db):
+    """Reset externo que grava os mesmos valores já gravados pela API."""
+    store = LoginAttemptStore(flush_interval=60)
+    store.record_failure(EMAIL, *_db_state(user_db))
+    store.flush()                                      # banco: (1, NULL)
+    store.record_failure(EMAIL, *_db_state(user_db))   # memória: 2, não gravado
+    
+    user_db.execute("UPDATE user SET failed_attempts = 1, locked_until = NULL WHERE email = ?", (EMAIL,))
+    user_db.commit()
+    
+    assert store.get(EMAIL, *_db_state(user_db)) == (1, None)
+    assert store.stats()["external_resets"] == 1
+
+
+def test_flush_does_not_overwrite_outside_reset(user_db):
+    store = LoginAttemptStore(flush_interval=60)
+    for _ in range(3):
+        store.record_failure(EMAIL, *_db_state(user_db))
+    
+    user_db.execute("UPDATE user SET failed_attempts = 0, locked_until = NULL WHERE email = ?", (EMAIL,))
+    user_db.commit()
+    
+    assert store.flush() == 0
+    assert _db_state(user_db)[:2] == (0, None)
+    assert store.stats()["tracked"] == 0
+
+
+def test_stale_read_is_not_an_outside_change(user_db):
+    """Leitura feita antes da nossa própria gravação não descarta a memória."""
+    store = LoginAttemptStore(flush_interval=60)
+    stale = _db_state(user_db)
+    store.record_failure(EMAIL, *stale)
+    store.flush()
+    
+    store.record_failure(EMAIL, *stale)
+    
+    assert store.stats()["external_resets"] == 0
+    store.flush()
+    assert _db_state(user_db)[:2] == (2, None)
+
+
+def test_lockout_survives_concurrent_periodic_flush(user_db):
+    store = LoginAttemptStore(flush_interval=60)
+    stop = threading.Event()
+    
+    def periodic():
+        while not stop.is_set():
+            store.flush()
+    
+    flusher = threading.Thread(target=periodic)
+    flusher.start()
+    try:
+        for _ in range(MAX_FAILED_ATTEMPTS):
+            _attempts, locked = store.record_failure(EMAIL, *_db_state(user_db))
+    finally:
+        stop.set()
+        flusher.join(5)
+    store.flush()
+    
+    failed, db_locked, _version = _db_state(user_db)
+    assert failed == MAX_FAILED_ATTEMPTS
+    assert db_locked == locked
+    assert store.stats()["external_resets"] == 0
+
+
+def test_success_resets_counter(user_db):
+    store = LoginAttemptStore(flush_interval=60)
+    store.record_failure(EMAIL, *_db_state(user_db))
+    store.flush()
+    
+    store.record_success(EMAIL, *_db_state(user_db))
+    store.flush()
+    
+    assert _db_state(user_db)[:2] == (0, None)
+    assert store.stats()["tracked"] == 0
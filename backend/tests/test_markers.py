@@ -0,0 +1,137 @@
+"""Testes dos marcadores empacotados (services/queries/markers.py)."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from services.queries.markers import (
+    MARKER_TYPES,
+    pack_markers,
+    set_markers_with_conn,
+    unpack_markers,
+)
+
+MIGRATION_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "add_marcadores_princ.py"
+
+
+@pytest.fixture
+def princ_db(conn):
+    conn.executescript(
+        """
+        CREATE TABLE princ (
+            id_princ INTEGER PRIMARY KEY,
+            marcadores INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE tempstate (
+            id_state INTEGER PRIMARY KEY AUTOINCREMENT,
+            state_id_princ INTEGER NOT NULL,
+            state_dt_envio INTEGER DEFAULT 0,
+            state_dt_denvio INTEGER DEFAULT 0,
+            state_loc INTEGER,
+            state_dt_pago INTEGER DEFAULT 0,
+            UNIQUE (state_id_princ)
+        );
+        INSERT INTO princ (id_princ) VALUES (1), (2), (3);
+        """
+    )
+    return conn
+
+
+def _markers(conn, id_princ: int) -> dict:
+    row = conn.execute("SELECT marcadores FROM princ WHERE id_princ = ?", (id_princ,)).fetchone()
+    return unpack_markers(row[0])
+
+
+def test_pack_unpack_roundtrip():
+    markers = {"state_loc": 3, "state_dt_envio": 1, "state_dt_denvio": 0, "state_dt_pago": 2}
+    
+    packed = pack_markers(markers)
+    
+    assert packed == 3 | (1 << 2) | (2 << 6)
+    assert unpack_markers(packed) == markers
+    assert unpack_markers(None) == dict.fromkeys(MARKER_TYPES, 0)
+    assert pack_markers({"state_loc": None}) == 0
+
+
+def test_set_markers_only_touches_target_bits(princ_db):
+    initial = {"state_loc": 2, "state_dt_envio": 3, "state_dt_denvio": 1, "state_dt_pago": 3}
+    princ_db.execute("UPDATE princ SET marcadores = ?", (pack_markers(initial),))
+    
+    updated = set_markers_with_conn(princ_db, [1, 2], "state_dt_envio", 1)
+    
+    assert updated == 2
+    assert _markers(princ_db, 1) == {**initial, "state_dt_envio": 1}
+    assert _markers(princ_db, 2) == {**initial, "state_dt_envio": 1}
+    assert _markers(princ_db, 3) == initial
+    
+    set_markers_with_conn(princ_db, [1], "state_dt_envio", 0)
+    assert _markers(princ_db, 1) == {**initial, "state_dt_envio": 0}
+
+
+def test_set_markers_ignores_duplicates_and_missing_ids(princ_db):
+    assert set_markers_with_conn(princ_db, [1, 1, 99], "state_loc", 3) == 1
+    assert set_markers_with_conn(princ_db, [], "state_loc", 3) == 0
+    assert _markers(princ_db, 1)["state_loc"] == 3
+
+
+@pytest.mark.parametrize("marker_type, value", [("state_xpto", 1), ("state_loc", 4), ("state_loc", -1)])
+def test_set_markers_rejects_invalid_input(princ_db, marker_type, value):
+    with pytest.raises(ValueError):
+        set_markers_with_conn(princ_db, [1], marker_type, value)
+
+
+# =============================================================================
+# TRIGGERS DA MIGRAÇÃO (scripts/add_marcadores_princ.py)
+# =============================================================================
+
+@pytest.fixture
+def migration():
+    spec = importlib.util.spec_from_file_location("add_marcadores_princ", MIGRATION_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def synced_db(princ_db, migration):
+    for _name, sql in migration.build_triggers():
+        princ_db.execute(sql)
+    return princ_db
+
+
+def _tempstate(conn, id_princ: int):
+    row = conn.execute(
+        """
+        SELECT state_loc, state_dt_envio, state_dt_denvio, state_dt_pago
+        FROM tempstate WHERE state_id_princ = ?
+        """,
+        (id_princ,),
+    ).fetchone()
+    return tuple(row) if row else None
+
+
+def test_api_write_is_mirrored_in_tempstate(synced_db):
+    set_markers_with_conn(synced_db, [1], "state_dt_pago", 2)
+    assert _tempstate(synced_db, 1) == (0, 0, 0, 2)
+    
+    set_markers_with_conn(synced_db, [1], "state_loc", 1)
+    assert _tempstate(synced_db, 1) == (1, 0, 0, 2)
+    
+    # Todos os marcadores zerados: linha removida
+    set_markers_with_conn(synced_db, [1], "state_loc", 0)
+    set_markers_with_conn(synced_db, [1], "state_dt_pago", 0)
+    assert _tempstate(synced_db, 1) is None
+
+
+def test_legacy_write_keeps_other_markers(synced_db):
+    set_markers_with_conn(synced_db, [2], "state_dt_envio", 3)
+    
+    # Sistema legado grava apenas uma coluna de tempstate
+    synced_db.execute("UPDATE tempstate SET state_loc = 2 WHERE state_id_princ = 2")
+    assert _markers(synced_db, 2) == {
+        "state_loc": 2, "state_dt_envio": 3, "state_dt_denvio": 0, "state_dt_pago": 0,
+    }
+    
+    synced_db.execute("INSERT INTO tempstate (state_id_princ, state_dt_denvio) VALUES (3, 1)")
+    assert _markers(synced_db, 3)["state_dt_denvio"] == 1
@@ -0,0 +1,81 @@
+"""Testes de services/singleflight.py."""
+
+import threading
+import time
+
+import pytest
+
+from services.singleflight import SingleFlightGroup, single_flight
+
+
+def _run_concurrently(fn, count: int) -> list:
+    results = [None] * count
+    errors = [None] * count
+    barrier = threading.Barrier(count)
+    
+    def worker(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+def test_concurrent_identical_calls_run_once():
+    calls = []
+    
+    @single_flight
+    def slow(value: int) -> dict:
+        calls.append(value)
+        time.sleep(0.2)
+        return {"value": value}
+    
+    results, errors = _run_concurrently(lambda: slow(7), 8)
+    
+    assert errors == [None] * 8
+    assert calls == [7]
+    # Todos recebem o mesmo objeto (compartilhado)
+    assert all(r is results[0] for r in results)
+    stats = slow.singleflight_group.stats()
+    assert stats["executed"] == 1
+    assert stats["shared"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_different_arguments_are_not_coalesced():
+    calls = []
+    
+    @single_flight
+    def fetch(value: int, mode: str = "a") -> tuple:
+        calls.append((value, mode))
+        return value, mode
+    
+    assert fetch(1) == (1, "a")
+    assert fetch(1, mode="b") == (1, "b")
+    assert fetch(2) == (2, "a")
+    assert sorted(calls) == [(1, "a"), (1, "b"), (2, "a")]
+
+
+def test_leader_error_is_raised_for_followers():
+    group = SingleFlightGroup("test")
+    
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("falhou")
+    
+    _results, errors = _run_concurrently(lambda: group.do("k", failing), 4)
+    
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert group.stats()["executed"] == 1
+    
+    # Chamada seguinte executa de novo (nada fica preso)
+    with pytest.raises(RuntimeError):
+        group.do("k", failing)
+    assert group.stats()["executed"] == 2
@@ -0,0 +1,88 @@
+"""Testes do TypeaheadIndex (services/queries/lookups.py)."""
+
+import pytest
+
+from services.cache import bump_table_version
+from services.queries.lookups import TypeaheadIndex, get_segurados_index
+
+NAMES = [
+    "Açúcar Guarani",
+    "Banco do Brasil",
+    "Brasilagro",
+    "Cia Brasileira de Alumínio",
+    "Construtora São José",
+    "Joséfina Têxtil",
+    "Usina Santa Brasília",
+]
+
+
+def _index(names=NAMES) -> TypeaheadIndex:
+    return TypeaheadIndex(tuple({"value": i, "label": name} for i, name in enumerate(names)))
+
+
+def _labels(results) -> list[str]:
+    return [item["label"] for item in results]
+
+
+def test_ranking_prefix_then_word_prefix_then_substring():
+    results = _index().search("bras", 10)
+    
+    assert _labels(results) == [
+        # 1) nome começa com o texto (alfabética)
+        "Brasilagro",
+        # 2) alguma palavra começa com o texto (alfabética pela palavra)
+        "Banco do Brasil",
+        "Cia Brasileira de Alumínio",
+        "Usina Santa Brasília",
+    ]
+
+
+def test_accent_and_case_insensitive():
+    index = _index()
+    
+    assert _labels(index.search("ACUCAR", 10)) == ["Açúcar Guarani"]
+    assert _labels(index.search("jose", 10)) == ["Joséfina Têxtil", "Construtora São José"]
+    assert _labels(index.search("são", 10)) == ["Construtora São José"]
+
+
+def test_substring_match():
+    assert _labels(_index().search("umin", 10)) == ["Cia Brasileira de Alumínio"]
+
+
+def test_short_query_uses_scan():
+    # Menos de 3 caracteres: sem trigramas, ainda acha substrings
+    assert "Joséfina Têxtil" in _labels(_index().search("xt", 10))
+
+
+def test_limit_and_empty_query():
+    index = _index()
+    
+    assert len(index.search("a", 2)) == 2
+    assert index.search("   ", 10) == []
+    assert index.search("inexistente", 10) == []
+
+
+def test_results_are_the_shared_items():
+    index = _index()
+    assert index.search("guarani", 1)[0] is index.items[0]
+
+
+@pytest.fixture
+def segur_db(conn):
+    conn.execute("CREATE TABLE segur (id_segur INTEGER PRIMARY KEY, segur_nome TEXT)")
+    conn.executemany("INSERT INTO segur (segur_nome) VALUES (?)", [(n,) for n in NAMES])
+    conn.commit()
+    bump_table_version("segur")
+    return conn
+
+
+def test_index_rebuilt_when_segur_changes(segur_db):
+    assert get_segurados_index().search("novo", 10) == []
+    
+    segur_db.execute("INSERT INTO segur (segur_nome) VALUES ('Novo Segurado')")
+    segur_db.commit()
+    # Sem bump: índice em cache
+    assert get_segurados_index().search("novo", 10) == []
+    
+    bump_table_version("segur")
+    assert _labels(get_segurados_index().search("novo", 10)) == ["Novo Segurado"]
@@ -68,7 +68,7 @@ import {
 } from "@/components/ui/headless-combobox";
 
 import { useNewRecord } from "@/hooks/use-new-record";
-import { useContratantes, useUfs, useCidades, useInspetores } from "@/hooks/use-lookups";
+import { useLookupBundle, useBundleCidades } from "@/hooks/use-lookups";
 
 // =============================================================================
 // TYPES
@@ -122,11 +122,12 @@ export function NewRecordModal({ isOpen, onClose, onSuccess }: NewRecordModalPro
     },
   });
   
-  // Lookups
-  const { data: contratantes = [], isLoading: loadingContratantes } = useContratantes();
-  const { data: ufs = [], isLoading: loadingUfs } = useUfs();
-  const { data: cidades = [], isLoading: loadingCidades } = useCidades(selectedUf);
-  const { data: inspetores = [], isLoading: loadingInspetores } = useInspetores();
+  // Lookups (bundle único; cidades de todas as UFs já vêm no payload)
+  const { data: lookups, isLoading: loadingLookups } = useLookupBundle();
+  const contratantes = lookups?.contratantes ?? [];
+  const ufs = lookups?.ufs ?? [];
+  const inspetores = lookups?.inspetores ?? [];
+  const cidades = useBundleCidades(lookups, selectedUf);
   
   // Reset cidade quando UF muda
   useEffect(() => {
@@ -279,7 +280,7 @@ export function NewRecordModal({ isOpen, onClose, onSuccess }: NewRecordModalPro
                           onChange={field.onChange}
                           placeholder="Buscar..."
                           disabled={multiLocal.active}
-                          loading={loadingContratantes}
+                          loading={loadingLookups}
                           icon={<Building2 className="w-4 h-4 text-primary" />}
                         />
                       </FormControl>
@@ -401,7 +402,7 @@ export function NewRecordModal({ isOpen, onClose, onSuccess }: NewRecordModalPro
                           value={field.value}
                           onChange={field.onChange}
                           placeholder="Buscar..."
-                          loading={loadingInspetores}
+                          loading={loadingLookups}
                           icon={<User className="w-4 h-4 text-primary" />}
                         />
                       </FormControl>
@@ -500,7 +501,7 @@ export function NewRecordModal({ isOpen, onClose, onSuccess }: NewRecordModalPro
                           value={field.value}
                           onChange={field.onChange}
                           placeholder="Digite UF..."
-                          loading={loadingUfs}
+                          loading={loadingLookups}
                           icon={<MapPin className="w-4 h-4 text-accent" />}
                         />
                       </FormControl>
@@ -528,7 +529,7 @@ export function NewRecordModal({ isOpen, onClose, onSuccess }: NewRecordModalPro
                               : "Selecione UF primeiro"
                           }
                           disabled={!selectedUf || selectedUf === 0}
-                          loading={loadingCidades}
+                          loading={loadingLookups}
                           icon={<Layers className="w-4 h-4 text-accent" />}
                         />
                       </FormControl>
@@ -40,6 +40,8 @@ export {
   useCidades,
   useUsers,
   useAllLookups,
+  useLookupBundle,
+  useBundleCidades,
   type AllLookups,
 } from "./use-lookups";
 
@@ -8,8 +8,12 @@
  * - UFs
  * - Cidades
  * - Usuários
+ *
+ * Formulários que usam vários lookups devem preferir useLookupBundle
+ * (uma requisição, cidades de todas as UFs já incluídas).
  */
 
+import { useMemo } from "react";
 import { useQuery } from "@tanstack/react-query";
 import { CACHE_CONFIG } from "@/constants";
 import {
@@ -20,6 +24,9 @@ import {
   fetchCidadeOptions,
   fetchUsersOptions,
   fetchInspetoresOptions,
+  fetchLookupBundle,
+  getCidadesFromBundle,
+  type LookupBundle,
   type LookupOption,
   type UserOption,
 } from "@/services/api/lookups";
@@ -106,6 +113,31 @@ export function useInspetores() {
   });
 }
 
+// =============================================================================
+// BUNDLE (uma requisição para o formulário)
+// =============================================================================
+
+/**
+ * Hook para o bundle de lookups (versionado, com cópia no localStorage)
+ */
+export function useLookupBundle() {
+  return useQuery<LookupBundle>({
+    queryKey: ["lookups", "bundle"],
+    queryFn: fetchLookupBundle,
+    staleTime: CACHE_CONFIG.LOOKUPS_STALE_TIME,
+  });
+}
+
+/**
+ * Cidades de uma UF a partir do bundle (sem nova requisição)
+ */
+export function useBundleCidades(
+  bundle: LookupBundle | undefined,
+  idUf: number | null | undefined
+): LookupOption[] {
+  return useMemo(() => getCidadesFromBundle(bundle, idUf), [bundle, idUf]);
+}
+
 // =============================================================================
 // HOOK COMBINADO (todos os lookups principais)
 // =============================================================================
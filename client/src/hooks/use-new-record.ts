@@ -17,6 +17,7 @@ import { format } from "date-fns";
 import { toast } from "sonner";
 
 import { apiRequest, queryClient } from "@/lib/queryClient";
+import { waitForJob } from "@/services/api/jobs";
 import { KPIS_QUERY_KEY } from "./use-kpis";
 
 // =============================================================================
@@ -65,6 +66,7 @@ export interface NewRecordResponse {
   message: string;
   dirs_created: string[];
   loc: number;
+  job_id?: number | null;
 }
 
 export interface MultiLocalState {
@@ -113,6 +115,31 @@ function checkNewEntities(data: NewRecordFormData): string[] {
   return entities;
 }
 
+/**
+ * Acompanha o job de criação de diretórios (segundo plano) e notifica o resultado
+ */
+async function notifyDirectoriesJob(jobId: number): Promise<void> {
+  try {
+    const job = await waitForJob(jobId);
+    const resultado = job.resultado as { message?: string; dirs_created?: string[] } | null;
+    const dirs = resultado?.dirs_created ?? [];
+    
+    if (job.status === "done") {
+      toast.success("📁 Diretórios criados", { description: dirs.join(" | ") });
+    } else if (job.status === "pending" && job.tentativas > 0) {
+      toast.warning("⚠️ Diretórios: nova tentativa agendada", {
+        description: job.erro || resultado?.message || undefined,
+      });
+    } else if (job.status === "failed") {
+      toast.error("❌ Falha ao criar diretórios", {
+        description: job.erro || undefined,
+      });
+    }
+  } catch (error) {
+    console.error(`[NewRecord] Erro ao acompanhar job ${jobId}:`, error);
+  }
+}
+
 // =============================================================================
 // HOOK
 // =============================================================================
@@ -186,6 +213,10 @@ export function useNewRecord(options: UseNewRecordOptions = {}) {
       queryClient.invalidateQueries({ queryKey: ["/api/inspections"] });
       queryClient.invalidateQueries({ queryKey: KPIS_QUERY_KEY });
       
+      if (response.job_id) {
+        void notifyDirectoriesJob(response.job_id);
+      }
+      
       const dirsMsg = response.dirs_created.length > 0
         ? `📁 ${response.dirs_created.join(" | ")}`
         : "";
@@ -256,6 +287,10 @@ export function useNewRecord(options: UseNewRecordOptions = {}) {
       queryClient.invalidateQueries({ queryKey: ["/api/inspections"] });
       queryClient.invalidateQueries({ queryKey: KPIS_QUERY_KEY });
       
+      if (response.job_id) {
+        void notifyDirectoriesJob(response.job_id);
+      }
+      
       const dirsMsg = response.dirs_created.length > 0
         ? `📁 ${response.dirs_created.join(" | ")}`
         : "";
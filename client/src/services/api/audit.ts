@@ -13,6 +13,7 @@ export interface AuditEntry {
   id_log: number;
   id_user: number;
   user_email: string;
+  id_princ?: number | null;
   operacao: "CREATE" | "UPDATE" | "DELETE" | "ENCAMINHAR";
   campo: string | null;
   valor_anterior: string | null;
@@ -26,6 +27,23 @@ export interface AuditHistoryResponse {
   entries: AuditEntry[];
 }
 
+export interface AuditSearchFilters {
+  idUser?: number;
+  operacao?: AuditEntry["operacao"];
+  campo?: string;
+  idPrinc?: number;
+  dtIni?: string;
+  dtFim?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+export interface AuditSearchResponse {
+  total: number;
+  entries: AuditEntry[];
+  next_cursor: string | null;
+}
+
 export interface AuditStatsResponse {
   total_registros: number;
   registro_mais_antigo: string | null;
@@ -50,14 +68,16 @@ const API_BASE = "";
 
 /**
  * Busca histórico de operações de um registro específico.
+ * includeArchived: inclui meses antigos do arquivo frio (mais lento).
  * Requer papel: admin
  */
 export async function fetchAuditHistory(
   idPrinc: number,
-  limit: number = 100
+  limit: number = 100,
+  includeArchived: boolean = false
 ): Promise<AuditHistoryResponse> {
   const response = await fetch(
-    `${API_BASE}/api/audit/${idPrinc}?limit=${limit}`,
+    `${API_BASE}/api/audit/${idPrinc}?limit=${limit}&include_archived=${includeArchived}`,
     { credentials: "include" }
   );
 
@@ -77,6 +97,44 @@ export async function fetchAuditHistory(
   return response.json();
 }
 
+/**
+ * Busca operações de auditoria com filtros.
+ * Para a próxima página, repita a chamada com cursor = next_cursor.
+ * Requer papel: admin
+ */
+export async function searchAudit(
+  filters: AuditSearchFilters = {}
+): Promise<AuditSearchResponse> {
+  const params = new URLSearchParams();
+  if (filters.idUser !== undefined) params.append("id_user", String(filters.idUser));
+  if (filters.operacao) params.append("operacao", filters.operacao);
+  if (filters.campo) params.append("campo", filters.campo);
+  if (filters.idPrinc !== undefined) params.append("id_princ", String(filters.idPrinc));
+  if (filters.dtIni) params.append("dt_ini", filters.dtIni);
+  if (filters.dtFim) params.append("dt_fim", filters.dtFim);
+  if (filters.cursor) params.append("cursor", filters.cursor);
+  params.append("limit", String(filters.limit ?? 100));
+
+  const response = await fetch(`${API_BASE}/api/audit/search?${params}`, {
+    credentials: "include",
+  });
+
+  if (response.status === 401) {
+    throw new Error("Não autenticado");
+  }
+
+  if (response.status === 403) {
+    throw new Error("Acesso restrito a administradores");
+  }
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || "Erro ao buscar auditoria");
+  }
+
+  return response.json();
+}
+
 /**
  * Retorna estatísticas do log de auditoria.
  * Requer papel: admin
@@ -37,7 +37,7 @@ interface InspectionRaw {
   guy_despesa?: number;
   id_ativi?: string;        // Atividade (texto do JOIN)
   obs?: string;
-  // Marcadores de alerta (do tempstate)
+  // Marcadores de alerta (princ.marcadores)
   state_loc?: number;       // 0-3
   state_dt_envio?: number;  // 0-3
   state_dt_denvio?: number; // 0-3
@@ -129,7 +129,7 @@ function convertToFrontend(raw: InspectionRaw): Inspection {
     segurado: raw.id_segur || "",
     guilty: raw.id_user_guilty || "",
     guy: raw.id_user_guy || "",
-    // Marcadores de alerta (do tempstate) - valores 0-3
+    // Marcadores de alerta (princ.marcadores) - valores 0-3
     stateLoc: raw.state_loc ?? 0,
     stateDtEnvio: raw.state_dt_envio ?? 0,
     stateDtDenvio: raw.state_dt_denvio ?? 0,
@@ -259,3 +259,40 @@ export async function updateInspectionField(
   return response.json();
 }
 
+/**
+ * Atualiza vários campos/registros numa única requisição (1 transação).
+ */
+export interface BatchEdit {
+  id_princ: number;
+  field: string;
+  value: unknown;
+}
+
+export interface BatchUpdateResult {
+  success: boolean;
+  message: string;
+  updated: number;
+  results: { id_princ: number; field: string; new_value: unknown }[];
+}
+
+export async function updateInspectionFields(
+  edits: BatchEdit[]
+): Promise<BatchUpdateResult> {
+  const response = await fetch(
+    `${API_BASE}/api/inspections/batch`,
+    {
+      method: "PATCH",
+      headers: { "Content-Type": "application/json" },
+      credentials: "include",
+      body: JSON.stringify({ edits }),
+    }
+  );
+  
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || "Erro ao atualizar campos");
+  }
+  
+  return response.json();
+}
+
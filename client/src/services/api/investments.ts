@@ -55,6 +55,25 @@ export interface AllocationItem {
   color: string;
 }
 
+export interface TimeseriesPoints {
+  aplicado: number[];
+  valor: number[];
+}
+
+export interface TimeseriesSeries extends TimeseriesPoints {
+  id: string;
+  name: string;
+  color: string;
+}
+
+export interface TimeseriesResponse {
+  group_by: "tipo" | "investidor" | "instituicao";
+  freq: "D" | "M";
+  dates: string[];
+  total: TimeseriesPoints;
+  series: TimeseriesSeries[];
+}
+
 export interface InvestmentItem {
   id_finan: number;
   investidor: string;
@@ -166,6 +185,18 @@ export async function fetchInvestmentAllocation(
   return fetchWithAuth<AllocationItem[]>(`${BASE_URL}/allocation${qs}`);
 }
 
+/**
+ * Busca evolução do valor da carteira (curvas por grupo).
+ */
+export async function fetchInvestmentTimeseries(
+  groupBy: "tipo" | "investidor" | "instituicao" = "tipo",
+  freq: "D" | "M" = "M",
+  filters?: InvestmentFilters
+): Promise<TimeseriesResponse> {
+  const qs = buildQueryString(filters, { group_by: groupBy, freq });
+  return fetchWithAuth<TimeseriesResponse>(`${BASE_URL}/timeseries${qs}`);
+}
+
 /**
  * Busca lista completa de investimentos.
  */
@@ -0,0 +1,75 @@
+/**
+ * API de Jobs - xFinance
+ *
+ * Status de tarefas em segundo plano (ex: criação de diretórios
+ * após um novo registro).
+ */
+
+// =============================================================================
+// TIPOS
+// =============================================================================
+
+export type JobStatus = "pending" | "running" | "done" | "failed";
+
+export interface JobStatusResponse {
+  id_job: number;
+  tipo: string;
+  id_princ: number | null;
+  id_user: number | null;
+  status: JobStatus;
+  tentativas: number;
+  max_tentativas: number;
+  proximo_em: string | null;
+  resultado: Record<string, unknown> | null;
+  erro: string | null;
+  dt_criacao: string;
+  dt_atualizacao: string;
+}
+
+// =============================================================================
+// FUNÇÕES
+// =============================================================================
+
+/**
+ * Busca o status de um job (visível ao criador do job ou a admin).
+ */
+export async function fetchJob(idJob: number): Promise<JobStatusResponse> {
+  const response = await fetch(`/api/jobs/${idJob}`, {
+    credentials: "include",
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || "Erro ao consultar job");
+  }
+
+  return response.json();
+}
+
+/**
+ * Job ainda na primeira execução (aguardando ou executando).
+ */
+function isFirstRunInFlight(job: JobStatusResponse): boolean {
+  return job.status === "running" || (job.status === "pending" && job.tentativas === 0);
+}
+
+/**
+ * Consulta o job até a primeira execução terminar ou até o tempo limite.
+ *
+ * Retorna o último status obtido: "pending" com tentativas > 0 indica
+ * nova tentativa agendada pelo backend (backoff).
+ */
+export async function waitForJob(
+  idJob: number,
+  { intervalMs = 1500, timeoutMs = 60000 } = {}
+): Promise<JobStatusResponse> {
+  const deadline = Date.now() + timeoutMs;
+  let job = await fetchJob(idJob);
+
+  while (isFirstRunInFlight(job) && Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = await fetchJob(idJob);
+  }
+
+  return job;
+}
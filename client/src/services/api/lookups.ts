@@ -136,6 +136,77 @@ export async function fetchInspetoresOptions(): Promise<UserOption[]> {
   }
 }
 
+// =============================================================================
+// Bundle (todos os lookups do formulário numa requisição)
+// =============================================================================
+
+/** Cidades compactadas: id_uf → [[id_cidade, nome], ...] */
+export type CidadesIndex = Record<string, [number, string][]>;
+
+export interface LookupBundle {
+  version: string;
+  contratantes: LookupOption[];
+  segurados: LookupOption[];
+  atividades: LookupOption[];
+  ufs: LookupOption[];
+  users: UserOption[];
+  inspetores: UserOption[];
+  cidades: CidadesIndex;
+}
+
+const BUNDLE_STORAGE_KEY = "xfinance:lookups-bundle";
+
+function readStoredBundle(): LookupBundle | null {
+  try {
+    const raw = localStorage.getItem(BUNDLE_STORAGE_KEY);
+    return raw ? (JSON.parse(raw) as LookupBundle) : null;
+  } catch {
+    return null;
+  }
+}
+
+function storeBundle(bundle: LookupBundle): void {
+  try {
+    localStorage.setItem(BUNDLE_STORAGE_KEY, JSON.stringify(bundle));
+  } catch {
+    // Quota/modo privado: segue só com o cache do React Query
+  }
+}
+
+/**
+ * Busca o bundle de lookups.
+ *
+ * A última versão fica no localStorage e é enviada em If-None-Match;
+ * se o servidor responder 304, reutiliza a cópia local (sem corpo).
+ */
+export async function fetchLookupBundle(): Promise<LookupBundle> {
+  const stored = readStoredBundle();
+  const headers: HeadersInit = stored ? { "If-None-Match": `"${stored.version}"` } : {};
+
+  const response = await fetch("/api/lookups/bundle", {
+    credentials: "include",
+    headers,
+  });
+
+  if (response.status === 304 && stored) return stored;
+  if (!response.ok) throw new Error("Erro ao buscar lookups");
+
+  const bundle = (await response.json()) as LookupBundle;
+  storeBundle(bundle);
+  return bundle;
+}
+
+/**
+ * Cidades de uma UF a partir do bundle.
+ */
+export function getCidadesFromBundle(
+  bundle: LookupBundle | undefined,
+  idUf: number | null | undefined
+): LookupOption[] {
+  if (!bundle || !idUf) return [];
+  return (bundle.cidades[String(idUf)] ?? []).map(([value, label]) => ({ value, label }));
+}
+
 // =============================================================================
 // Helpers
 // =============================================================================
@@ -1,4 +1,4 @@
-// Tipos de marcadores correspondem às colunas do tempstate
+// Tipos de marcadores (princ.marcadores, 2 bits cada)
 export type MarkerType = 'state_loc' | 'state_dt_envio' | 'state_dt_denvio' | 'state_dt_pago';
 
 // Níveis de marcador: 0=sem, 1=azul, 2=amarelo, 3=vermelho